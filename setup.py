@@ -12,6 +12,11 @@ setup(
         'tree_sitter==0.20.1',
         'tree_sitter_languages>=1.5.0',
     ],
+    entry_points={
+        'console_scripts': [
+            'codeeditor=codeEditorSDK.cli:main',
+        ],
+    },
     python_requires='>=3.7, <=3.11',
 
 )
\ No newline at end of file
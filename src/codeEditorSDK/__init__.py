@@ -2,5 +2,39 @@
 """CodeSDK - Multi-language code editing toolkit"""
 __version__ = "0.1.0"
 
-from .factories import MultiLangEditorFactory
-from .core.codeEditor import CodeFileEditor  
\ No newline at end of file
+# Public names and the modules defining them. They are imported on first
+# access, so `import codeEditorSDK` (e.g. by the CLI) loads almost nothing.
+_EXPORTS = {
+    'MultiLangEditorFactory': 'codeEditorSDK.factories',
+    'CodeFileEditor': 'codeEditorSDK.core.codeEditor',
+    'AsyncCodeFileEditor': 'codeEditorSDK.core.aio',
+    'Document': 'codeEditorSDK.core.document',
+    'Change': 'codeEditorSDK.core.document',
+    'apply_plan_to_files': 'codeEditorSDK.core.batch',
+    'FileResult': 'codeEditorSDK.core.batch',
+    'AnalysisCache': 'codeEditorSDK.core.cache',
+    'Mutant': 'codeEditorSDK.utils.mutants',
+    'Metrics': 'codeEditorSDK.utils.metrics',
+    'NullMetrics': 'codeEditorSDK.utils.metrics',
+    'OutputPolicy': 'codeEditorSDK.core.output',
+    'SuffixOutput': 'codeEditorSDK.core.output',
+    'InPlaceOutput': 'codeEditorSDK.core.output',
+    'MirrorOutput': 'codeEditorSDK.core.output',
+    'SinkOutput': 'codeEditorSDK.core.output',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+    value = getattr(import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1 @@
+"""Synthetic corpora and timing for the editor operations; run with python -m codeEditorSDK.benchmarks"""
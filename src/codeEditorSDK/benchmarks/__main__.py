@@ -0,0 +1,89 @@
+"""
+Run the editor benchmarks.
+
+    python -m codeEditorSDK.benchmarks --sizes 1K,100K,1M --output bench.json
+    python -m codeEditorSDK.benchmarks --baseline bench.json --tolerance 0.2
+    python -m codeEditorSDK.benchmarks --startup --baseline startup.json
+
+Exits with status 1 when an operation fails or is slower than the baseline.
+"""
+import argparse
+import json
+import sys
+
+from codeEditorSDK.benchmarks.corpus import TEMPLATES, parse_size
+from codeEditorSDK.benchmarks.runner import OPS, compare, environment, run_benchmarks, run_startup
+
+
+def _print_result(r) -> None:
+    if 'error' in r:
+        print(f"{r['language']:<7}{r['size']:>6}  {r['op']:<26}FAILED  {r['error']}")
+        return
+    if r['size'] == 'startup':
+        slowest = ', '.join(f"{i['module']} {i['ms']:.1f} ms" for i in r['slowest_imports'][:3])
+        print(f"{r['language']:<7}{'cold':>6}  {r['op']:<26}"
+              f"p50 {r['p50_ms']:>10.2f} ms  {r['modules']:>4} modules  ({slowest})")
+        return
+    print(f"{r['language']:<7}{r['size']:>6}  {r['op']:<26}"
+          f"p50 {r['p50_ms']:>10.2f} ms  p99 {r['p99_ms']:>10.2f} ms  "
+          f"{r['throughput_mb_s']:>8.2f} MB/s  peak {r['peak_bytes'] / (1 << 20):>8.1f} MB")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m codeEditorSDK.benchmarks',
+                                     description='Benchmark editor operations on generated sources.')
+    parser.add_argument('--languages', default=','.join(TEMPLATES),
+                        help='Comma-separated languages (default: all)')
+    parser.add_argument('--sizes', default='1K,100K,1M',
+                        help='Comma-separated corpus sizes, 1K up to 50M (default: 1K,100K,1M)')
+    parser.add_argument('--ops', default=','.join(OPS), help='Comma-separated operations (default: all)')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per operation')
+    parser.add_argument('--warmup', type=int, default=1, help='Untimed runs per operation')
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    parser.add_argument('--baseline', help='Compare against a results file written by --output')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Allowed slowdown over the baseline p50 (default: 0.25 = 25%%)')
+    parser.add_argument('--workdir', help='Directory for generated files (default: a temp dir)')
+    parser.add_argument('--startup', action='store_true',
+                        help='Time cold import, editor construction and first parse in fresh '
+                             'interpreters instead of the operations')
+    args = parser.parse_args(argv)
+
+    if args.repeat <= 0:
+        parser.error('--repeat must be positive')
+    try:
+        sizes = [parse_size(s) for s in args.sizes.split(',') if s]
+    except ValueError as e:
+        parser.error(str(e))
+    languages = [lang for lang in args.languages.split(',') if lang]
+    ops = [op for op in args.ops.split(',') if op]
+    for lang in languages:
+        if lang not in TEMPLATES:
+            parser.error(f'unsupported language: {lang}')
+
+    if args.startup:
+        results = run_startup(languages, repeat=args.repeat, progress=_print_result)
+    else:
+        results = run_benchmarks(languages, sizes, ops, repeat=args.repeat, warmup=args.warmup,
+                                 workdir=args.workdir, progress=_print_result)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'environment': environment(), 'results': results}, f, indent=2)
+
+    failed = [r for r in results if 'error' in r]
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.tolerance)
+        for r in regressions:
+            print(f"REGRESSION {r['language']} {r['size']} {r['op']}: "
+                  f"{r['baseline']:.2f} ms -> {r['current']:.2f} ms ({r['ratio']:.2f}x)")
+        if not regressions:
+            print(f"No regressions beyond {args.tolerance:.0%} of the baseline")
+    return 1 if failed or regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,96 @@
+from typing import Dict
+
+# One function per language. Every benchmarked operation has a target in
+# it: a loop, an if-condition with '>', '*' in arithmetic, a local named
+# total, a type the validator accepts for change_type and two plain
+# statements near the top that delete/update can touch without breaking
+# the syntax.
+_PYTHON_FUNC = '''def func_{i}(radius: float, count: int) -> float:
+    scale = 2
+    offset = 3
+    total: float = 0.0
+    for k in range(count):
+        total = total + radius * k
+    if total > radius:
+        total = total - radius
+    return total * scale + offset
+
+'''
+
+_JAVA_FUNC = '''    public static Integer func_{i}(Integer radius, int count) {{
+        int scale = 2;
+        int offset = 3;
+        Integer total = 0;
+        for (int k = 0; k < count; k++) {{
+            total = total + radius * k;
+        }}
+        if (total > radius) {{
+            total = total - radius;
+        }}
+        return total * scale + offset;
+    }}
+
+'''
+
+_C_FUNC = '''size_t func_{i}(size_t radius, int count) {{
+    int scale = 2;
+    int offset = 3;
+    size_t total = 0;
+    for (int k = 0; k < count; k++) {{
+        total = total + radius * k;
+    }}
+    if (total > radius) {{
+        total = total - radius;
+    }}
+    return total * scale + offset;
+}}
+
+'''
+
+TEMPLATES: Dict[str, Dict[str, str]] = {
+    'python': {'header': '', 'func': _PYTHON_FUNC, 'footer': '', 'ext': '.py'},
+    'java': {'header': 'public class Bench {\n', 'func': _JAVA_FUNC, 'footer': '}\n', 'ext': '.java'},
+    'c': {'header': '#include <stddef.h>\n\n', 'func': _C_FUNC, 'footer': '', 'ext': '.c'},
+    'cpp': {'header': '#include <cstddef>\n\n', 'func': _C_FUNC, 'footer': '', 'ext': '.cpp'},
+}
+
+_UNITS = {'': 1, 'B': 1, 'K': 1 << 10, 'KB': 1 << 10, 'M': 1 << 20, 'MB': 1 << 20}
+
+
+def parse_size(text: str) -> int:
+    """Byte count from strings like '1K', '100KB' or '50M'"""
+    text = text.strip().upper()
+    number = text.rstrip('KMB')
+    unit = text[len(number):]
+    if not number.isdigit() or unit not in _UNITS:
+        raise ValueError(f"Invalid size: {text}")
+    return int(number) * _UNITS[unit]
+
+
+def format_size(size: int) -> str:
+    """Inverse of parse_size for round sizes, e.g. 1048576 -> '1M'"""
+    for unit, factor in (('M', 1 << 20), ('K', 1 << 10)):
+        if size >= factor and size % factor == 0:
+            return f"{size // factor}{unit}"
+    return str(size)
+
+
+def generate_source(language: str, size: int) -> str:
+    """
+    Synthetic source of at least size bytes: whole functions repeated
+    until the target is reached, so the result always parses.
+    """
+    try:
+        template = TEMPLATES[language]
+    except KeyError:
+        raise ValueError(f"No benchmark corpus for language: {language}")
+    parts = [template['header']]
+    total = len(template['header']) + len(template['footer'])
+    i = 0
+    while total < size or i == 0:
+        func = template['func'].format(i=i)
+        parts.append(func)
+        total += len(func)
+        i += 1
+    parts.append(template['footer'])
+    return ''.join(parts)
@@ -0,0 +1,256 @@
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+import contextlib
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from codeEditorSDK.benchmarks.corpus import TEMPLATES, format_size, generate_source
+from codeEditorSDK.core.EditBuilder import EditBuilder
+from codeEditorSDK.core.codeEditor import CodeFileEditor
+from codeEditorSDK.core.document import Document
+
+# Per-language targets inside the generated functions (see corpus.py)
+_TARGETS = {
+    'python': {'line': 2, 'insert': 'extra = 1', 'update': 'scale = 4',
+               'from_type': 'float', 'to_type': 'double'},
+    'java': {'line': 3, 'insert': 'int extra = 1;', 'update': 'int scale = 4;',
+             'from_type': 'Integer', 'to_type': 'Long'},
+    'c': {'line': 4, 'insert': 'int extra = 1;', 'update': 'int scale = 4;',
+          'from_type': 'size_t', 'to_type': 'int64_t'},
+    'cpp': {'line': 4, 'insert': 'int extra = 1;', 'update': 'int scale = 4;',
+            'from_type': 'size_t', 'to_type': 'int64_t'},
+}
+
+
+def _chain(editor: CodeFileEditor, path: str, t: Dict[str, Any]):
+    return (EditBuilder(editor, path)
+            .rename_var('total', 'acc', func='func_0')
+            .operator_swap('*', '+')
+            .condition_operator_swap('>', '<')
+            .change_type(t['from_type'], t['to_type'])
+            .apply())
+
+
+# name -> (runs on a fresh Document or on the file path, call)
+OPS: Dict[str, tuple] = {
+    'insert': ('doc', lambda ed, src, t: ed.insert(src, t['line'], t['insert'])),
+    'update': ('doc', lambda ed, src, t: ed.update(src, t['line'], t['line'], t['update'])),
+    'delete': ('doc', lambda ed, src, t: ed.delete(src, t['line'], t['line'])),
+    'query': ('path', lambda ed, src, t: ed.query(src, 1000, 1050)),
+    'swap_operator': ('doc', lambda ed, src, t: ed.swap_operator(src, '*', '+')),
+    'rename_var': ('doc', lambda ed, src, t: ed.rename_var(src, 'total', 'acc')),
+    'rename_var_scoped': ('doc', lambda ed, src, t: ed.rename_var(src, 'total', 'acc', func='func_0')),
+    'rename_many': ('doc', lambda ed, src, t: ed.rename_many(src, {'total': 'acc', 'radius': 'r', 'scale': 's'})),
+    'change_type': ('doc', lambda ed, src, t: ed.change_type(src, t['from_type'], t['to_type'])),
+    'unroll_loop': ('doc', lambda ed, src, t: ed.unroll_loop(src, 2)),
+    'unroll_loops': ('doc', lambda ed, src, t: ed.unroll_loops(src, 4)),
+    'swap_condition_operator': ('doc', lambda ed, src, t: ed.swap_condition_operator(src, '>', '<')),
+    'mutants': ('doc', lambda ed, src, t: sum(1 for _ in ed.mutants(src))),
+    'edit_builder_chain': ('path', _chain),
+}
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a non-empty sample list"""
+    ordered = sorted(samples)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def _measure(call: Callable[[], Any], repeat: int, warmup: int) -> Dict[str, Any]:
+    for _ in range(warmup):
+        call()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        call()
+        times.append(time.perf_counter() - start)
+    # Peak Python allocation from one extra run; tracing would skew the timings
+    tracemalloc.start()
+    try:
+        call()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'times': times, 'peak_bytes': peak}
+
+
+def _make_call(editor: CodeFileEditor, op: str, source: str, path: str,
+               targets: Dict[str, Any]) -> Callable[[], Any]:
+    mode, fn = OPS[op]
+
+    def call():
+        # Every run validates from scratch, not from the previous run's memo
+        editor.validator.clear_cache()
+        if mode == 'doc':
+            return fn(editor, Document(source, path=path), targets)
+        return fn(editor, path, targets)
+    return call
+
+
+def run_benchmarks(languages: Iterable[str],
+                   sizes: Iterable[int],
+                   ops: Optional[Iterable[str]] = None,
+                   repeat: int = 5,
+                   warmup: int = 1,
+                   workdir: Optional[str] = None,
+                   progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> List[Dict[str, Any]]:
+    """
+    Time every operation on generated sources.
+    Document ops get a fresh Document per run, so parsing is included;
+    'query' and 'edit_builder_chain' go through a file in workdir.
+    :return: One result dict per (language, size, op); failed ops carry 'error'
+    """
+    ops = list(ops or OPS)
+    unknown = [op for op in ops if op not in OPS]
+    if unknown:
+        raise ValueError(f"Unknown benchmark ops: {', '.join(unknown)}")
+    results = []
+    with contextlib.ExitStack() as stack:
+        if workdir is None:
+            workdir = stack.enter_context(tempfile.TemporaryDirectory(prefix='codeeditor-bench-'))
+        for language in languages:
+            editor = CodeFileEditor(language)
+            targets = _TARGETS[language]
+            for size in sizes:
+                source = generate_source(language, size)
+                path = Path(workdir) / f"bench_{language}_{format_size(size)}{TEMPLATES[language]['ext']}"
+                path.write_text(source, encoding='utf-8')
+                nbytes = len(source.encode('utf-8'))
+                for op in ops:
+                    call = _make_call(editor, op, source, str(path), targets)
+                    result = {'language': language, 'size': format_size(size), 'bytes': nbytes,
+                              'op': op, 'repeat': repeat}
+                    try:
+                        m = _measure(call, repeat, warmup)
+                    except Exception as ex:
+                        result['error'] = f"{type(ex).__name__}: {ex}"
+                    else:
+                        p50 = percentile(m['times'], 50)
+                        result.update({
+                            'p50_ms': p50 * 1e3,
+                            'p99_ms': percentile(m['times'], 99) * 1e3,
+                            'mean_ms': sum(m['times']) / len(m['times']) * 1e3,
+                            'throughput_mb_s': nbytes / (1 << 20) / p50 if p50 else None,
+                            'peak_bytes': m['peak_bytes'],
+                        })
+                    results.append(result)
+                    if progress:
+                        progress(result)
+    return results
+
+
+# Cold-start steps, each timed in a fresh interpreter; {language} is filled in
+STARTUP: Dict[str, str] = {
+    'import': 'import codeEditorSDK',
+    'editor': 'from codeEditorSDK import CodeFileEditor; CodeFileEditor({language!r})',
+    'first_parse': ('from codeEditorSDK import CodeFileEditor; '
+                    'CodeFileEditor({language!r}).validator.validate_syntax("")'),
+}
+
+# Child script: time one statement, count the modules it imported. The marker
+# separates the interpreter's own imports from the statement's in -X importtime
+_STARTUP_MARKER = '-- startup benchmark --'
+_STARTUP_CHILD = """
+import sys, time
+sys.stderr.write({marker!r} + '\\n')
+before = len(sys.modules)
+start = time.perf_counter()
+{code}
+print(time.perf_counter() - start, len(sys.modules) - before)
+"""
+
+
+def _run_child(code: str, importtime: bool = False):
+    """(seconds, modules imported, -X importtime report or '') of code in a new interpreter"""
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [root, os.environ.get('PYTHONPATH')])))
+    cmd = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', _STARTUP_CHILD.format(code=code, marker=_STARTUP_MARKER)]
+    proc = subprocess.run(cmd, capture_output=True, text=True, env=env, check=True)
+    seconds, modules = proc.stdout.split()
+    return float(seconds), int(modules), proc.stderr
+
+
+def slowest_imports(report: str, top: int = 5) -> List[Dict[str, Any]]:
+    """Top-level imports with the largest cumulative time in a -X importtime report"""
+    entries = []
+    lines = report.splitlines()
+    if _STARTUP_MARKER in lines:
+        lines = lines[lines.index(_STARTUP_MARKER) + 1:]
+    for line in lines:
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # Nested imports are indented under the module that triggered them
+        if cumulative.strip().isdigit() and not name.startswith('  '):
+            entries.append({'module': name.strip(), 'ms': int(cumulative) / 1e3})
+    return sorted(entries, key=lambda e: -e['ms'])[:top]
+
+
+def run_startup(languages: Iterable[str], repeat: int = 5,
+                progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> List[Dict[str, Any]]:
+    """
+    Time cold start (see STARTUP), each run in a new interpreter, so a slow
+    import shows up as languages and helpers are added.
+    Results use size 'startup' and can be compared like operation results.
+    """
+    steps = [('all', 'import')] + [(lang, step) for lang in languages for step in STARTUP if step != 'import']
+    results = []
+    for language, step in steps:
+        code = STARTUP[step].format(language=language)
+        result = {'language': language, 'size': 'startup', 'bytes': 0, 'op': step, 'repeat': repeat}
+        try:
+            times = [_run_child(code)[0] for _ in range(repeat)]
+            # One more run under -X importtime, which slows imports down a little
+            _, modules, report = _run_child(code, importtime=True)
+        except subprocess.CalledProcessError as ex:
+            lines = (ex.stderr or '').strip().splitlines()
+            result['error'] = lines[-1] if lines else str(ex)
+        else:
+            result.update({
+                'p50_ms': percentile(times, 50) * 1e3,
+                'p99_ms': percentile(times, 99) * 1e3,
+                'mean_ms': sum(times) / len(times) * 1e3,
+                'modules': modules,
+                'slowest_imports': slowest_imports(report),
+            })
+        results.append(result)
+        if progress:
+            progress(result)
+    return results
+
+
+def environment() -> Dict[str, Any]:
+    """Context stored with results so runs from different machines are not mixed up"""
+    from codeEditorSDK import __version__
+    return {
+        'sdk_version': __version__,
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+    }
+
+
+def compare(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]],
+            tolerance: float = 0.25, metric: str = 'p50_ms') -> List[Dict[str, Any]]:
+    """
+    Results slower than the baseline by more than tolerance (0.25 = 25%),
+    matched on (language, size, op). Entries missing from either side are skipped.
+    """
+    base = {(r['language'], r['size'], r['op']): r for r in baseline if metric in r}
+    regressions = []
+    for r in results:
+        old = base.get((r['language'], r['size'], r['op']))
+        if old is None or metric not in r:
+            continue
+        if r[metric] > old[metric] * (1 + tolerance):
+            regressions.append({'language': r['language'], 'size': r['size'], 'op': r['op'],
+                                'baseline': old[metric], 'current': r[metric],
+                                'ratio': r[metric] / old[metric] if old[metric] else float('inf')})
+    return regressions
@@ -0,0 +1,202 @@
+"""
+Apply an edit plan to many files from the shell.
+
+    codeeditor --plan plan.json 'src/**/*.py'
+    echo '{"op": "rename_var", "args": {"old_name": "radius", "new_name": "r"}}' \\
+        | codeeditor --dry-run --language python 'src/**/*.py'
+    find . -name '*.java' | codeeditor --plan plan.jsonl --files-from - --in-place
+
+The plan is a JSON list of edits in the apply_edits format, a JSON object
+{"language": ..., "edits": [...], "compose": ...}, or JSONL with one edit
+per line. It is read from --plan (default: stdin). Files come from glob
+patterns ("**" recurses) and/or --files-from, and are consumed lazily.
+
+One JSON line is printed per file as soon as it is done:
+    {"path": ..., "output": ..., "ms": ...}     written file
+    {"path": ..., "diff": ..., "ms": ...}       --dry-run
+    {"path": ..., "error": ..., "ms": ...}      failed; other files go on
+Exits with status 1 when any file failed.
+"""
+from itertools import chain
+from typing import Any, Dict, IO, Iterable, Iterator, List, Optional, Tuple
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+from codeEditorSDK.core.batch import FileResult, apply_plan_to_files
+from codeEditorSDK.core.output import InPlaceOutput, MirrorOutput
+from codeEditorSDK.factories import MultiLangEditorFactory
+
+# File extension -> language, used when neither --language nor the plan names one
+EXTENSIONS = {
+    '.py': 'python',
+    '.java': 'java',
+    '.c': 'c', '.h': 'c',
+    '.cpp': 'cpp', '.cc': 'cpp', '.cxx': 'cpp', '.hpp': 'cpp', '.hh': 'cpp',
+    '.js': 'javascript',
+}
+
+
+def load_plan(stream: IO[str]) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Read a plan as JSON or JSONL.
+    :return: (edits, options) where options may hold 'language' and 'compose'
+    """
+    text = stream.read()
+    try:
+        plan = json.loads(text)
+    except ValueError:
+        plan = []
+        for number, line in enumerate(text.splitlines(), 1):
+            if not line.strip():
+                continue
+            try:
+                plan.append(json.loads(line))
+            except ValueError as ex:
+                raise ValueError(f"Plan line {number} is not valid JSON: {ex}")
+    options: Dict[str, Any] = {}
+    if isinstance(plan, dict):
+        if 'op' in plan:
+            plan = [plan]
+        else:
+            options = {k: plan[k] for k in ('language', 'compose') if k in plan}
+            plan = plan.get('edits')
+    if not isinstance(plan, list) or not plan:
+        raise ValueError("Plan must be a non-empty list of edits")
+    for number, edit in enumerate(plan, 1):
+        if not isinstance(edit, dict) or not isinstance(edit.get('op'), str):
+            raise ValueError(f"Edit {number} has no 'op'")
+    return plan, options
+
+
+def iter_paths(patterns: Iterable[str], files_from: Optional[IO[str]] = None) -> Iterator[str]:
+    """Files matching the glob patterns, then the lines of files_from; nothing is collected"""
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            for path in glob.iglob(pattern, recursive=True):
+                if os.path.isfile(path):
+                    yield path
+        else:
+            # Plain names are passed through so a missing file is reported, not skipped
+            yield pattern
+    if files_from is not None:
+        for line in files_from:
+            path = line.rstrip('\r\n')
+            if path:
+                yield path
+
+
+def language_for(path: str) -> Optional[str]:
+    return EXTENSIONS.get(os.path.splitext(path)[1].lower())
+
+
+def result_record(result: FileResult, dry_run) -> Dict[str, Any]:
+    """The JSON line printed for one file"""
+    record: Dict[str, Any] = {'path': result.path}
+    if result.error is not None:
+        record['error'] = result.error
+    elif dry_run == 'spans':
+        record['spans'] = [change._asdict() for change in result.output]
+    elif dry_run:
+        record['diff'] = result.output
+    else:
+        record['output'] = result.output
+    record['ms'] = round(result.seconds * 1e3, 3)
+    return record
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='codeeditor',
+                                     description='Apply an edit plan to files, one JSON result line per file.')
+    parser.add_argument('patterns', nargs='*', help="Files or glob patterns ('**' recurses)")
+    parser.add_argument('-p', '--plan', default='-', help='Plan file, JSON or JSONL (default: stdin)')
+    parser.add_argument('--files-from', metavar='FILE',
+                        help="Read more paths from FILE, one per line ('-' for stdin)")
+    parser.add_argument('-l', '--language', help='Language of the files (default: from the plan '
+                                                 'or the first file extension)')
+    parser.add_argument('-j', '--workers', type=int, help='Worker processes (default: CPU count)')
+    parser.add_argument('--chunksize', type=int, default=16, help='Files sent to a worker at a time')
+    parser.add_argument('--unordered', action='store_true',
+                        help='Print results as they finish instead of in input order')
+    parser.add_argument('--compose', action='store_true', help='Apply each plan as one merged pass')
+    parser.add_argument('--dry-run', action='store_const', const='diff',
+                        help='Write nothing; report each diff')
+    parser.add_argument('--spans', dest='dry_run', action='store_const', const='spans',
+                        help='Write nothing; report the changed spans')
+    where = parser.add_mutually_exclusive_group()
+    where.add_argument('--in-place', action='store_true', help='Overwrite the input files')
+    where.add_argument('--output-dir', help='Write edited files under this directory, mirroring --root')
+    parser.add_argument('--root', default='.', help='Directory paths are mirrored from (default: .)')
+    parser.add_argument('--cache', help='AnalysisCache database shared by the workers')
+    args = parser.parse_args(argv)
+
+    if args.plan == '-' and args.files_from == '-':
+        parser.error('the plan and --files-from cannot both be read from stdin')
+    if not args.patterns and not args.files_from:
+        parser.error('no files given; pass glob patterns or --files-from')
+    try:
+        if args.plan == '-':
+            edits, options = load_plan(sys.stdin)
+        else:
+            with open(args.plan, encoding='utf-8') as f:
+                edits, options = load_plan(f)
+    except (OSError, ValueError) as ex:
+        parser.error(f'cannot read plan: {ex}')
+
+    files_from = None
+    if args.files_from == '-':
+        files_from = sys.stdin
+    elif args.files_from:
+        files_from = open(args.files_from, encoding='utf-8')
+    paths = iter_paths(args.patterns, files_from)
+
+    language = args.language or options.get('language')
+    if language is None:
+        first = next(paths, None)
+        if first is None:
+            return 0
+        language = language_for(first)
+        if language is None:
+            parser.error(f'cannot tell the language of {first}; pass --language')
+        paths = chain([first], paths)
+    if language.lower() not in MultiLangEditorFactory.SUPPORTED_LANGUAGES:
+        parser.error(f'unsupported language: {language}')
+
+    output = None
+    if args.in_place:
+        output = InPlaceOutput()
+    elif args.output_dir:
+        output = MirrorOutput(args.output_dir, root=args.root)
+
+    start = time.perf_counter()
+    total = failed = 0
+    try:
+        results = apply_plan_to_files(edits, paths, language=language.lower(), workers=args.workers,
+                                      chunksize=args.chunksize, ordered=not args.unordered,
+                                      cache=args.cache, compose=args.compose or bool(options.get('compose')),
+                                      dry_run=args.dry_run or False, output=output)
+        for result in results:
+            total += 1
+            failed += not result.ok
+            sys.stdout.write(json.dumps(result_record(result, args.dry_run)) + '\n')
+            sys.stdout.flush()
+    except BrokenPipeError:
+        # The reader (e.g. `head`) is gone; stop quietly, without a second
+        # error when the interpreter flushes stdout on exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        if files_from is not None and files_from is not sys.stdin:
+            files_from.close()
+    print(f'codeeditor: {total} files, {failed} failed in {time.perf_counter() - start:.2f}s',
+          file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
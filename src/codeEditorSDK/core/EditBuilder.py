@@ -1,10 +1,9 @@
 from pathlib import Path
-from tree_sitter import Parser
-from tree_sitter_languages import get_language
 from codeEditorSDK.utils.indent import IndentHelper
 from codeEditorSDK.utils.validation import SyntaxValidator
 from typing import Optional, List, Dict, Any
 from codeEditorSDK.core.codeEditor import CodeFileEditor
+from codeEditorSDK.core.document import Source
 
 import re
 import os
@@ -14,7 +13,7 @@ class EditBuilder:
     A builder class for constructing a chain of editing operations
     to be applied in batch to a CodeFileEditor instance.
     """
-    def __init__(self, editor: CodeFileEditor, file_path: str):
+    def __init__(self, editor: CodeFileEditor, file_path: Source):
         self.editor = editor
         self.file_path = file_path
         self.edits: List[Dict[str, Any]] = []
@@ -44,6 +43,18 @@ class EditBuilder:
         })
         return self
 
+    def rename_many(self,
+                    mapping: Dict[str, str],
+                    func: Optional[str] = None,
+                    include_param: bool = True) -> 'EditBuilder':
+        """Rename several variables in one pass; swaps such as {'a': 'b', 'b': 'a'} are allowed."""
+        self.edits.append({
+            "op": "rename_many",
+            "args": {"mapping": dict(mapping), "include_param": include_param},
+            "scope": {"func": func}
+        })
+        return self
+
     def change_type(self,
                     from_type: str,
                     to_type: str,
@@ -68,6 +79,51 @@ class EditBuilder:
         })
         return self
 
+    def unroll_loops(self,
+                     factor: int = 4,
+                     func: Optional[str] = None,
+                     lines: Optional[List[int]] = None) -> 'EditBuilder':
+        """Unroll every counted loop with a remainder loop, optionally only those starting on the given lines."""
+        self.edits.append({
+            "op": "unroll_loops",
+            "args": {"factor": factor, "lines": list(lines) if lines is not None else None},
+            "scope": {"func": func}
+        })
+        return self
+
+    def hoist_invariants(self,
+                         func: Optional[str] = None,
+                         lines: Optional[List[int]] = None) -> 'EditBuilder':
+        """Hoist loop-invariant arithmetic into temporaries before each loop."""
+        self.edits.append({
+            "op": "hoist_invariants",
+            "args": {"lines": list(lines) if lines is not None else None},
+            "scope": {"func": func}
+        })
+        return self
+
+    def fuse_loops(self, func: Optional[str] = None) -> 'EditBuilder':
+        """Fuse adjacent independent loops with identical headers."""
+        self.edits.append({
+            "op": "fuse_loops",
+            "args": {},
+            "scope": {"func": func}
+        })
+        return self
+
+    def tile_loops(self,
+                   tile=32,
+                   func: Optional[str] = None,
+                   lines: Optional[List[int]] = None) -> 'EditBuilder':
+        """Tile perfect loop nests; tile is one size or a list with one size per level."""
+        self.edits.append({
+            "op": "tile_loops",
+            "args": {"tile": tile if isinstance(tile, int) else list(tile),
+                     "lines": list(lines) if lines is not None else None},
+            "scope": {"func": func}
+        })
+        return self
+
     def condition_operator_swap(self,
                                  old_op: str,
                                  new_op: str,
@@ -132,6 +188,39 @@ class EditBuilder:
         })
         return self
 
-    def apply(self) -> 'CodeFileEditor':
-        """Apply all recorded edit operations to the CodeFileEditor."""
-        return self.editor.apply_edits(self.file_path, self.edits)
\ No newline at end of file
+    def apply(self, compose: bool = False, dry_run=False) -> 'CodeFileEditor':
+        """
+        Apply all recorded edit operations to the CodeFileEditor.
+        The file is loaded once and written once; when the builder was
+        given a Document, that Document is updated in memory instead.
+        :param compose: Merge the spans of all ops and validate once (see apply_edits)
+        :param dry_run: Return a unified diff (True/"diff") or Change spans ("spans")
+            and write nothing
+        """
+        return self.editor.apply_edits(self.file_path, self.edits,
+                                       compose=compose, dry_run=dry_run)
+
+    async def apply_async(self, compose: bool = False, dry_run=False,
+                          timeout: Optional[float] = None, editor=None):
+        """
+        Coroutine version of apply() that runs on a worker thread,
+        so the event loop keeps serving other requests meanwhile.
+        :param timeout: Seconds before asyncio.TimeoutError; a plan still
+            running then is not written
+        :param editor: AsyncCodeFileEditor to run on (default: one shared per
+            CodeFileEditor, with the same cache, output and metrics)
+        """
+        if editor is None:
+            from codeEditorSDK.core.aio import shared_async_editor
+            editor = shared_async_editor(self.editor)
+        return await editor.apply_edits(self.file_path, self.edits, compose=compose,
+                                        dry_run=dry_run, timeout=timeout)
+
+    def apply_to_files(self, paths, workers: Optional[int] = None, ordered: bool = True, **kwargs):
+        """
+        Apply the recorded plan to many files in parallel.
+        See codeEditorSDK.core.batch.apply_plan_to_files for the options.
+        :return: Iterator of FileResult, streamed as files finish
+        """
+        from codeEditorSDK.core.batch import apply_plan_to_files
+        return apply_plan_to_files(self, paths, workers=workers, ordered=ordered, **kwargs)
\ No newline at end of file
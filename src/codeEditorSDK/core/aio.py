@@ -0,0 +1,170 @@
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+import asyncio
+import os
+import queue
+import sys
+import threading
+import weakref
+
+from codeEditorSDK.core.codeEditor import CodeFileEditor
+from codeEditorSDK.core.document import Source
+from codeEditorSDK.core.output import OutputPolicy, SuffixOutput
+
+
+class _CancellableOutput(OutputPolicy):
+    """Output policy that refuses to write once the running request was cancelled"""
+
+    def __init__(self, policy: OutputPolicy, state: threading.local):
+        self.policy = policy
+        self.state = state
+
+    def write(self, source_path: str, content: str, suffix: str) -> str:
+        cancelled = getattr(self.state, 'cancelled', None)
+        if cancelled is not None and cancelled.is_set():
+            raise CancelledError(f"Request cancelled before writing {source_path}")
+        return self.policy.write(source_path, content, suffix)
+
+
+def _async_op(name: str):
+    """Coroutine method running CodeFileEditor.<name> on the worker pool"""
+    async def op(self, *args, timeout: Optional[float] = None, **kwargs):
+        return await self.run(name, *args, timeout=timeout, **kwargs)
+    op.__name__ = name
+    op.__qualname__ = f"AsyncCodeFileEditor.{name}"
+    op.__doc__ = f"Async CodeFileEditor.{name}; accepts an extra timeout in seconds"
+    return op
+
+
+class AsyncCodeFileEditor:
+    """
+    asyncio front end for CodeFileEditor.
+    Every call runs on a bounded thread pool, so file reads, parsing and
+    writes never block the event loop and I/O of many requests overlaps.
+    The workers share one thread-safe CodeFileEditor, each parsing with
+    its own thread's parser. Calls take the same arguments as the
+    CodeFileEditor methods plus an optional timeout.
+
+    Cancelling a call, or reaching its timeout, drops it if it has not
+    started yet; a call already running finishes its work in the
+    background but skips writing its output unless the write had already
+    begun. A Document must not be passed to two calls running at the
+    same time.
+    """
+    def __init__(self, language: str, max_workers: Optional[int] = None,
+                 timeout: Optional[float] = None, cache=None,
+                 incremental_validation: bool = False,
+                 output: Optional[OutputPolicy] = None, metrics=None):
+        """
+        :param language: Programming language, as for CodeFileEditor
+        :param max_workers: Worker threads (default: min(4, CPU count)). Parsing
+            holds the GIL, so more threads add little throughput and make the
+            event loop wait longer between turns
+        :param timeout: Default per-request timeout in seconds (None waits forever)
+        :param cache, incremental_validation, output, metrics: Passed to the
+            shared CodeFileEditor
+        """
+        self.language = language
+        self.timeout = timeout
+        self._state = threading.local()
+        self.editor = CodeFileEditor(language, cache=cache,
+                                     incremental_validation=incremental_validation,
+                                     output=_CancellableOutput(output or SuffixOutput(), self._state),
+                                     metrics=metrics)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or min(4, os.cpu_count() or 1),
+            thread_name_prefix=f'codeeditor-{language}')
+
+    @classmethod
+    def from_editor(cls, editor: CodeFileEditor, **kwargs) -> 'AsyncCodeFileEditor':
+        """Async editor with the same language, cache, output and metrics as editor"""
+        kwargs.setdefault('cache', editor.cache)
+        kwargs.setdefault('incremental_validation', editor.incremental_validation)
+        kwargs.setdefault('output', editor.output)
+        kwargs.setdefault('metrics', editor.metrics)
+        return cls(editor.language, **kwargs)
+
+    async def run(self, op: str, *args, timeout: Optional[float] = None, **kwargs):
+        """
+        Run any CodeFileEditor method by name on the worker pool.
+        :param timeout: Seconds to wait, including time queued (default: self.timeout)
+        :raises asyncio.TimeoutError: When the timeout is reached
+        """
+        cancelled = threading.Event()
+
+        def call():
+            if cancelled.is_set():
+                raise CancelledError()
+            self._state.cancelled = cancelled
+            try:
+                return getattr(self.editor, op)(*args, **kwargs)
+            finally:
+                self._state.cancelled = None
+
+        future = asyncio.get_running_loop().run_in_executor(self._executor, call)
+        try:
+            return await asyncio.wait_for(future, timeout if timeout is not None else self.timeout)
+        except BaseException:
+            # Timeout or cancellation: keep a running call from writing its output
+            cancelled.set()
+            raise
+
+    load = _async_op('load')
+    commit = _async_op('commit')
+    query = _async_op('query')
+    insert = _async_op('insert')
+    smart_insert = _async_op('smart_insert')
+    delete = _async_op('delete')
+    update = _async_op('update')
+    swap_operator = _async_op('swap_operator')
+    rename_var = _async_op('rename_var')
+    rename_many = _async_op('rename_many')
+    change_type = _async_op('change_type')
+    unroll_loop = _async_op('unroll_loop')
+    unroll_loops = _async_op('unroll_loops')
+    hoist_invariants = _async_op('hoist_invariants')
+    fuse_loops = _async_op('fuse_loops')
+    tile_loops = _async_op('tile_loops')
+    swap_condition_operator = _async_op('swap_condition_operator')
+
+    async def apply_edits(self, file_path: Source, edits: List[Dict[str, Any]],
+                          compose: bool = False, dry_run=False,
+                          timeout: Optional[float] = None):
+        """Async CodeFileEditor.apply_edits; accepts an extra timeout in seconds"""
+        return await self.run('apply_edits', file_path, edits, compose=compose,
+                              dry_run=dry_run, timeout=timeout)
+
+    def close(self, wait: bool = True) -> None:
+        """Stop the worker pool; queued requests are cancelled"""
+        if sys.version_info >= (3, 9):
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            return
+        # shutdown() has no cancel_futures before 3.9: drain the queue first
+        while True:
+            try:
+                item = self._executor._work_queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                item.future.cancel()
+        self._executor.shutdown(wait=wait)
+
+    async def __aenter__(self) -> 'AsyncCodeFileEditor':
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+
+# Async editors behind EditBuilder.apply_async, one per synchronous editor
+_shared: "weakref.WeakKeyDictionary[CodeFileEditor, AsyncCodeFileEditor]" = weakref.WeakKeyDictionary()
+_shared_lock = threading.Lock()
+
+
+def shared_async_editor(editor: CodeFileEditor) -> AsyncCodeFileEditor:
+    """The async editor mirroring editor's settings, created on first use"""
+    with _shared_lock:
+        async_editor = _shared.get(editor)
+        if async_editor is None:
+            async_editor = _shared[editor] = AsyncCodeFileEditor.from_editor(editor)
+        return async_editor
@@ -0,0 +1,146 @@
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional
+import os
+import time
+
+
+class FileResult(NamedTuple):
+    """Outcome of applying a plan to one file"""
+    path: str
+    # Written path, or the diff (or spans) of a dry run
+    output: Any = None
+    error: Optional[str] = None
+    # Wall time spent on this file in the worker
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+# Per-process state, set once by _init_worker so every task reuses a warm editor
+_worker_editor = None
+_worker_edits: List[Dict[str, Any]] = []
+_worker_options: Dict[str, Any] = {}
+
+
+def _make_editor(language: str, cache: Optional[str] = None, output=None):
+    """(editor, opened AnalysisCache or None) for one worker"""
+    if cache is None and output is None:
+        from codeEditorSDK.factories import MultiLangEditorFactory
+        return MultiLangEditorFactory.get_editor(language), None
+    from codeEditorSDK.core.cache import AnalysisCache
+    from codeEditorSDK.core.codeEditor import CodeFileEditor
+    opened = AnalysisCache(cache) if cache else None
+    return CodeFileEditor(language, cache=opened, output=output), opened
+
+
+def _init_worker(language: str, edits: List[Dict[str, Any]], cache: Optional[str] = None,
+                 options: Optional[Dict[str, Any]] = None, output=None) -> None:
+    global _worker_editor, _worker_edits, _worker_options
+    _worker_editor, _ = _make_editor(language, cache, output)
+    _worker_edits = edits
+    _worker_options = options or {}
+
+
+def _run_chunk(paths: List[str]) -> List[FileResult]:
+    return _apply_chunk(_worker_editor, _worker_edits, _worker_options, paths)
+
+
+def _apply_chunk(editor, edits: List[Dict[str, Any]], options: Dict[str, Any],
+                 paths: List[str]) -> List[FileResult]:
+    results = []
+    for path in paths:
+        start = time.perf_counter()
+        try:
+            output = editor.apply_edits(path, edits, **options)
+            results.append(FileResult(path, output=output, seconds=time.perf_counter() - start))
+        except Exception as ex:
+            results.append(FileResult(path, error=f"{type(ex).__name__}: {ex}",
+                                      seconds=time.perf_counter() - start))
+    return results
+
+
+def _chunks(paths: Iterable[str], size: int) -> Iterator[List[str]]:
+    it = iter(paths)
+    while True:
+        chunk = [str(p) for p in islice(it, size)]
+        if not chunk:
+            return
+        yield chunk
+
+
+def apply_plan_to_files(plan,
+                        paths: Iterable[str],
+                        language: Optional[str] = None,
+                        workers: Optional[int] = None,
+                        chunksize: int = 16,
+                        ordered: bool = True,
+                        max_pending: Optional[int] = None,
+                        cache: Optional[str] = None,
+                        compose: bool = False,
+                        dry_run=False,
+                        output=None) -> Iterator[FileResult]:
+    """
+    Apply one edit plan to many files on a process pool.
+    :param plan: An EditBuilder, or a list of edits in the apply_edits format
+    :param paths: Any iterable of file paths; it is consumed lazily
+    :param language: Required when plan is a plain list of edits
+    :param workers: Process count (defaults to the CPU count); 1 runs in this process
+    :param chunksize: Files sent to a worker per task
+    :param ordered: Yield results in input order, or as soon as each chunk finishes
+    :param max_pending: Chunks in flight at once (defaults to 2 per worker), bounding memory
+    :param cache: Path of an AnalysisCache database shared by all workers
+    :param compose: Apply each file's plan as one merged set of spans
+    :param dry_run: Write nothing; each FileResult.output holds the diff (or spans)
+    :param output: OutputPolicy for the written files, e.g. InPlaceOutput() or
+        MirrorOutput("out"); it is pickled to each worker
+    :return: Iterator of FileResult, one per path; failures are reported, not raised
+    """
+    edits = getattr(plan, "edits", plan)
+    if language is None:
+        editor = getattr(plan, "editor", None)
+        if editor is None:
+            raise ValueError("language is required when plan is a list of edits")
+        language = editor.language
+    options = {"compose": compose, "dry_run": dry_run}
+    workers = workers or os.cpu_count() or 1
+    if chunksize <= 0:
+        raise ValueError("chunksize must be a positive integer")
+
+    if workers == 1:
+        editor, opened = _make_editor(language, cache, output)
+        try:
+            for chunk in _chunks(paths, chunksize):
+                yield from _apply_chunk(editor, edits, options, chunk)
+        finally:
+            if opened is not None:
+                opened.close()
+        return
+
+    max_pending = max_pending or workers * 2
+    chunks = _chunks(paths, chunksize)
+    with ProcessPoolExecutor(max_workers=workers,
+                             initializer=_init_worker,
+                             initargs=(language, edits, cache, options, output)) as pool:
+        pending = deque(pool.submit(_run_chunk, c) for c in islice(chunks, max_pending))
+        try:
+            while pending:
+                if ordered:
+                    done = [pending.popleft()]
+                else:
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    done = [f for f in pending if f in finished]
+                    for f in done:
+                        pending.remove(f)
+                # Refill before yielding so workers stay busy while the caller consumes
+                for chunk in islice(chunks, len(done)):
+                    pending.append(pool.submit(_run_chunk, chunk))
+                for future in done:
+                    yield from future.result()
+        finally:
+            # Stop queued work if the caller abandons the iterator early
+            for future in pending:
+                future.cancel()
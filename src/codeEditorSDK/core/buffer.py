@@ -0,0 +1,110 @@
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+
+class PieceTable:
+    """
+    Byte buffer made of pieces of the original text and an append-only
+    add buffer. Replacements locate their pieces by bisection and rebuild
+    only the piece list, so no text is copied until getvalue() is
+    called. The parser can read it piecewise through read().
+    """
+    _ORIGINAL, _ADDED = 0, 1
+
+    def __init__(self, data: bytes = b''):
+        self._original = bytes(data)
+        self._added = bytearray()
+        # (buffer, start, length) triples and the end offset of each piece
+        self._pieces: List[Tuple[int, int, int]] = [(self._ORIGINAL, 0, len(data))] if data else []
+        self._ends: List[int] = [len(data)] if data else []
+        self._value: Optional[bytes] = self._original
+
+    def __len__(self) -> int:
+        return self._ends[-1] if self._ends else 0
+
+    def _buffer(self, which: int):
+        return self._original if which == self._ORIGINAL else self._added
+
+    def _pieces_between(self, start: int, end: int) -> Iterator[Tuple[int, int, int]]:
+        """Pieces (clipped) covering [start, end)"""
+        i = bisect_right(self._ends, start)
+        while i < len(self._pieces) and start < end:
+            which, p_start, length = self._pieces[i]
+            piece_start = self._ends[i] - length
+            lo = start - piece_start
+            hi = min(end, self._ends[i]) - piece_start
+            yield which, p_start + lo, hi - lo
+            start = self._ends[i]
+            i += 1
+
+    def replace(self, start: int, end: int, data: bytes) -> None:
+        """Replace the byte range [start, end) with data"""
+        self.replace_many([(start, end, data)])
+
+    def replace_many(self, spans: Iterable[Tuple[int, int, bytes]]) -> None:
+        """
+        Replace several sorted, non-overlapping byte ranges given in current
+        offsets. The piece list is rebuilt in one pass, so k spans cost
+        O(pieces + k log pieces) rather than k full splices.
+        """
+        pieces: List[Tuple[int, int, int]] = []
+        cursor = 0
+        for start, end, data in spans:
+            if not cursor <= start <= end <= len(self):
+                raise ValueError(f"Span out of range or out of order: ({start}, {end})")
+            pieces.extend(self._pieces_between(cursor, start))
+            if data:
+                pieces.append((self._ADDED, len(self._added), len(data)))
+                self._added += data
+            cursor = end
+        pieces.extend(self._pieces_between(cursor, len(self)))
+        self._pieces = pieces
+        self._ends = list(accumulate(n for _, _, n in pieces))
+        self._value = None
+
+    def slice(self, start: int, end: int) -> bytes:
+        """Bytes in [start, end) without materializing the whole buffer"""
+        if self._value is not None:
+            return self._value[start:end]
+        out = []
+        i = bisect_right(self._ends, start)
+        while i < len(self._pieces) and start < end:
+            which, p_start, length = self._pieces[i]
+            piece_start = self._ends[i] - length
+            lo = p_start + start - piece_start
+            hi = p_start + min(end, self._ends[i]) - piece_start
+            out.append(self._buffer(which)[lo:hi])
+            start = self._ends[i]
+            i += 1
+        return b''.join(out)
+
+    def read(self, offset: int, point=None) -> bytes:
+        """Read callback for Parser.parse: the rest of the piece at offset"""
+        if self._value is not None:
+            return self._value[offset:]
+        i = bisect_right(self._ends, offset)
+        if i == len(self._pieces):
+            return b''
+        which, p_start, length = self._pieces[i]
+        lo = p_start + offset - (self._ends[i] - length)
+        return bytes(self._buffer(which)[lo:p_start + length])
+
+    @property
+    def piece_count(self) -> int:
+        return len(self._pieces)
+
+    @property
+    def materialized(self) -> bool:
+        """Whether getvalue() is free"""
+        return self._value is not None
+
+    def getvalue(self) -> bytes:
+        """The full text; pieces are collapsed so later edits start from one piece"""
+        if self._value is None:
+            self._value = b''.join(bytes(self._buffer(w)[s:s + n]) for w, s, n in self._pieces)
+            self._original = self._value
+            self._added = bytearray()
+            self._pieces = [(self._ORIGINAL, 0, len(self._value))] if self._value else []
+            self._ends = [len(self._value)] if self._value else []
+        return self._value
@@ -0,0 +1,156 @@
+from array import array
+from typing import Any, Dict, Optional
+import json
+import os
+import sqlite3
+import threading
+import time
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS analysis (
+    key      TEXT PRIMARY KEY,
+    valid    INTEGER,
+    symbols  TEXT,
+    lines    BLOB,
+    indent   TEXT,
+    size     INTEGER NOT NULL DEFAULT 0,
+    created  REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS analysis_accessed ON analysis (accessed);
+"""
+
+
+class AnalysisCache:
+    """
+    On-disk cache of per-file analysis, keyed by content hash and language.
+    Stores what the editor derives from a parse (validation result, symbol
+    index, line offsets, indent unit) so unchanged files skip that work on
+    the next run. Backed by SQLite, so several worker processes can share one;
+    threads of one process share its connection and take turns on it.
+    """
+    def __init__(self, path: str,
+                 max_entries: Optional[int] = 100_000,
+                 max_bytes: Optional[int] = None,
+                 max_age: Optional[float] = None,
+                 evict_every: int = 256):
+        """
+        :param path: SQLite database file (created if missing)
+        :param max_entries: Keep at most this many records (least recently used go first)
+        :param max_bytes: Keep the stored payload under this many bytes
+        :param max_age: Drop records not used for this many seconds
+        :param evict_every: Run eviction after this many writes
+        """
+        self.path = str(path)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.evict_every = evict_every
+        self._writes = 0
+        self._lock = threading.Lock()
+        parent = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(parent, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=30, isolation_level=None,
+                                     check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self.evict()
+
+    @staticmethod
+    def _key(digest: str, language: str) -> str:
+        return f"{language}:{digest}"
+
+    def get(self, digest: str, language: str) -> Optional[Dict[str, Any]]:
+        """Cached analysis for a content hash, or None"""
+        key = self._key(digest, language)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT valid, symbols, lines, indent FROM analysis WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE analysis SET accessed = ? WHERE key = ?", (time.time(), key))
+        valid, symbols, lines, indent = row
+        record: Dict[str, Any] = {
+            "valid": None if valid is None else bool(valid),
+            "symbols": json.loads(symbols) if symbols else None,
+            "lines": None,
+            "indent": indent,
+        }
+        if lines is not None:
+            offsets = array('q')
+            offsets.frombytes(lines)
+            record["lines"] = offsets
+        return record
+
+    def put(self, digest: str, language: str,
+            valid: Optional[bool] = None,
+            symbols: Optional[dict] = None,
+            lines=None,
+            indent: Optional[str] = None) -> None:
+        """Store analysis for a content hash; fields left as None keep their cached value"""
+        symbols_json = json.dumps(symbols, separators=(',', ':')) if symbols is not None else None
+        lines_blob = array('q', lines).tobytes() if lines is not None else None
+        size = len(symbols_json or '') + len(lines_blob or b'') + len(indent or '')
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO analysis (key, valid, symbols, lines, indent, size, created, accessed)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    valid = COALESCE(excluded.valid, valid),
+                    symbols = COALESCE(excluded.symbols, symbols),
+                    lines = COALESCE(excluded.lines, lines),
+                    indent = COALESCE(excluded.indent, indent),
+                    size = MAX(size, excluded.size),
+                    accessed = excluded.accessed
+                """,
+                (self._key(digest, language), None if valid is None else int(valid),
+                 symbols_json, lines_blob, indent, size, now, now),
+            )
+            self._writes += 1
+            due = self.evict_every and self._writes % self.evict_every == 0
+        if due:
+            self.evict()
+
+    def evict(self) -> None:
+        """Apply the age, entry-count and size limits"""
+        with self._lock:
+            self._evict()
+
+    def _evict(self) -> None:
+        if self.max_age is not None:
+            self._conn.execute("DELETE FROM analysis WHERE accessed < ?",
+                               (time.time() - self.max_age,))
+        if self.max_entries is not None:
+            self._conn.execute(
+                """DELETE FROM analysis WHERE key IN (
+                       SELECT key FROM analysis ORDER BY accessed DESC LIMIT -1 OFFSET ?)""",
+                (self.max_entries,))
+        if self.max_bytes is not None:
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM analysis").fetchone()[0]
+            if total > self.max_bytes:
+                rows = self._conn.execute(
+                    "SELECT key, size FROM analysis ORDER BY accessed").fetchall()
+                stale = []
+                for key, size in rows:
+                    if total <= self.max_bytes:
+                        break
+                    stale.append((key,))
+                    total -= size
+                self._conn.executemany("DELETE FROM analysis WHERE key = ?", stale)
+
+    def clear(self) -> None:
+        """Remove every record"""
+        with self._lock:
+            self._conn.execute("DELETE FROM analysis")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM analysis").fetchone()[0]
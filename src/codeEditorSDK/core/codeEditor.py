@@ -1,39 +1,163 @@
 from pathlib import Path
-from tree_sitter import Parser
-from tree_sitter_languages import get_language
 from codeEditorSDK.utils.indent import IndentHelper
 from codeEditorSDK.utils.validation import SyntaxValidator
-from typing import Optional, List, Dict, Any
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional, List, Dict, Any
 from codeEditorSDK.utils.ASTUnrollHelper import ASTUnrollHelper
+from codeEditorSDK.utils.languages import ThreadParser
+from codeEditorSDK.utils.loop_transforms import LoopTransformer
+from codeEditorSDK.utils.mutants import Mutant, MutantGenerator
+from codeEditorSDK.utils.metrics import NullMetrics, instrumented
+from codeEditorSDK.utils.queries import MEMBER_FIELDS, capture_nodes
+from codeEditorSDK.core.compositor import EditCompositor
+from codeEditorSDK.core.document import Document, Source, TextEdit
+from codeEditorSDK.core.lines import read_lines
+from codeEditorSDK.core.output import OutputPolicy, SuffixOutput
+from codeEditorSDK.core.symbols import FunctionSymbol, SymbolIndex
 import re
 
 
 import os
 
+if TYPE_CHECKING:
+    # Only needed for annotations; sqlite3 is loaded when a cache is created
+    from codeEditorSDK.core.cache import AnalysisCache
+
 class CodeFileEditor:
-    def __init__(self, language: str):
+    """
+    Edits source files with Tree-sitter. An editor holds no per-call state
+    and leases a parser per thread, so one instance may be shared by many
+    threads; a Document must still be used by one call at a time.
+    """
+    parser = ThreadParser()
+
+    def __init__(self, language: str, cache: Optional['AnalysisCache'] = None,
+                 incremental_validation: bool = False,
+                 output: Optional[OutputPolicy] = None,
+                 metrics=None):
         """
         Initialize a file-level code editor.
         :param language: Programming language (supported: python, java, cpp, javascript, etc.)
+        :param cache: Optional on-disk analysis cache shared across runs
+        :param incremental_validation: Only check the regions each operation changed,
+            so errors a file already had do not fail later operations
+        :param output: Where edited files go (default: sibling file with the op suffix)
+        :param metrics: Per-phase timing and counters, e.g. utils.metrics.Metrics()
+            (default: NullMetrics, which records nothing)
         """
         self.language = language
-        self.parser: Optional[Parser] = None
+        self.cache = cache
+        self.incremental_validation = incremental_validation
+        self.output = output or SuffixOutput()
+        self.metrics = metrics or NullMetrics()
         self.indent_helper = IndentHelper(language)
         self.validator = SyntaxValidator(language)
         self.unroller = ASTUnrollHelper(language)
-        self._init_parser()
+        self.loop_transformer = LoopTransformer(self.unroller)
+        self.mutant_generator = MutantGenerator(self.validator)
+        # The grammar (and tree_sitter itself) is loaded by the first parse
 
+    @instrumented("load")
+    def load(self, file_path: str) -> Document:
+        """
+        Open a file as an in-memory Document.
+        The file is read once and parsed when an operation first needs the
+        tree; operations given the Document update it in place and nothing
+        is written until commit().
+        """
+        with self.metrics.timer("read"):
+            source = Path(file_path).read_bytes()
+        self.metrics.count("bytes_read", len(source))
+        return Document(source.decode('utf8'), path=str(file_path))
 
-        
-    def _init_parser(self):
-        """Initialize the syntax parser"""
-        try:
-            # create instance of Parser
-            self.parser = Parser()
-            # use get_language to get the language parser
-            self.parser.set_language(get_language(self.language))
-        except Exception as e:
-            raise RuntimeError(f"Parser initialization failed: {str(e)}")   
+    @instrumented("commit")
+    def commit(self, doc: Document, suffix: str = "_chained", file_path: Optional[str] = None) -> str:
+        """
+        Write a Document's current text to disk.
+        :param file_path: Path used to derive the output name (defaults to the Document's path)
+        :return: Path to the written file
+        """
+        target = file_path or doc.path
+        if target is None:
+            raise ValueError("Document has no path; pass file_path to commit()")
+        return self._write_new(str(target), doc.text, suffix)
+
+    def _open(self, source: Source) -> Document:
+        """Return the Document for source, loading it from disk if a path was given"""
+        if isinstance(source, Document):
+            return source
+        return self.load(source)
+
+    def _tree(self, doc: Document):
+        """
+        The Document's syntax tree, parsed on first use and reparsed
+        incrementally after text edits made through Document.apply()
+        """
+        if doc.tree is None or doc.tree.root_node.has_changes:
+            with self.metrics.timer("parse"):
+                if doc.tree is None:
+                    doc.tree = self.parser.parse(doc.parse_input())
+                else:
+                    doc.tree = self.parser.parse(doc.parse_input(), doc.tree)
+            self.metrics.count("parses")
+            self.metrics.count("bytes_parsed", doc.size)
+        return doc.tree
+
+    def symbols(self, doc: Document) -> SymbolIndex:
+        """Symbol index of the Document's current tree, rebuilt lazily after edits"""
+        if doc.symbols is None and self.cache is not None:
+            with self.metrics.timer("locate"):
+                record = self.cache.get(doc.digest, self.language)
+            if record and record["symbols"] is not None:
+                doc.symbols = SymbolIndex.from_dict(self.language, record["symbols"])
+                doc.line_starts = record["lines"]
+                doc.indent_unit = record["indent"]
+        if doc.symbols is None:
+            tree = self._tree(doc)
+            with self.metrics.timer("locate"):
+                doc.symbols = SymbolIndex.build(self.language, tree, doc.source)
+            if self.cache is not None:
+                doc.point(0)  # fills doc.line_starts
+                self.cache.put(doc.digest, self.language,
+                               symbols=doc.symbols.to_dict(),
+                               lines=doc.line_starts,
+                               indent=self._indent_unit(doc))
+        return doc.symbols
+
+    def _indent_unit(self, doc: Document) -> str:
+        """One indentation step of the Document, detected once per text"""
+        if doc.indent_unit is None:
+            doc.indent_unit = self.indent_helper.detect_indent_unit(doc.text)
+        return doc.indent_unit
+
+    def _find_function(self, doc: Document, func: str, file_path: Source) -> FunctionSymbol:
+        """Indexed function by plain or qualified name"""
+        symbol = self.symbols(doc).lookup(func)
+        if symbol is None:
+            raise ValueError(f"Function '{func}' not found in {file_path}")
+        return symbol
+
+    def _regex_edits(self, doc: Document, pattern: str, repl: str,
+                     start_byte: int = 0, end_byte: Optional[int] = None) -> List[TextEdit]:
+        """
+        Find every match of pattern between two byte offsets and return
+        the replacement edits, in document byte offsets.
+        """
+        end_byte = doc.size if end_byte is None else end_byte
+        with self.metrics.timer("locate"):
+            region = doc.slice(start_byte, end_byte)
+            ascii_only = region.isascii()
+            edits = []
+            char_pos, byte_pos = 0, start_byte
+            for m in re.finditer(pattern, region):
+                if ascii_only:
+                    s, e = start_byte + m.start(), start_byte + m.end()
+                else:
+                    byte_pos += len(region[char_pos:m.start()].encode('utf8'))
+                    s = byte_pos
+                    e = s + len(m.group(0).encode('utf8'))
+                    char_pos, byte_pos = m.end(), e
+                edits.append(TextEdit(s, e, repl))
+        return edits
 
     def _apply_language_rules(self, lines: list, insert_pos: int, base_indent: str) -> str:
         """
@@ -59,74 +183,68 @@ class CodeFileEditor:
                     return base_indent + '    '
         return base_indent
 
-    def smart_insert(self, file_path: str, code: str) -> str:
+    @instrumented("smart_insert")
+    def smart_insert(self, file_path: Source, code: str):
         """
         Smart insert: auto detects the insertion point in a method body.
-        Return the new file path with "_inserted" suffix.
-        """
-        path = Path(file_path)
-        source_code = path.read_text(encoding="utf-8")
-        tree = self.parser.parse(bytes(source_code, "utf8"))
-        root = tree.root_node
-        lines = source_code.splitlines()
-
-        def find_method_body_insert_line(node):
-            if self.language == "python":
-                target_type = "function_definition"
-                body_type = "block"
-            elif self.language in ["java", "cpp", "c"]:
-                target_type = "method_declaration" if self.language == "java" else "function_definition"
-                body_type = "block"
-            else:
-                return None
-
-            if node.type == target_type:
-                body = node.child_by_field_name("body")
-                if body and body.type == body_type:
-                    return body.start_point[0] + 1
-            for child in node.children:
-                result = find_method_body_insert_line(child)
-                if result is not None:
-                    return result
-            return None
-
-        insert_line = find_method_body_insert_line(root)
+        Return the new file path with "_inserted" suffix,
+        or the updated Document when given one.
+        """
+        doc = self._open(file_path)
+        root = self._tree(doc).root_node
+
+        if self.language == "python":
+            body_type = "block"
+        elif self.language == "java":
+            body_type = "block"
+        elif self.language in ["cpp", "c"]:
+            body_type = "compound_statement"
+        else:
+            body_type = None
+
+        insert_line = None
+        for func_node in (self.unroller.find_functions(root) if body_type else []):
+            body = func_node.child_by_field_name("body")
+            if body and body.type == body_type:
+                insert_line = body.start_point[0] + 1
+                break
         if insert_line is None:
-            raise RuntimeError("No legal insertion point foun" \
-            "" \
-            "d for smart_insert")
+            raise RuntimeError("No legal insertion point found for smart_insert")
 
-        # print(f"[DEBUG] smart_insert wrote to: {file_path}")
-    
-        return self.insert(file_path, insert_line + 1, code)
+        self.insert(doc, insert_line + 1, code)
+        if isinstance(file_path, Document):
+            return doc
+        return self._write_new(str(file_path), doc.text, "_inserted")
 
 
-    def insert(self, file_path: str, start_line: int, code: str) -> str:
+    @instrumented("insert")
+    def insert(self, file_path: Source, start_line: int, code: str):
         """
         Insert code at a specified line in the file, automatically adjusting indentation.
-        :param file_path: Path to the source code file
+        :param file_path: Path to the source code file, or an open Document
         :param start_line: Line number to insert before (1-based)
         :param code: Code snippet to insert
-        :return: Path to the new file with "_inserted" suffix
+        :return: Path to the new file with "_inserted" suffix (the Document when given one)
         """
-        path = Path(file_path)
+        doc = self._open(file_path)
         
-        # Read all lines with line breaks preserved
-        lines = path.read_text(encoding='utf-8').splitlines(True)
+        # Lines are looked up through the Document's line index
+        line_count = doc.line_count
         
         # Clamp the insert position to a valid line range (convert to 0-based index)
-        insert_pos = max(1, min(start_line, len(lines) + 1)) - 1
+        insert_pos = max(1, min(start_line, line_count + 1)) - 1
         
         # Look upward for the nearest non-empty line to infer base indentation
         ref_line_idx = insert_pos - 1
-        while ref_line_idx >= 0 and lines[ref_line_idx].strip() == '':
+        while ref_line_idx >= 0 and doc.line(ref_line_idx).strip() == '':
             ref_line_idx -= 1
+        ref_line = doc.line(ref_line_idx if ref_line_idx >= 0 else line_count - 1)
         
         # Determine the base indentation of the reference line
-        base_indent = self.indent_helper.detect_indent(lines[ref_line_idx]) if ref_line_idx >= 0 else ''
+        base_indent = self.indent_helper.detect_indent(ref_line) if ref_line_idx >= 0 else ''
         
         # If the reference line ends with a colon in Python, increase indentation
-        final_indent = base_indent + '    ' if self.language == 'python' and lines[ref_line_idx].rstrip().endswith(':') else base_indent
+        final_indent = base_indent + self._indent_unit(doc) if self.language == 'python' and ref_line.rstrip().endswith(':') else base_indent
         
         # Normalize the code to be inserted with proper indentation
         normalized_code = self.indent_helper.normalize_code_indent(code, final_indent)
@@ -134,58 +252,55 @@ class CodeFileEditor:
         # Ensure the inserted code ends with a newline
         formatted_code = normalized_code.rstrip('\n') + '\n'
         
-        # Insert the new code into the line list
-        new_lines = lines[:insert_pos] + [formatted_code] + lines[insert_pos:]
-        
-        # Combine lines back into a single string
-        new_content = ''.join(new_lines)
-        
-        # Validate syntax of the new code
-        self._assert_syntax(new_content, "insert")
+        # Insert the new code before the target line
+        offset, _ = doc.line_span(insert_pos, insert_pos)
+        edits = [TextEdit(offset, offset, formatted_code)]
         
-        # Write the modified content to a new file with "_inserted" suffix
-        return self._write_new(file_path, new_content, "_inserted")
+        # Validate syntax, then write to a new file with "_inserted" suffix
+        return self._finish(file_path, doc, edits, "insert", "_inserted")
  
-    def delete(self, file_path: str, start_line: int, end_line: int) -> str:
+    @instrumented("delete")
+    def delete(self, file_path: Source, start_line: int, end_line: int):
         """
         Delete code in a specified line range.
-        :param file_path: Target file path
+        :param file_path: Target file path, or an open Document
         :param start_line: Start line (inclusive)
         :param end_line: End line (inclusive)
         :return: New file path (original name + _deleted suffix)
         """
-        path = Path(file_path)
-        lines = path.read_text(encoding='utf-8').splitlines(True)
-        start = max(1, min(start_line, len(lines))) - 1
-        end = max(start + 1, min(end_line + 1, len(lines)))
-        new_lines = lines[:start] + lines[end:]
-        new_content = ''.join(new_lines)
-        self._assert_syntax(new_content, "delete")
-        return self._write_new(file_path, new_content, "_deleted")
-
-    def update(self, file_path: str, start_line: int, end_line: int, new_code: str) -> str:
+        doc = self._open(file_path)
+        line_count = doc.line_count
+        start = max(1, min(start_line, line_count)) - 1
+        end = max(start + 1, min(end_line + 1, line_count))
+        start_byte, end_byte = doc.line_span(start, end)
+        edits = [TextEdit(start_byte, end_byte, '')]
+        return self._finish(file_path, doc, edits, "delete", "_deleted")
+
+    @instrumented("update")
+    def update(self, file_path: Source, start_line: int, end_line: int, new_code: str):
         """
         Replace code in a specified line range (with automatic indentation).
-        :param file_path: Target file path
+        :param file_path: Target file path, or an open Document
         :param start_line: Start line (inclusive)
         :param end_line: End line (inclusive)
         :param new_code: New code content (can be multiline string)
         :return: New file path
         """
-        path = Path(file_path)
-        lines = path.read_text(encoding='utf-8').splitlines(True)
+        doc = self._open(file_path)
+        line_count = doc.line_count
 
-        start = max(1, min(start_line, len(lines))) - 1
-        end = max(start + 1, min(end_line + 1, len(lines)))
+        start = max(1, min(start_line, line_count)) - 1
+        end = max(start + 1, min(end_line + 1, line_count))
 
         ref_line_idx = start
-        while ref_line_idx >= 0 and lines[ref_line_idx].strip() == '':
+        while ref_line_idx >= 0 and doc.line(ref_line_idx).strip() == '':
             ref_line_idx -= 1
-        base_indent = self.indent_helper.detect_indent(lines[ref_line_idx]) if ref_line_idx >= 0 else ''
-        increase_indent = base_indent + '    '
+        ref_line = doc.line(ref_line_idx if ref_line_idx >= 0 else line_count - 1)
+        base_indent = self.indent_helper.detect_indent(ref_line) if ref_line_idx >= 0 else ''
+        increase_indent = base_indent + self._indent_unit(doc)
 
         # if the reference line is a Python function definition, increase indent
-        if self.language == 'python' and lines[ref_line_idx].strip().endswith(':'):
+        if self.language == 'python' and ref_line.strip().endswith(':'):
             indent_to_use = increase_indent
         else:
             indent_to_use = base_indent
@@ -196,167 +311,157 @@ class CodeFileEditor:
                         for i, line in enumerate(lines_to_insert)]
 
         # replace the specified range with formatted lines
-        new_lines = lines[:start] + formatted_lines + lines[end:]
-        new_content = ''.join(new_lines)
+        start_byte, end_byte = doc.line_span(start, end)
+        new_content = ''.join(formatted_lines)
+        edits = [TextEdit(start_byte, end_byte, new_content)]
 
-        try:
-            self._assert_syntax(new_content, "update")
-        except SyntaxError as e:
-            print("[DEBUG] Preview of update content:")
-            print(new_content)
-            raise
+        return self._finish(file_path, doc, edits, "update", "_updated")
 
-        return self._write_new(file_path, new_content, "_updated")
-    def query(self, file_path: str, start_line: int, end_line: int) -> str:
+    @instrumented("query")
+    def query(self, file_path: Source, start_line: int, end_line: int) -> str:
         """
         Query code in a specified line range.
-        :param file_path: Target file path
+        Files are read through an mmap and a cached line index,
+        so only the requested lines are decoded.
+        :param file_path: Target file path, or an open Document
         :param start_line: Start line (inclusive)
         :param end_line: End line (inclusive)
         :return: Code snippet as a string
         """
-        with open(file_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-        
-        start = max(1, min(start_line, len(lines)))
-        end = max(start, min(end_line, len(lines)))
-        
-        return ''.join(lines[start-1:end])
+        if not isinstance(file_path, Document):
+            with self.metrics.timer("read"):
+                return read_lines(str(file_path), start_line, end_line)
+        doc = file_path
+        count = doc.line_count
+        start = max(1, min(start_line, count))
+        end = max(start, min(end_line, count))
+        return doc.slice(*doc.line_span(start - 1, end))
     
 
     
 
-    def swap_operator(self, file_path: str, old: str, new: str, func: Optional[str]=None) -> str:
+    @instrumented("swap_operator")
+    def swap_operator(self, file_path: Source, old: str, new: str, func: Optional[str]=None):
         self.validator.validate_operator_replacement(old, new)
         
-        text = Path(file_path).read_text(encoding='utf-8')
+        doc = self._open(file_path)
+        text = doc.text
         if not func:
             # replace all occurrences in the file
             pattern = re.escape(old)
-            new_text = re.sub(pattern, new, text)
+            edits = self._regex_edits(doc, pattern, new)
             suffix = "_opswap"
         else:
             # based on function name, find the function body
-            tree = self.parser.parse(bytes(text, 'utf8'))
-            root = tree.root_node
-
-            def find_target_func(node):
-                func_type = {
-                    'python': 'function_definition',
-                    'java': 'method_declaration',
-                    'c': 'function_definition',
-                    'cpp': 'function_definition'
-                }.get(self.language, 'function_definition')
-
-                if node.type == func_type:
-                    id_node = next((c for c in node.children if c.type == 'identifier'), None)
-                    if id_node:
-                        name = text[id_node.start_byte:id_node.end_byte]
-                        if name == func:
-                            return node.child_by_field_name('body')
-                for child in node.children:
-                    result = find_target_func(child)
-                    if result:
-                        return result
-                return None
-
-            body = find_target_func(root)
+            body = self._find_function(doc, func, file_path).body
             if not body:
                 raise ValueError(f"Function '{func}' not found in {file_path}")
 
             # replace within the function body
-            start = body.start_byte
-            end = body.end_byte
-            print(f"[DEBUG] func_body start={start}, end={end}")
-            print(text[start:end])
-            func_body_text = text[start:end]
-            replaced = re.sub(re.escape(old), new, func_body_text)
-            new_text = text[:start] + replaced + text[end:]
+            start, end = body
+            edits = self._regex_edits(doc, re.escape(old), new, start, end)
             suffix = f"_opswap_{func}"
 
         # check syntax
-        self._assert_syntax(new_text, "swap_operator")
-
-        return self._write_new(file_path, new_text, suffix=suffix)
+        return self._finish(file_path, doc, edits, "swap_operator", suffix)
 
   
-    def rename_var(self, file_path: str, old_name: str, new_name: str,
+    @instrumented("rename_var")
+    def rename_var(self, file_path: Source, old_name: str, new_name: str,
             func: Optional[str] = None,
-            include_param: bool = True) -> str:
+            include_param: bool = True):
         """
         Rename variable safely. Supports limiting to a specific function
         and whether to rename parameters.
+        Only identifier nodes are renamed, so strings, comments, attribute
+        or field names and keyword-argument names are left alone.
         """
         self.validator.validate_variable_name(new_name)
+        suffix = f"_rename_{func}" if func else "_rename"
+        return self._rename(file_path, {old_name: new_name}, func, include_param,
+                            "rename_var", suffix)
+
+    @instrumented("rename_many")
+    def rename_many(self, file_path: Source, mapping: Dict[str, str],
+                    func: Optional[str] = None,
+                    include_param: bool = True):
+        """
+        Rename several variables at once, e.g. {'a': 'b', 'b': 'a'}.
+        Every name is resolved against the original text in one pass over
+        the identifiers, so swaps and chains need no temporary names.
+        Same scoping rules as rename_var.
+        """
+        if not isinstance(mapping, dict):
+            raise ValueError("rename_many expects a dict of old_name -> new_name")
+        for old_name, new_name in mapping.items():
+            if not old_name:
+                raise ValueError("rename_many got an empty name")
+            self.validator.validate_variable_name(new_name)
+        mapping = {old: new for old, new in mapping.items() if old != new}
+        suffix = f"_rename_{func}" if func else "_rename"
+        return self._rename(file_path, mapping, func, include_param, "rename_many", suffix)
 
-        text = Path(file_path).read_text(encoding='utf-8')
-        tree = self.parser.parse(bytes(text, 'utf8'))
-        root = tree.root_node
+    def _rename(self, file_path: Source, mapping: Dict[str, str], func: Optional[str],
+                include_param: bool, op: str, suffix: str):
+        """Shared body of rename_var and rename_many"""
+        doc = self._open(file_path)
+        tree = self._tree(doc)
 
         if not func:
-            # Global whole-word replacement
-            pattern = rf'\b{re.escape(old_name)}\b'
-            new_text = re.sub(pattern, new_name, text)
+            scopes = [tree.root_node]
         else:
             # Find the specified function
-            func_node = self.unroller.find_function_node(root, text, func)
-            if not func_node:
-                raise ValueError(f"Function '{func}' not found in {file_path}")
-
-            # Handle parameter replacement if include_param is True
-            if include_param:
-                parameters_node = func_node.child_by_field_name('parameters')
-                if parameters_node:
-                    params_start = parameters_node.start_byte
-                    params_end = parameters_node.end_byte
-                    params_text = text[params_start:params_end]
-                    new_params_text = re.sub(rf'\b{re.escape(old_name)}\b', new_name, params_text)
-                    # Update the text with replaced parameters
-                    text = text[:params_start] + new_params_text + text[params_end:]
-                    # Re-parse the updated text to get new function node positions
-                    new_tree = self.parser.parse(bytes(text, 'utf8'))
-                    new_root = new_tree.root_node
-                    func_node = self.unroller.find_function_node(new_root, text, func)
-                    if not func_node:
-                        raise ValueError(f"Function '{func}' not found after parameter replacement in {file_path}")
-
-            body = func_node.child_by_field_name('body')
-            if not body:
-                return text
-
-            start = body.start_byte
-            end = body.end_byte
-            func_body = text[start:end]
-
-            # Replace variable in function body
-            pattern = rf'\b{re.escape(old_name)}\b'
-            replaced_body = re.sub(pattern, new_name, func_body)
-
-            # Build temporary full code with replaced body
-            temp_code = text[:start] + replaced_body + text[end:]
-
-            # Re-indent the replaced region
-            def_line = text[func_node.start_byte:start]
-            parent_indent = self.indent_helper.detect_indent(def_line.splitlines()[0])
-            new_body = self.indent_helper.reindent_function_body(
-                full_code=temp_code,
-                body_start=start,
-                body_end=start + len(replaced_body),
-                parent_indent=parent_indent
-            )
-
-            # Assemble final text
-            new_text = (
-                text[:start].rstrip() + '\n'
-                + new_body
-                + text[end:]
-            )
-
-        # Validate final syntax
-        self._assert_syntax(new_text, "rename_var")
+            symbol = self._find_function(doc, func, file_path)
+            if not symbol.body:
+                return doc if isinstance(file_path, Document) else doc.text
+            func_node = self.symbols(doc).function_node(symbol, tree)
+            scopes = []
+            if include_param and symbol.parameters:
+                # C/C++ keep the parameter list on the function declarator
+                params = func_node.child_by_field_name('parameters') or next(
+                    iter(capture_nodes(self.language, 'parameters', func_node, 'parameters')), None)
+                if params:
+                    scopes.append(params)
+            scopes.append(func_node.child_by_field_name('body'))
+
+        edits = self._identifier_edits(doc, scopes, mapping) if mapping else []
+        return self._finish(file_path, doc, edits, op, suffix)
+
+    def _identifier_edits(self, doc: Document, scopes: list,
+                          mapping: Dict[str, str]) -> List[TextEdit]:
+        """
+        Edits renaming every variable identifier found in mapping under the
+        scope nodes, collected with one query pass per scope.
+        The cost per identifier is one dictionary lookup, whatever the mapping size.
+        """
+        names = {old.encode('utf8'): new for old, new in mapping.items()}
+        sizes = {len(old) for old in names}
+        member_fields = MEMBER_FIELDS.get(self.language, ())
+        edits = []
+        with self.metrics.timer("locate"):
+            source = doc.source
+            for scope in scopes:
+                for node in capture_nodes(self.language, 'identifier', scope, 'identifier'):
+                    start, end = node.start_byte, node.end_byte
+                    if end - start not in sizes:
+                        continue
+                    new_name = names.get(source[start:end])
+                    if new_name is None:
+                        continue
+                    parent = node.parent
+                    if parent is not None and any(
+                            parent.type == ptype and self._is_field(parent, field, node)
+                            for ptype, field in member_fields):
+                        continue
+                    edits.append(TextEdit(start, end, new_name))
+        return edits
+
+    @staticmethod
+    def _is_field(parent, field: str, node) -> bool:
+        """Whether node is the child stored under field of parent"""
+        child = parent.child_by_field_name(field)
+        return child is not None and child.start_byte == node.start_byte and child.end_byte == node.end_byte
 
-        suffix = f"_rename_{func}" if func else "_rename"
-        return self._write_new(file_path, new_text, suffix=suffix)
     def _is_param_node(self, node):
         """
         Check if the node is a parameter node.
@@ -366,12 +471,13 @@ class CodeFileEditor:
 
 
 
+    @instrumented("change_type")
     def change_type(self,
-                    file_path: str,
+                    file_path: Source,
                     from_type: str,
                     to_type: str,
                     func: Optional[str] = None,
-                    include_param: bool = True) -> str:
+                    include_param: bool = True):
         """
         Change type annotations or declarations for Python, Java, C, and C++.
         Python parameter annotations only change when include_param=True;
@@ -381,125 +487,81 @@ class CodeFileEditor:
         self.validator.validate_type_name(from_type)
         self.validator.validate_type_name(to_type)
 
-        text = Path(file_path).read_text(encoding='utf-8')
-        new_text = text
+        doc = self._open(file_path)
+        text = doc.text
+        annotation = rf':\s*{re.escape(from_type)}\b'
+        return_type = rf'->\s*{re.escape(from_type)}\b'
 
         # === Python branch === #
         if self.language == 'python':
             if func:
                 # just a specific function
-                tree = self.parser.parse(bytes(text, 'utf8'))
-                root = tree.root_node
-                func_node = self.unroller.find_function_node(root, text, func)
-                if not func_node:
-                    raise ValueError(f"Function '{func}' not found in {file_path}")
+                symbol = self._find_function(doc, func, file_path)
                 # read function signature and body
-                body = func_node.child_by_field_name('body')
-                sig_start = func_node.start_byte
-                sig_end = body.start_byte
-                sig_text = new_text[sig_start:sig_end]
-                body_text = new_text[sig_end:body.end_byte]
+                sig_start = symbol.span[0]
+                sig_end, body_end = symbol.body
+                edits = []
                 # check include_param
                 if include_param:
-                    sig_text = re.sub(
-                        rf':\s*{re.escape(from_type)}\b',
-                        f': {to_type}',
-                        sig_text
-                    )
+                    edits += self._regex_edits(doc, annotation, f': {to_type}', sig_start, sig_end)
                 # return type
-                sig_text = re.sub(
-                    rf'->\s*{re.escape(from_type)}\b',
-                    f'-> {to_type}',
-                    sig_text
-                )
+                edits += self._regex_edits(doc, return_type, f'-> {to_type}', sig_start, sig_end)
                 # especially for Python, we need to handle annotated assignments
-                body_text = re.sub(
-                    rf':\s*{re.escape(from_type)}\b',
-                    f': {to_type}',
-                    body_text
-                )
-                # reassemble the new text
-                new_text = (
-                    new_text[:sig_start]
-                    + sig_text
-                    + body_text
-                    + new_text[body.end_byte:]
-                )
+                edits += self._regex_edits(doc, annotation, f': {to_type}', sig_end, body_end)
                 suffix = f"_ctype_{func}"
             else:
-                # replace all occurrences globally
-                if include_param:
-                
-                    new_text = re.sub(
-                        rf':\s*{re.escape(from_type)}\b',
-                        f': {to_type}',
-                        new_text
-                    )
-                # return type
-                new_text = re.sub(
-                    rf'->\s*{re.escape(from_type)}\b',
-                    f'-> {to_type}',
-                    new_text
-                )
-                # especially for Python, we need to handle annotated assignments
-                new_text = re.sub(
-                    rf':\s*{re.escape(from_type)}\b',
-                    f': {to_type}',
-                    new_text
-                )
+                # replace all occurrences globally; annotated assignments
+                # share the parameter pattern, so it always applies here
+                edits = (self._regex_edits(doc, annotation, f': {to_type}')
+                         + self._regex_edits(doc, return_type, f'-> {to_type}'))
                 suffix = "_ctype_python"
 
-            self._assert_syntax(new_text, "change_type")
-            return self._write_new(file_path, new_text, suffix)
+            return self._finish(file_path, doc, edits, "change_type", suffix)
 
         # JAVA/C/C++ AST
         if self.language in ['java', 'c', 'cpp']:
-            tree = self.parser.parse(bytes(text, 'utf8'))
-            root = tree.root_node
-            replacements: List[tuple] = []
+            edits: List[TextEdit] = []
 
             if func:
-                func_node = self.unroller.find_function_node(root, text, func)
-                if not func_node:
-                    raise ValueError(f"Function '{func}' not found in {file_path}")
-                
-                if include_param:
-                    params = func_node.child_by_field_name('parameters')
+                symbol = self._find_function(doc, func, file_path)
+                func_node = self.symbols(doc).function_node(symbol, self._tree(doc))
+                body = func_node.child_by_field_name('body')
+
+                type_nodes = []
+                if include_param and symbol.parameters:
+                    # C/C++ keep the parameter list on the function declarator
+                    params = func_node.child_by_field_name('parameters') or next(
+                        iter(capture_nodes(self.language, 'parameters', func_node, 'parameters')), None)
                     if params:
-                        for param in params.children:
-                            tnode = param.child_by_field_name('type')
-                            if tnode and text[tnode.start_byte:tnode.end_byte] == from_type:
-                                replacements.append((tnode.start_byte, tnode.end_byte))
-               
-                ret = func_node.child_by_field_name('return_type')
-                if ret and text[ret.start_byte:ret.end_byte] == from_type:
-                    replacements.append((ret.start_byte, ret.end_byte))
-               
-                query = self.language_obj.query("""
-                    (assignment_expression left: (_) @var right: (_) @val
-                                          type: (primitive_type) @type)
-                """)
-                for node, tag in query.captures(func_node):
-                    if tag == 'type' and text[node.start_byte:node.end_byte] == from_type:
-                        replacements.append((node.start_byte, node.end_byte))
-                # replace all found occurrences
-                for start, end in sorted(replacements, reverse=True):
-                    new_text = new_text[:start] + to_type + new_text[end:]
+                        type_nodes += capture_nodes(self.language, 'parameter_type', params, 'type')
+
+                # the function's own return type precedes its body
+                ret = next(iter(capture_nodes(self.language, 'return_type', func_node, 'type')), None)
+                if ret and (body is None or ret.end_byte <= body.start_byte):
+                    type_nodes.append(ret)
+
+                # local declarations inside the function body
+                if body:
+                    type_nodes += capture_nodes(self.language, 'declaration_type', body, 'type')
+
+                for node in type_nodes:
+                    if doc.slice(node.start_byte, node.end_byte) == from_type:
+                        edits.append(TextEdit(node.start_byte, node.end_byte, to_type))
                 suffix = f"_ctype_{func}"
             else:
                 # replace all occurrences globally
                 pattern = rf'\b{re.escape(from_type)}\b'
-                new_text = re.sub(pattern, to_type, new_text)
+                edits = self._regex_edits(doc, pattern, to_type)
                 suffix = "_ctype"
 
-            self._assert_syntax(new_text, "change_type")
-            return self._write_new(file_path, new_text, suffix)
+            return self._finish(file_path, doc, edits, "change_type", suffix)
 
         # Default case: unsupported language
         raise NotImplementedError(
             f"change_type is supported only for python, java, c, cpp (given: {self.language})"
         )
-    def unroll_loop(self, file_path: str, factor: int = 4, func: Optional[str] = None) -> str:
+    @instrumented("unroll_loop")
+    def unroll_loop(self, file_path: Source, factor: int = 4, func: Optional[str] = None):
         """
         Perform loop unrolling using ASTUnrollHelper across multiple languages.
         Supports unrolling multiple or nested loops, and limiting to a specific function.
@@ -508,27 +570,32 @@ class CodeFileEditor:
         if not isinstance(factor, int) or factor <= 0:
             raise ValueError("Unroll factor must be a positive integer")
 
-        # Step 1: Read source code and parse it with Tree-sitter
-        text = Path(file_path).read_text(encoding='utf-8')
-        tree = self.parser.parse(bytes(text, 'utf8'))
-        root = tree.root_node
-
-        # Step 2: Locate the target function body or use the root node
-        target_body = self.unroller.find_function_body(root, text, func) if func else root
-        if not target_body:
-            return text  
+        # Step 1: Load source code and its Tree-sitter tree
+        doc = self._open(file_path)
+        text = doc.text
+        unchanged = doc if isinstance(file_path, Document) else text
+
+        # Step 2: Locate the target function or use the whole file
+        index = self.symbols(doc)
+        if func:
+            symbol = index.lookup(func)
+            if not symbol or not symbol.body:
+                return unchanged
+            loops = symbol.loops
+        else:
+            loops = index.loops
 
-        # Step 3: Find the first loop node in the body
-        loop_node = self.unroller.find_first_loop(target_body)
-        if not loop_node:
-            return text 
+        # Step 3: Find the first loop node in the scope
+        if not loops:
+            return unchanged
+        loop_node = index.loop_node(loops[0], self._tree(doc))
 
         loop_body_node = loop_node.child_by_field_name("body")
         if not loop_body_node:
-            return text
+            return unchanged
 
         # Step 4: Get loop body text and normalize indentation
-        loop_body_text = text[loop_body_node.start_byte:loop_body_node.end_byte]
+        loop_body_text = doc.slice(loop_body_node.start_byte, loop_body_node.end_byte)
         # Break text into lines and get the line index of the loop
         lines = text.splitlines()
         loop_line = loop_node.start_point[0]
@@ -542,81 +609,308 @@ class CodeFileEditor:
         repeated_body = (normalized_body.rstrip('\n') + '\n') * factor
 
         # Step 5: Replace the original loop (header + body) with repeated body
-        new_text = text[:loop_node.start_byte] + repeated_body + text[loop_node.end_byte:]
+        edits = [TextEdit(loop_node.start_byte, loop_node.end_byte, repeated_body)]
 
         # Step 6: Validate the new content and write to a file
-        self._assert_syntax(new_text, "unroll_loop")
-        return self._write_new(file_path, new_text, "_unroll")
+        return self._finish(file_path, doc, edits, "unroll_loop", "_unroll")
     
-    def apply_edits(self, file_path: str, edits: List[Dict[str, Any]]) -> str:
-        self._merge_output = True  #set merge_output to True for chaining edits
-        current = file_path
-        for e in edits:
-            op = e["op"]
-            args = e.get("args", {})
-            scope = e.get("scope", {})
-            print(f"[DEBUG] Executing {op} on: {current}")
-
+    @instrumented("unroll_loops")
+    def unroll_loops(self, file_path: Source, factor: int = 4, func: Optional[str] = None,
+                     lines: Optional[List[int]] = None):
+        """
+        Unroll every counted for loop (C, C++, Java) in the file or function
+        in one pass, keeping the program's behaviour: the loop steps by
+        factor iterations with the counter offset in each body copy, and
+        the original loop runs the remaining iterations. Nested loops are
+        unrolled innermost-first. Loops that are not counted (while loops,
+        unknown steps, a body writing the counter or bound, break/continue)
+        and Python loops are left unchanged.
+        :param lines: Only unroll loops starting on these 1-based lines
+        """
+        if not isinstance(factor, int) or factor <= 0:
+            raise ValueError("Unroll factor must be a positive integer")
 
+        doc = self._open(file_path)
+        scope, loop_nodes = self._scoped_loops(doc, file_path, func, lines)
+        with self.metrics.timer("transform"):
+            rewrites = self.unroller.unroll_counted_loops(
+                doc.source, scope, loop_nodes, factor, self._indent_unit(doc))
+        edits = [TextEdit(start, end, text) for start, end, text in rewrites]
+
+        suffix = f"_unroll_{func}" if func else "_unroll"
+        return self._finish(file_path, doc, edits, "unroll_loops", suffix)
+
+    def _scoped_loops(self, doc: Document, file_path: Source, func: Optional[str],
+                      lines: Optional[List[int]] = None) -> tuple:
+        """Scope node (function or root) and the indexed loop nodes in it, optionally by start line"""
+        index = self.symbols(doc)
+        tree = self._tree(doc)
+        if func:
+            symbol = self._find_function(doc, func, file_path)
+            spans = symbol.loops
+            scope = index.function_node(symbol, tree)
+        else:
+            spans = index.loops
+            scope = tree.root_node
+        with self.metrics.timer("locate"):
+            loop_nodes = [index.loop_node(span, tree) for span in spans]
+            if lines is not None:
+                wanted = set(lines)
+                loop_nodes = [n for n in loop_nodes if n.start_point[0] + 1 in wanted]
+        return scope, loop_nodes
+
+    @instrumented("hoist_invariants")
+    def hoist_invariants(self, file_path: Source, func: Optional[str] = None,
+                         lines: Optional[List[int]] = None):
+        """
+        Hoist loop-invariant arithmetic (C, C++, Java) into const temporaries
+        declared before the loop, e.g. a[i * n + j] with n * 2 computed once.
+        Only expressions over locals and parameters that the loop never
+        writes, with a single declared numeric type, are moved.
+        :param lines: Only hoist out of loops starting on these 1-based lines
+        """
+        doc = self._open(file_path)
+        _, loop_nodes = self._scoped_loops(doc, file_path, func, lines)
+        with self.metrics.timer("transform"):
+            rewrites = self.loop_transformer.hoist_invariants(doc.source, loop_nodes)
+        edits = [TextEdit(start, end, text) for start, end, text in rewrites]
+        suffix = f"_hoist_{func}" if func else "_hoist"
+        return self._finish(file_path, doc, edits, "hoist_invariants", suffix)
+
+    @instrumented("fuse_loops")
+    def fuse_loops(self, file_path: Source, func: Optional[str] = None):
+        """
+        Fuse adjacent counted for loops (C, C++, Java) with identical headers
+        into one loop when their bodies do not depend on each other.
+        """
+        doc = self._open(file_path)
+        _, loop_nodes = self._scoped_loops(doc, file_path, func)
+        with self.metrics.timer("transform"):
+            rewrites = self.loop_transformer.fuse_loops(doc.source, loop_nodes, self._indent_unit(doc))
+        edits = [TextEdit(start, end, text) for start, end, text in rewrites]
+        suffix = f"_fuse_{func}" if func else "_fuse"
+        return self._finish(file_path, doc, edits, "fuse_loops", suffix)
+
+    @instrumented("tile_loops")
+    def tile_loops(self, file_path: Source, tile=32, func: Optional[str] = None,
+                   lines: Optional[List[int]] = None):
+        """
+        Tile perfect nests of counted for loops (C, C++, Java).
+        :param tile: Tile size, or a list with one size per nest level
+        :param lines: Only tile nests whose outer loop starts on these 1-based lines
+        """
+        sizes = [tile] if isinstance(tile, int) else list(tile)
+        if not sizes or any(not isinstance(t, int) or t <= 0 for t in sizes):
+            raise ValueError("Tile sizes must be positive integers")
+        doc = self._open(file_path)
+        _, loop_nodes = self._scoped_loops(doc, file_path, func, lines)
+        with self.metrics.timer("transform"):
+            rewrites = self.loop_transformer.tile_loops(doc.source, loop_nodes, sizes,
+                                                        self._indent_unit(doc))
+        edits = [TextEdit(start, end, text) for start, end, text in rewrites]
+        suffix = f"_tile_{func}" if func else "_tile"
+        return self._finish(file_path, doc, edits, "tile_loops", suffix)
+
+    @instrumented("apply_edits")
+    def apply_edits(self, file_path: Source, edits: List[Dict[str, Any]],
+                    compose: bool = False, dry_run=False):
+        """
+        Apply a chain of edit operations in memory.
+        The file is read once, every op runs against the same Document,
+        and the result is written once with the "_chained" suffix.
+        When given a Document, it is updated and returned instead; if any
+        op fails, the Document is restored to its text before the plan.
+        :param compose: Compute every op against the original text and apply
+            the merged spans in one pass with one validation. Ops must touch
+            disjoint spans; overlapping ones raise ValueError.
+        :param dry_run: Write nothing and leave a given Document untouched;
+            return the unified diff (True or "diff") or a list of Change
+            spans ("spans") instead
+        """
+        if dry_run not in (False, True, "diff", "spans"):
+            raise ValueError(f"dry_run must be a bool, 'diff' or 'spans' (given: {dry_run!r})")
+        doc = self._open(file_path)
+        if dry_run and isinstance(file_path, Document):
+            doc = Document(doc.text, path=doc.path)
+        before = doc.source if isinstance(file_path, Document) and not dry_run else None
+        try:
+            if compose:
+                doc.compositor = EditCompositor()
             try:
-                if op == "operator_swap":
-                    current = self.swap_operator(current, **args, **scope)
+                for e in edits:
+                    op = e["op"]
+                    args = e.get("args", {})
+                    scope = e.get("scope", {})
+                    try:
+                        self._dispatch(doc, op, args, scope)
+                    except Exception as ex:
+                        raise RuntimeError(f"Edit operation '{op}' failed: {ex}")
+            finally:
+                compositor, doc.compositor = doc.compositor, None
+
+            if compose:
+                with self.metrics.timer("transform"):
+                    merged = compositor.compose()
+                self._finish(doc, doc, merged, "apply_edits", "_chained")
+        except BaseException:
+            if before is not None and doc.source != before:
+                # Undo the ops that did succeed; the plan applies fully or not at all
+                doc.update(before.decode('utf8'), None)
+            raise
 
-                elif op == "rename_var":
-                    current = self.rename_var(current, **args, **scope)
+        if dry_run:
+            return doc.changes() if dry_run == "spans" else doc.diff()
 
-                elif op == "change_type":
-                    current = self.change_type(current, **args, **scope)
+        if isinstance(file_path, Document):
+            return doc
+        return self._write_new(str(file_path), doc.text, "_chained")
 
-                elif op == "unroll_loop":
-                    current = self.unroll_loop(current, **args, **scope)
+    def _dispatch(self, doc: Document, op: str, args: Dict[str, Any], scope: Dict[str, Any]) -> Document:
+        """Run a single apply_edits operation against a Document"""
+        if op == "operator_swap":
+            return self.swap_operator(doc, **args, **scope)
 
-                elif op == "condition_operator_swap":
-                    current = self.swap_condition_operator(current, **args, **scope)
+        elif op == "rename_var":
+            return self.rename_var(doc, **args, **scope)
 
-                elif op == "smart_insert":
-                    if "code" not in args:
-                        raise ValueError("Missing 'code' in args for smart_insert")
-                    current = self.smart_insert(current, args["code"])
+        elif op == "rename_many":
+            return self.rename_many(doc, **args, **scope)
 
-                elif op == "delete_lines":
-                    current = self.delete(current, **args)
+        elif op == "change_type":
+            return self.change_type(doc, **args, **scope)
 
-                elif op == "update_lines":
-                    current = self.update(current, **args)
+        elif op == "unroll_loop":
+            return self.unroll_loop(doc, **args, **scope)
 
-                elif op == "insert_lines":
-                    current = self.insert(current, **args)
-                else:
-                    raise ValueError(f"Unknown op: {op}")
+        elif op == "unroll_loops":
+            return self.unroll_loops(doc, **args, **scope)
+
+        elif op == "hoist_invariants":
+            return self.hoist_invariants(doc, **args, **scope)
+
+        elif op == "fuse_loops":
+            return self.fuse_loops(doc, **args, **scope)
+
+        elif op == "tile_loops":
+            return self.tile_loops(doc, **args, **scope)
+
+        elif op == "condition_operator_swap":
+            return self.swap_condition_operator(doc, **args, **scope)
+
+        elif op == "smart_insert":
+            if "code" not in args:
+                raise ValueError("Missing 'code' in args for smart_insert")
+            return self.smart_insert(doc, args["code"])
 
-            except Exception as ex:
-                raise RuntimeError(f"Edit operation '{op}' failed: {ex}")
-            
-                   
-        final_text = Path(current).read_text(encoding="utf-8")
-        chained_path = self._write_new(file_path, final_text, "_chained")
-        return str(chained_path)
+        elif op == "delete_lines":
+            return self.delete(doc, **args)
 
+        elif op == "update_lines":
+            return self.update(doc, **args)
+
+        elif op == "insert_lines":
+            return self.insert(doc, **args)
+
+        raise ValueError(f"Unknown op: {op}")
 
     def _write_new(self, old_path: str, content: str, suffix: str) -> str:
         """
-        write the modified content to a new file.
-        - if merge_output is True，then write to a file with "_chained" suffix
-        - otherwise, write to a file with the specified suffix.
+        write the modified content through the editor's output policy;
+        by default a new file named after the original with the specified suffix.
         """
-        p = Path(old_path)
-        if getattr(self, "_merge_output", False):
-            output_path = p.parent / f"{p.stem.split('_')[0]}_chained{p.suffix}"
-        else:
-            output_path = p.parent / f"{p.stem}{suffix}{p.suffix}"
+        with self.metrics.timer("write"):
+            target = self.output.write(old_path, content, suffix)
+        if self.metrics.enabled:
+            self.metrics.count("bytes_written", len(content.encode('utf-8')))
+        return target
 
-        output_path.write_text(content, encoding='utf-8')
-        return str(output_path)
+    def _finish(self, source: Source, doc: Document, edits: List[TextEdit], op: str, suffix: str):
+        """
+        Apply an operation's edits, reparse incrementally and validate.
+        A Document source is updated in memory and returned;
+        a path source gets a new file with the given suffix.
+        """
+        if doc.compositor is not None:
+            # Composing a plan: record the spans, apply them later in one pass
+            doc.compositor.add(op, edits)
+            return doc
+        old_source = doc.source
+        changes = None
+        if edits:
+            if self.incremental_validation and doc.tree is None:
+                # Line edits never parse; the old tree is what limits the check to the changes
+                self._tree(doc)
+            with self.metrics.timer("transform"):
+                applied = doc.apply(edits)
+            self.metrics.count("edits", len(applied))
+            if doc.tree is not None:
+                # The edited old tree lets tree-sitter reuse untouched subtrees
+                old_tree = doc.tree
+                with self.metrics.timer("parse"):
+                    doc.tree = self.parser.parse(doc.parse_input(), old_tree)
+                self.metrics.count("parses")
+                self.metrics.count("bytes_parsed", doc.size)
+                if self.incremental_validation:
+                    changes = (old_tree, self._new_spans(applied))
+        try:
+            if changes is not None:
+                with self.metrics.timer("validate"):
+                    valid = self.validator.validate_changes(changes[0], doc.tree, changes[1])
+                if not valid:
+                    raise SyntaxError(f"{op} introduced syntax errors")
+            else:
+                self._validate(doc, op)
+        except SyntaxError:
+            if isinstance(source, Document) and edits:
+                # The old tree was edited in place, so roll back and reparse lazily
+                doc.update(old_source.decode('utf8'), None)
+            raise
+        if isinstance(source, Document):
+            return doc
+        return self._write_new(str(source), doc.text, suffix)
     
-    def _assert_syntax(self, src: str, op: str):
-        if not self.validator.validate_syntax(src):
+    @staticmethod
+    def _new_spans(applied: List[TextEdit]) -> List[tuple]:
+        """Byte spans of the inserted text, in the edited Document's offsets"""
+        spans = []
+        shift = 0
+        for e in applied:
+            start = e.start_byte + shift
+            length = len(e.new_text.encode('utf8'))
+            spans.append((start, start + length))
+            shift += length - (e.end_byte - e.start_byte)
+        return spans
+
+    def _known_validity(self, doc: Document) -> Optional[bool]:
+        """Validation verdict for the Document's content from the memo or the disk cache"""
+        valid = self.validator.cached_result(doc.digest)
+        if valid is None and self.cache is not None:
+            record = self.cache.get(doc.digest, self.language)
+            if record and record["valid"] is not None:
+                valid = record["valid"]
+                self.validator.remember(doc.digest, valid)
+        return valid
+
+    def _validate(self, doc: Document, op: str):
+        """Check the Document's syntax, reusing a known verdict for its content"""
+        if doc.tree is not None:
+            # A current tree already carries the answer in its root node
+            with self.metrics.timer("validate"):
+                valid = self.validator.validate_tree(doc.tree)
+                if self.cache is not None:
+                    self.cache.put(doc.digest, self.language, valid=valid)
+        else:
+            with self.metrics.timer("validate"):
+                valid = self._known_validity(doc)
+            if valid is None:
+                tree = self._tree(doc)
+                with self.metrics.timer("validate"):
+                    valid = self.validator.validate_source(doc.source, doc.digest, tree)
+                    if self.cache is not None:
+                        self.cache.put(doc.digest, self.language, valid=valid)
+        if not valid:
             raise SyntaxError(f"{op} introduced syntax errors")
+
         
 
 
@@ -645,11 +939,12 @@ class CodeFileEditor:
 
 
 
+    @instrumented("swap_condition_operator")
     def swap_condition_operator(self,
-                            file_path: str,
+                            file_path: Source,
                             old_op: str,
                             new_op: str,
-                            func: Optional[str] = None) -> str:
+                            func: Optional[str] = None):
         """
         Replace conditional operators in all `if` statements within a specific function or globally.
         For example, old_op='>' and new_op='<' will replace all occurrences of '>' in conditions with '<'.
@@ -657,42 +952,64 @@ class CodeFileEditor:
         # Validate the legality of the operator replacement
         self.validator.validate_operator_replacement(old_op, new_op)
 
-        # Read original source text and build AST
-        text = Path(file_path).read_text(encoding='utf-8')
-        tree = self.parser.parse(bytes(text, 'utf8'))
-        root = tree.root_node
-
-        # Determine the scope for replacement: function body or global
-        scope = (self.unroller.find_function_node(root, text, func)
-                 if func else root)
-        if func and not scope:
-            raise ValueError(f"Function '{func}' not found in {file_path}")
+        # Load original source text and its AST
+        doc = self._open(file_path)
 
-        # Recursively collect all 'condition' nodes from 'if_statement'
-        cond_nodes: List = []
-        def _collect_if_conditions(node):
-            if node.type == "if_statement":
-                cond = node.child_by_field_name("condition")
-                if cond:
-                    cond_nodes.append(cond)
-            for child in node.children:
-                _collect_if_conditions(child)
-        _collect_if_conditions(scope)
+        # Determine the scope for replacement: function or global, and
+        # take the 'condition' span of every 'if_statement' in it
+        if func:
+            conditions = self._find_function(doc, func, file_path).conditions
+        else:
+            conditions = self.symbols(doc).conditions
 
         # Generate replacement spans for each condition node
-        replacements: List[tuple] = []
-        for cond in cond_nodes:
-            start, end = cond.start_byte, cond.end_byte
-            original = text[start:end]
-            replaced = re.sub(re.escape(old_op), new_op, original)
-            replacements.append((start, end, replaced))
-
-        # Apply replacements in reverse order to avoid shifting positions
-        new_text = text
-        for start, end, replaced in sorted(replacements, key=lambda x: x[0], reverse=True):
-            new_text = new_text[:start] + replaced + new_text[end:]
+        edits: List[TextEdit] = []
+        for start, end in conditions:
+            edits += self._regex_edits(doc, re.escape(old_op), new_op, start, end)
 
         # Validate final syntax and write updated file
-        self._assert_syntax(new_text, "swap_condition_operator")
         suffix = f"_condop_{func}" if func else "_condop"
-        return self._write_new(file_path, new_text, suffix)
\ No newline at end of file
+        return self._finish(file_path, doc, edits, "swap_condition_operator", suffix)
+
+    @instrumented("mutants")
+    def mutants(self, file_path: Source, func: Optional[str] = None,
+                conditions_only: bool = False,
+                operators: Optional[Iterable[str]] = None,
+                validate: bool = True,
+                batch_size: int = 256) -> Iterator[Mutant]:
+        """
+        Enumerate single-site operator mutants, e.g. for mutation testing.
+        The source is read and parsed once; one Mutant (a span patch on the
+        current text) is yielded lazily per (operator site, replacement), with
+        replacements drawn from the validator's valid_operators in the same
+        operator group. Nothing is written and a Document is left untouched;
+        do not edit it while iterating.
+        :param func: Only sites inside this function's body
+        :param conditions_only: Only sites in `if` conditions, like swap_condition_operator
+        :param operators: Only mutate from and to these operators
+        :param validate: Drop mutants that no longer parse. They are checked
+            batch_size at a time against their enclosing function.
+        """
+        allowed = None
+        if operators is not None:
+            allowed = set(operators)
+            for op in allowed:
+                self.validator.validate_operator_replacement(op, op)
+        if batch_size <= 0:
+            raise ValueError("batch_size must be a positive integer")
+
+        doc = self._open(file_path)
+        tree = self._tree(doc)
+        with self.metrics.timer("locate"):
+            if conditions_only:
+                spans = (self._find_function(doc, func, file_path).conditions if func
+                         else self.symbols(doc).conditions)
+            elif func:
+                body = self._find_function(doc, func, file_path).body
+                if not body:
+                    raise ValueError(f"Function '{func}' not found in {file_path}")
+                spans = [body]
+            else:
+                spans = None
+        return self.mutant_generator.generate(tree, doc.source, spans, allowed, validate,
+                                              batch_size, self.metrics)
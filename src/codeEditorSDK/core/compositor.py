@@ -0,0 +1,50 @@
+from typing import List, Tuple
+from codeEditorSDK.core.document import TextEdit
+
+
+class EditCompositor:
+    """
+    Collects the span edits of several operations, all computed against
+    the same base text, and merges them into one non-overlapping edit list.
+    Because every span is in base offsets, applying the merged list in one
+    pass places each op's edits where they would land after the earlier ops.
+    """
+    def __init__(self):
+        self._edits: List[Tuple[TextEdit, int, str]] = []
+        self._ops = 0
+
+    def add(self, op: str, edits: List[TextEdit]) -> None:
+        """Record the edits of one operation, in plan order"""
+        self._ops += 1
+        for e in edits:
+            self._edits.append((e, self._ops, op))
+
+    def __len__(self) -> int:
+        return len(self._edits)
+
+    def compose(self) -> List[TextEdit]:
+        """
+        Merge the recorded edits.
+        Identical edits from different ops collapse into one; insertions at
+        the same offset are concatenated in plan order. Any other overlap
+        between ops is a conflict.
+        :raises ValueError: If two operations touch overlapping spans
+        """
+        ordered = sorted(self._edits, key=lambda x: (x[0].start_byte, x[0].end_byte, x[1]))
+        merged: List[TextEdit] = []
+        owners: List[str] = []
+        for edit, _, op in ordered:
+            if merged:
+                last = merged[-1]
+                if edit.start_byte == edit.end_byte == last.start_byte == last.end_byte:
+                    merged[-1] = TextEdit(last.start_byte, last.end_byte, last.new_text + edit.new_text)
+                    continue
+                if edit == last:
+                    continue
+                if edit.start_byte < last.end_byte:
+                    raise ValueError(
+                        f"Edits from '{owners[-1]}' and '{op}' conflict at bytes "
+                        f"{edit.start_byte}-{max(edit.end_byte, last.end_byte)}")
+            merged.append(edit)
+            owners.append(op)
+        return merged
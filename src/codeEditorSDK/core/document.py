@@ -0,0 +1,236 @@
+from array import array
+from bisect import bisect_right
+from pathlib import Path
+from typing import Iterable, List, NamedTuple, Optional, Tuple, Union
+from codeEditorSDK.core.buffer import PieceTable
+from codeEditorSDK.core.lines import line_count, line_starts
+import difflib
+import hashlib
+import re
+
+# Above this many pieces, parsing from joined bytes beats the read callback
+_CALLBACK_PIECES = 64
+
+
+class TextEdit(NamedTuple):
+    """Replace the byte range [start_byte, end_byte) of a Document with new_text"""
+    start_byte: int
+    end_byte: int
+    new_text: str
+
+
+class Change(NamedTuple):
+    """
+    One changed region between the loaded and the current text.
+    Offsets and 1-based inclusive line numbers refer to the loaded text;
+    a pure insertion has end_line == start_line - 1.
+    """
+    start_byte: int
+    end_byte: int
+    start_line: int
+    end_line: int
+    new_text: str
+
+
+class Document:
+    """
+    In-memory editing session for a single source file.
+    Keeps the source in a piece table with its current syntax tree so a
+    chain of operations can run without re-reading or re-writing the file.
+    """
+    def __init__(self, text: str, tree=None, path: Optional[str] = None):
+        self.path = Path(path) if path is not None else None
+        self._buffer = PieceTable(text.encode('utf8'))
+        self.original_source = self._buffer.getvalue()
+        # Parsed lazily by the editor; None until an operation needs it
+        self.tree = tree
+        # Derived data below is dropped on edit and rebuilt on demand
+        self.symbols = None
+        # Byte offset of each line start, shifted through edits
+        self.line_starts: Optional[array] = None
+        self.indent_unit: Optional[str] = None
+        self._digest: Optional[str] = None
+        self._text: Optional[str] = text
+        # Set while apply_edits composes a plan: operations record their
+        # spans here instead of editing the text
+        self.compositor = None
+
+    @property
+    def text(self) -> str:
+        """Current source as a string (decoded on demand after edits)"""
+        if self._text is None:
+            self._text = self.source.decode('utf8')
+        return self._text
+
+    @property
+    def source(self) -> bytes:
+        """Current source bytes (joined from the piece table on demand)"""
+        return self._buffer.getvalue()
+
+    @property
+    def size(self) -> int:
+        """Current length in bytes"""
+        return len(self._buffer)
+
+    def parse_input(self):
+        """
+        What to hand Parser.parse: a read callback while the buffer has few
+        pieces, else the joined bytes. The parser calls back several times
+        per piece, so after many small edits joining once is cheaper.
+        """
+        if self._buffer.materialized or self._buffer.piece_count > _CALLBACK_PIECES:
+            return self._buffer.getvalue()
+        return self._buffer.read
+
+    @property
+    def modified(self) -> bool:
+        """Whether the text differs from what was loaded"""
+        return self.source != self.original_source
+
+    @property
+    def digest(self) -> str:
+        """SHA-256 of the current source, the analysis cache key"""
+        if self._digest is None:
+            self._digest = hashlib.sha256(self.source).hexdigest()
+        return self._digest
+
+    def update(self, text: str, tree) -> None:
+        """Replace the current text and its syntax tree"""
+        self._buffer = PieceTable(text.encode('utf8'))
+        self._text = text
+        self.tree = tree
+        self.line_starts = None
+        self._invalidate()
+
+    def _invalidate(self) -> None:
+        self.symbols = None
+        self.indent_unit = None
+        self._digest = None
+
+    def diff(self, context: int = 3) -> str:
+        """Unified diff from the loaded text to the current one"""
+        name = self.path.as_posix().lstrip('/') if self.path is not None else 'document'
+        return ''.join(difflib.unified_diff(
+            self.original_source.decode('utf8').splitlines(True),
+            self.text.splitlines(True),
+            fromfile=f"a/{name}", tofile=f"b/{name}", n=context))
+
+    def changes(self) -> List[Change]:
+        """Changed line regions from the loaded text to the current one"""
+        old = self.original_source.decode('utf8').splitlines(True)
+        new = self.text.splitlines(True)
+        offsets = [0]
+        for line in old:
+            offsets.append(offsets[-1] + len(line.encode('utf8')))
+        matcher = difflib.SequenceMatcher(None, old, new, autojunk=False)
+        return [Change(offsets[i1], offsets[i2], i1 + 1, i2, ''.join(new[j1:j2]))
+                for tag, i1, i2, j1, j2 in matcher.get_opcodes() if tag != 'equal']
+
+    def slice(self, start_byte: int, end_byte: int) -> str:
+        """Return the text between two byte offsets"""
+        return self._buffer.slice(start_byte, end_byte).decode('utf8')
+
+    def _lines(self) -> array:
+        if self.line_starts is None:
+            self.line_starts = line_starts(self.source)
+        return self.line_starts
+
+    @property
+    def line_count(self) -> int:
+        """Number of lines, as len(text.splitlines()) counts them"""
+        return line_count(self._lines(), len(self._buffer))
+
+    def line_of(self, byte: int) -> int:
+        """0-based line containing a byte offset"""
+        return bisect_right(self._lines(), byte) - 1
+
+    def line_span(self, start: int, end: int) -> Tuple[int, int]:
+        """Byte span of the 0-based lines [start, end)"""
+        starts = self._lines()
+        size = len(self._buffer)
+        return (starts[start] if start < len(starts) else size,
+                starts[end] if end < len(starts) else size)
+
+    def line(self, index: int) -> str:
+        """A 0-based line including its line break"""
+        return self.slice(*self.line_span(index, index + 1))
+
+    def char_to_byte(self, index: int) -> int:
+        """Convert a character offset into self.text to a byte offset"""
+        if len(self.source) == len(self.text):
+            return index
+        return len(self.text[:index].encode('utf8'))
+
+    def point(self, byte: int) -> Tuple[int, int]:
+        """(row, column) of a byte offset, as tree-sitter expects"""
+        starts = self._lines()
+        row = bisect_right(starts, byte) - 1
+        return row, byte - starts[row]
+
+    def apply(self, edits: Iterable[TextEdit]) -> List[TextEdit]:
+        """
+        Apply non-overlapping edits given in original byte offsets.
+        Each span is replaced in the piece table, the line index is shifted
+        rather than rebuilt, and every span is reported to the tree via
+        Tree.edit, so the next parse can reuse it.
+        :return: The edits that were applied, sorted by position
+        """
+        edits = sorted(edits, key=lambda e: (e.start_byte, e.end_byte))
+        pos = 0
+        for e in edits:
+            if e.start_byte < pos:
+                raise ValueError(f"Overlapping edits at byte {e.start_byte}")
+            pos = e.end_byte
+
+        # Report spans back to front so earlier offsets stay valid
+        if self.tree is not None:
+            for e in reversed(edits):
+                new_bytes = e.new_text.encode('utf8')
+                start_point = self.point(e.start_byte)
+                newlines = new_bytes.count(b'\n')
+                if newlines:
+                    new_end_point = (start_point[0] + newlines,
+                                     len(new_bytes) - new_bytes.rfind(b'\n') - 1)
+                else:
+                    new_end_point = (start_point[0], start_point[1] + len(new_bytes))
+                self.tree.edit(
+                    start_byte=e.start_byte,
+                    old_end_byte=e.end_byte,
+                    new_end_byte=e.start_byte + len(new_bytes),
+                    start_point=start_point,
+                    old_end_point=self.point(e.end_byte),
+                    new_end_point=new_end_point,
+                )
+
+        self._buffer.replace_many((e.start_byte, e.end_byte, e.new_text.encode('utf8'))
+                                  for e in edits)
+        if self.line_starts is not None:
+            self.line_starts = self._shift_lines(self.line_starts, edits)
+        self._text = None
+        self._invalidate()
+        return edits
+
+    @staticmethod
+    def _shift_lines(old: array, edits: List[TextEdit]) -> array:
+        """Line starts after applying sorted edits, in one pass over the old index"""
+        new = array('q')
+        pos = 0
+        delta = 0
+        for e in edits:
+            keep = bisect_right(old, e.start_byte, pos)
+            new.extend(x + delta for x in old[pos:keep])
+            data = e.new_text.encode('utf8')
+            base = e.start_byte + delta
+            new.extend(base + m.end() for m in re.finditer(b'\n', data))
+            # Starts in (start, end] followed a newline that was replaced
+            pos = bisect_right(old, e.end_byte, keep)
+            delta += len(data) - (e.end_byte - e.start_byte)
+        new.extend(x + delta for x in old[pos:])
+        return new
+
+    def __repr__(self) -> str:
+        return f"Document(path={str(self.path)!r}, size={len(self._buffer)})"
+
+
+# Operations accept either a file path or an open Document
+Source = Union[str, Path, Document]
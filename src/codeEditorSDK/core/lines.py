@@ -0,0 +1,73 @@
+from array import array
+from collections import OrderedDict
+from typing import Tuple
+import mmap
+import os
+import re
+import threading
+
+_NEWLINE = re.compile(b'\n')
+_CHUNK = 1 << 22
+
+
+def line_starts(data) -> array:
+    """
+    Byte offset of every line start in data (bytes or an mmap),
+    one 64-bit int per line, built chunk by chunk.
+    """
+    starts = array('q', [0])
+    for base in range(0, len(data), _CHUNK):
+        chunk = data[base:base + _CHUNK]
+        starts.extend(base + m.end() for m in _NEWLINE.finditer(chunk))
+    return starts
+
+
+def line_count(starts: array, size: int) -> int:
+    """
+    Number of lines, breaking only at newline bytes like tree-sitter rows
+    (CRLF is one break; a lone CR, form feed or U+2028 is not, unlike
+    str.splitlines()). A trailing newline opens no extra line.
+    """
+    return len(starts) - 1 if starts[-1] == size else len(starts)
+
+
+# Line indexes of files on disk, keyed by (path, mtime, size)
+_FILE_INDEXES: "OrderedDict[Tuple[str, int, int], array]" = OrderedDict()
+_FILE_INDEXES_MAX = 64
+_FILE_INDEXES_LOCK = threading.Lock()
+
+
+def file_line_starts(path: str, fd: int, data) -> array:
+    """Line index of an open file, reused while its mtime and size are unchanged"""
+    st = os.fstat(fd)
+    key = (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+    with _FILE_INDEXES_LOCK:
+        starts = _FILE_INDEXES.get(key)
+        if starts is not None:
+            _FILE_INDEXES.move_to_end(key)
+            return starts
+    starts = line_starts(data)
+    with _FILE_INDEXES_LOCK:
+        _FILE_INDEXES[key] = starts
+        while len(_FILE_INDEXES) > _FILE_INDEXES_MAX:
+            _FILE_INDEXES.popitem(last=False)
+    return starts
+
+
+def read_lines(path: str, start_line: int, end_line: int) -> str:
+    """
+    Lines start_line..end_line (1-based, inclusive, clamped) of a file,
+    sliced from an mmap so only those bytes are decoded.
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return ''
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            starts = file_line_starts(path, f.fileno(), mm)
+            count = line_count(starts, len(mm))
+            start = max(1, min(start_line, count))
+            end = max(start, min(end_line, count))
+            stop = starts[end] if end < len(starts) else len(mm)
+            data = mm[starts[start - 1]:stop]
+    # Match text-mode reading, which translates line endings
+    return data.decode('utf-8').replace('\r\n', '\n')
@@ -0,0 +1,151 @@
+from pathlib import Path
+from typing import Callable, Optional
+import os
+import tempfile
+import threading
+
+_umask_lock = threading.Lock()
+
+
+def _umask() -> int:
+    """The process umask, read without changing it where the platform allows"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('Umask:'):
+                    return int(line.split()[1], 8)
+    except (OSError, ValueError):
+        pass
+    with _umask_lock:
+        mask = os.umask(0o022)
+        os.umask(mask)
+    return mask
+
+
+def write_atomic(path: str, content: str, fsync: bool = False) -> str:
+    """
+    Write a file so readers see either the old or the new content.
+    The text goes to a temporary file in the same directory, which then
+    replaces the target with os.replace. Concurrent writers to the same
+    path never interleave; the last rename wins. The file keeps the mode
+    of the file it replaces; a new file gets 0o666 minus the umask, as
+    open() would give it. A symlink is followed, so the link stays and
+    the file it points to is replaced.
+    :param fsync: Flush the file and its directory to disk before returning
+    """
+    target = Path(os.path.realpath(path))
+    fd, tmp = tempfile.mkstemp(prefix=f".{target.name}.", suffix=".tmp", dir=target.parent)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content.encode('utf-8'))
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        try:
+            os.chmod(tmp, os.stat(target).st_mode & 0o7777)
+        except FileNotFoundError:
+            os.chmod(tmp, 0o666 & ~_umask())
+        os.replace(tmp, target)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+    if fsync and hasattr(os, 'O_DIRECTORY'):
+        dir_fd = os.open(target.parent, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+    return str(Path(path))
+
+
+class OutputPolicy:
+    """Decides where an edited file goes. Subclasses implement write()."""
+
+    def write(self, source_path: str, content: str, suffix: str) -> str:
+        """
+        Store the edited content of source_path.
+        :param suffix: The operation's suffix, e.g. "_inserted" or "_chained"
+        :return: Where the content went
+        """
+        raise NotImplementedError
+
+
+class SuffixOutput(OutputPolicy):
+    """Sibling file named after the original plus the operation suffix (the default)"""
+
+    def __init__(self, fsync: bool = False):
+        self.fsync = fsync
+
+    def write(self, source_path: str, content: str, suffix: str) -> str:
+        p = Path(source_path)
+        return write_atomic(str(p.parent / f"{p.stem}{suffix}{p.suffix}"), content, self.fsync)
+
+
+class InPlaceOutput(OutputPolicy):
+    """Replace the original file atomically"""
+
+    def __init__(self, fsync: bool = False):
+        self.fsync = fsync
+
+    def write(self, source_path: str, content: str, suffix: str) -> str:
+        return write_atomic(source_path, content, self.fsync)
+
+
+class MirrorOutput(OutputPolicy):
+    """
+    Write under output_dir, mirroring each file's path relative to root.
+    Files outside root are rejected rather than written elsewhere.
+    """
+
+    def __init__(self, output_dir: str, root: str = '.', keep_suffix: bool = False,
+                 fsync: bool = False):
+        """
+        :param output_dir: Top of the mirrored tree (created on demand)
+        :param root: Directory the source paths are taken relative to
+        :param keep_suffix: Also add the operation suffix to file names
+        """
+        self.output_dir = Path(output_dir)
+        self.root = Path(root).resolve()
+        self.keep_suffix = keep_suffix
+        self.fsync = fsync
+
+    def write(self, source_path: str, content: str, suffix: str) -> str:
+        src = Path(source_path).resolve()
+        try:
+            rel = src.relative_to(self.root)
+        except ValueError:
+            raise ValueError(f"{source_path} is outside the mirrored root {self.root}")
+        if self.keep_suffix:
+            rel = rel.with_name(f"{rel.stem}{suffix}{rel.suffix}")
+        target = self.output_dir / rel
+        target.parent.mkdir(parents=True, exist_ok=True)
+        return write_atomic(str(target), content, self.fsync)
+
+
+class SinkOutput(OutputPolicy):
+    """
+    Hand the content to a caller-supplied function instead of the file system.
+    Calls are serialized within a process, so the sink need not be thread-safe;
+    with a process pool the sink must be picklable and runs in every worker.
+    """
+
+    def __init__(self, sink: Callable[[str, str], Optional[str]]):
+        """
+        :param sink: Called as sink(source_path, content); its return value,
+            if not None, is reported as the output location
+        """
+        self.sink = sink
+        self._lock = threading.Lock()
+
+    def write(self, source_path: str, content: str, suffix: str) -> str:
+        with self._lock:
+            result = self.sink(source_path, content)
+        return source_path if result is None else str(result)
+
+    def __getstate__(self):
+        return {'sink': self.sink}
+
+    def __setstate__(self, state):
+        self.sink = state['sink']
+        self._lock = threading.Lock()
@@ -0,0 +1,181 @@
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+from codeEditorSDK.utils.queries import capture_nodes
+
+Span = Tuple[int, int]
+
+FUNCTION_TYPES = {
+    'python': 'function_definition',
+    'java': 'method_declaration',
+    'c': 'function_definition',
+    'cpp': 'function_definition',
+}
+
+# Node types the 'loop' query captures
+LOOP_TYPES = {'for_statement', 'while_statement'}
+
+# Enclosing declarations that qualify a function name, e.g. Calculator.multiply
+CONTAINER_TYPES = {
+    'class_definition', 'class_declaration', 'interface_declaration',
+    'enum_declaration', 'class_specifier', 'struct_specifier', 'namespace_definition',
+}
+
+
+class FunctionSymbol:
+    """Byte spans of a function and of the loops and if-conditions inside it"""
+    __slots__ = ('name', 'qualified_name', 'span', 'parameters', 'body', 'loops', 'conditions')
+
+    def __init__(self, name: str, qualified_name: str, span: Span,
+                 parameters: Optional[Span], body: Optional[Span],
+                 loops: Tuple[Span, ...] = (), conditions: Tuple[Span, ...] = ()):
+        self.name = name
+        self.qualified_name = qualified_name
+        self.span = span
+        self.parameters = parameters
+        self.body = body
+        self.loops = loops
+        self.conditions = conditions
+
+    def __repr__(self) -> str:
+        return f"FunctionSymbol({self.qualified_name!r}, span={self.span})"
+
+    def to_list(self) -> list:
+        return [self.name, self.qualified_name, self.span, self.parameters,
+                self.body, self.loops, self.conditions]
+
+    @classmethod
+    def from_list(cls, data: list) -> 'FunctionSymbol':
+        name, qualified, span, params, body, loops, conditions = data
+        return cls(name, qualified, tuple(span),
+                   tuple(params) if params else None,
+                   tuple(body) if body else None,
+                   tuple(tuple(s) for s in loops),
+                   tuple(tuple(s) for s in conditions))
+
+
+class SymbolIndex:
+    """
+    Per-tree index of functions, loops and if-conditions.
+    Built once per parse; lookups by plain or class-qualified name are
+    dictionary hits instead of tree walks.
+    """
+    def __init__(self, language: str, functions: List[FunctionSymbol],
+                 loops: List[Span], conditions: List[Span]):
+        self.language = language
+        self.functions = functions
+        self.loops = loops
+        self.conditions = conditions
+        self._nodes: Dict[tuple, object] = {}
+        self._by_name: Dict[str, FunctionSymbol] = {}
+        # First definition in document order wins, as with the old tree walk
+        for symbol in functions:
+            self._by_name.setdefault(symbol.name, symbol)
+            self._by_name.setdefault(symbol.qualified_name, symbol)
+
+    @classmethod
+    def build(cls, language: str, tree, source: bytes) -> 'SymbolIndex':
+        """Index every function of a parsed tree with three query passes"""
+        root = tree.root_node
+        func_type = FUNCTION_TYPES.get(language, 'function_definition')
+        loop_nodes = capture_nodes(language, 'loop', root, 'loop')
+        cond_nodes = capture_nodes(language, 'condition', root, 'condition')
+        loops = [(n.start_byte, n.end_byte) for n in loop_nodes]
+        conditions = [(n.start_byte, n.end_byte) for n in cond_nodes]
+        loop_starts = [s for s, _ in loops]
+        cond_starts = [s for s, _ in conditions]
+
+        functions = []
+        nodes = {}
+        for name_node in capture_nodes(language, 'function', root, 'name'):
+            node = name_node.parent
+            while node is not None and node.type != func_type:
+                node = node.parent
+            if node is None:
+                continue
+            name, qualified = cls._names(language, name_node, node, source)
+            start, end = node.start_byte, node.end_byte
+            params = node.child_by_field_name('parameters')
+            if params is None and name_node.parent.type == 'function_declarator':
+                params = name_node.parent.child_by_field_name('parameters')
+            body = node.child_by_field_name('body')
+            symbol = FunctionSymbol(
+                name, qualified, (start, end),
+                (params.start_byte, params.end_byte) if params else None,
+                (body.start_byte, body.end_byte) if body else None,
+                tuple(loops[bisect_left(loop_starts, start):bisect_left(loop_starts, end)]),
+                tuple(conditions[bisect_left(cond_starts, start):bisect_left(cond_starts, end)]),
+            )
+            functions.append(symbol)
+            nodes[('function', start, end)] = node
+
+        index = cls(language, functions, loops, conditions)
+        index._nodes = nodes
+        for n in loop_nodes:
+            index._nodes[('loop', n.start_byte, n.end_byte)] = n
+        return index
+
+    def to_dict(self) -> dict:
+        """Plain data for the analysis cache (tree nodes are not kept)"""
+        return {
+            'functions': [f.to_list() for f in self.functions],
+            'loops': self.loops,
+            'conditions': self.conditions,
+        }
+
+    @classmethod
+    def from_dict(cls, language: str, data: dict) -> 'SymbolIndex':
+        """Rebuild a cached index; nodes are resolved from the tree when asked for"""
+        return cls(language,
+                   [FunctionSymbol.from_list(f) for f in data['functions']],
+                   [tuple(s) for s in data['loops']],
+                   [tuple(s) for s in data['conditions']])
+
+    @staticmethod
+    def _names(language: str, name_node, func_node, source: bytes) -> Tuple[str, str]:
+        """Plain and qualified name of a function"""
+        sep = '::' if language == 'cpp' else '.'
+        name = source[name_node.start_byte:name_node.end_byte].decode('utf8')
+        qualified = name
+        if name_node.type == 'qualified_identifier':
+            inner = name_node.child_by_field_name('name')
+            if inner is not None:
+                name = source[inner.start_byte:inner.end_byte].decode('utf8')
+        parent = func_node.parent
+        while parent is not None:
+            if parent.type in CONTAINER_TYPES:
+                owner = parent.child_by_field_name('name')
+                if owner is not None:
+                    qualified = source[owner.start_byte:owner.end_byte].decode('utf8') + sep + qualified
+            parent = parent.parent
+        return name, qualified
+
+    def lookup(self, name: str) -> Optional[FunctionSymbol]:
+        """Function by plain name (first definition) or qualified name"""
+        return self._by_name.get(name)
+
+    def function_node(self, symbol: FunctionSymbol, tree):
+        """Tree node of an indexed function"""
+        return self._resolve('function', symbol.span, tree)
+
+    def loop_node(self, span: Span, tree):
+        """Tree node of an indexed loop"""
+        return self._resolve('loop', span, tree)
+
+    def _resolve(self, kind: str, span: Span, tree):
+        node = self._nodes.get((kind,) + tuple(span))
+        if node is not None:
+            return node
+        # Not captured at build time: descend to the node of this kind with
+        # this span; a parent (module, class body, block) may share the span
+        if kind == 'function':
+            types = {FUNCTION_TYPES.get(self.language, 'function_definition')}
+        else:
+            types = LOOP_TYPES
+        node = tree.root_node
+        while (node.start_byte, node.end_byte) != tuple(span) or node.type not in types:
+            node = next((c for c in node.children
+                         if c.start_byte <= span[0] and span[1] <= c.end_byte), None)
+            if node is None:
+                return None
+        self._nodes[(kind,) + tuple(span)] = node
+        return node
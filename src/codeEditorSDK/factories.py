@@ -1,12 +1,31 @@
-from .core.codeEditor import CodeFileEditor
+from typing import TYPE_CHECKING, Dict
 from .exception import UnsupportedLanguageError
 
+if TYPE_CHECKING:
+    from .core.codeEditor import CodeFileEditor
+
 class MultiLangEditorFactory:
     SUPPORTED_LANGUAGES = {'python', 'java', 'cpp', 'javascript', 'c'}
+    _editors: Dict[str, 'CodeFileEditor'] = {}
     
     @classmethod
-    def get_editor(cls, lang: str) -> CodeFileEditor:
+    def get_editor(cls, lang: str) -> 'CodeFileEditor':
+        """
+        Return the editor for a language.
+        Editors keep no per-file state and are safe to share between
+        threads, so one instance per language is built on first use and
+        reused by every later call.
+        """
         lang = lang.lower()
         if lang not in cls.SUPPORTED_LANGUAGES:
             raise UnsupportedLanguageError(lang)
-        return CodeFileEditor(lang)
\ No newline at end of file
+        editor = cls._editors.get(lang)
+        if editor is None:
+            from .core.codeEditor import CodeFileEditor
+            editor = cls._editors[lang] = CodeFileEditor(lang)
+        return editor
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        """Drop cached editors so the next get_editor call builds new ones"""
+        cls._editors.clear()
@@ -0,0 +1,515 @@
+"""
+Long-running JSON-RPC 2.0 edit server.
+
+    python -m codeEditorSDK.server --socket /tmp/codeeditor.sock
+    python -m codeEditorSDK.server --port 8765          # 127.0.0.1 only
+
+Messages are either LSP-style (a Content-Length header, a blank line and
+the JSON body) or one JSON object per line; each response uses the
+framing of its request. Requests on one connection are handled
+concurrently and answered as they finish, so clients can pipeline them
+and match responses by id.
+
+Methods (params in braces):
+    initialize {}                           server version, languages, methods
+    open {uri, language, text? | path?}     keep a Document open, parsed once
+    change {uri, changes}                   incremental edits: [{range, text}] with
+                                            0-based {line, character} positions,
+                                            or [{text}] to replace everything
+    text {uri}                              current text and version
+    edit {uri | path, op, args?, scope?}    one apply_edits op, e.g. op="rename_var"
+    plan {uri | path, edits, compose?, dry_run?}
+    query {uri | path, start_line, end_line}
+    save {uri, suffix?, path?}              write through the output policy
+    close {uri}
+    shutdown {}
+
+TCP connections must first call initialize with the server's token
+{"token": ...} (from CODEEDITOR_TOKEN, or generated and printed at
+startup); the Unix socket is only accessible to its owner.
+
+Calls on a path also need "language" and write their output like the
+editor does. Calls on an open document change it in memory and return
+its new version, plus "text" or a "diff" when params["return"] asks for it.
+"""
+from typing import Any, Dict, List, Optional
+import argparse
+import asyncio
+import difflib
+import hmac
+import json
+import os
+import secrets
+import socket
+import stat
+import sys
+
+from codeEditorSDK import __version__
+from codeEditorSDK.core.aio import AsyncCodeFileEditor
+from codeEditorSDK.core.document import Document, TextEdit
+from codeEditorSDK.factories import MultiLangEditorFactory
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+EDIT_FAILED = -32000
+UNAUTHORIZED = -32001
+
+
+class RPCError(Exception):
+    """Error reported to the client as a JSON-RPC error object"""
+    def __init__(self, code: int, message: str, data: Any = None):
+        super().__init__(message)
+        self.code = code
+        self.data = data
+
+
+class _OpenDocument:
+    """A Document held by the server, with its language, version and lock"""
+    __slots__ = ('doc', 'language', 'version', 'lock')
+
+    def __init__(self, doc: Document, language: str):
+        self.doc = doc
+        self.language = language
+        self.version = 0
+        # One request at a time may read or change a document
+        self.lock = asyncio.Lock()
+
+
+class EditServer:
+    """
+    Keeps one warm AsyncCodeFileEditor per language and the open Documents
+    (with their syntax trees) across requests and connections.
+    """
+    def __init__(self, workers: Optional[int] = None, cache=None, max_inflight: int = 64,
+                 token: Optional[str] = None):
+        """
+        :param workers: Worker threads per language editor
+        :param cache: AnalysisCache shared by the editors
+        :param max_inflight: Requests handled at once per connection; reading
+            pauses beyond this, so a fast client cannot queue without bound
+        :param token: Secret a connection must pass to initialize before any
+            other call. Generated when listening on TCP without one, since
+            any local user could otherwise read and write files through it
+        """
+        self.workers = workers
+        self.cache = cache
+        self.max_inflight = max_inflight
+        self.token = token
+        self.editors: Dict[str, AsyncCodeFileEditor] = {}
+        self.documents: Dict[str, _OpenDocument] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._methods = {
+            'initialize': self.initialize,
+            'open': self.open,
+            'change': self.change,
+            'text': self.text,
+            'edit': self.edit,
+            'plan': self.plan,
+            'query': self.query,
+            'save': self.save,
+            'close': self.close,
+            'shutdown': self.shutdown,
+        }
+
+    # ----- transport ----- #
+
+    async def start(self, socket_path: Optional[str] = None, host: str = '127.0.0.1',
+                    port: int = 0) -> asyncio.AbstractServer:
+        """Listen on a Unix socket when socket_path is given, else on host:port"""
+        if socket_path:
+            self._server = await asyncio.start_unix_server(self._serve_connection,
+                                                           sock=_bind_private(socket_path))
+        else:
+            if self.token is None:
+                self.token = secrets.token_urlsafe(32)
+            self._server = await asyncio.start_server(self._serve_connection, host, port)
+        return self._server
+
+    async def serve_forever(self) -> None:
+        async with self._server:
+            try:
+                await self._server.serve_forever()
+            except asyncio.CancelledError:
+                pass
+        for editor in self.editors.values():
+            editor.close(wait=False)
+
+    async def _serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        write_lock = asyncio.Lock()
+        slots = asyncio.Semaphore(self.max_inflight)
+        tasks = set()
+        session = {'authorized': self.token is None}
+
+        async def send(reply, framed: bool) -> None:
+            data = _encode(reply)
+            if framed:
+                data = b'Content-Length: %d\r\n\r\n' % len(data) + data
+            else:
+                data += b'\n'
+            async with write_lock:
+                writer.write(data)
+                await writer.drain()
+
+        async def respond(body: bytes, framed: bool) -> None:
+            try:
+                reply = await self.handle_message(body, session)
+                if reply is not None:
+                    await send(reply, framed)
+            except ConnectionError:
+                pass
+            finally:
+                slots.release()
+
+        try:
+            while True:
+                message = await self._read_message(reader)
+                if message is None:
+                    break
+                if message[0] is None:
+                    # Framing is lost, so nothing after this can be read reliably
+                    await send(_error(None, RPCError(PARSE_ERROR, "Invalid Content-Length header")), True)
+                    break
+                await slots.acquire()
+                task = asyncio.ensure_future(respond(*message))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            # Client went away, or the server is shutting down
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _read_message(reader: asyncio.StreamReader):
+        """
+        (body, framed) of the next message, or None at end of stream.
+        The body is None when a Content-Length header is malformed.
+        """
+        while True:
+            line = await reader.readline()
+            if not line:
+                return None
+            if line.strip():
+                break
+        if not line.lower().startswith(b'content-length:'):
+            return line, False
+        # Skip any further headers up to the blank line
+        while (await reader.readline()).strip():
+            pass
+        try:
+            length = int(line.split(b':', 1)[1])
+        except ValueError:
+            length = -1
+        if length < 0:
+            # The body cannot be found; answer once, then the caller hangs up
+            return None, True
+        return await reader.readexactly(length), True
+
+    # ----- dispatch ----- #
+
+    async def handle_message(self, body: bytes, session: Optional[dict] = None):
+        """
+        Response object (or list, for a batch) for one raw message; None for notifications.
+        :param session: Per-connection state; None for trusted in-process callers
+        """
+        try:
+            message = json.loads(body)
+        except ValueError as ex:
+            return _error(None, RPCError(PARSE_ERROR, f"Parse error: {ex}"))
+        if isinstance(message, list):
+            if not message:
+                return _error(None, RPCError(INVALID_REQUEST, "Empty batch"))
+            replies = await asyncio.gather(*(self.handle_request(m, session) for m in message))
+            return [r for r in replies if r is not None] or None
+        return await self.handle_request(message, session)
+
+    async def handle_request(self, message, session: Optional[dict] = None) -> Optional[dict]:
+        if not isinstance(message, dict) or not isinstance(message.get('method'), str):
+            return _error(None, RPCError(INVALID_REQUEST, "Invalid request"))
+        request_id = message.get('id')
+        notification = 'id' not in message
+        try:
+            method = self._methods.get(message['method'])
+            if method is None:
+                raise RPCError(METHOD_NOT_FOUND, f"Method not found: {message['method']}")
+            params = message.get('params') or {}
+            if not isinstance(params, dict):
+                raise RPCError(INVALID_PARAMS, "params must be an object")
+            if session is not None and not session['authorized']:
+                self._authorize(message['method'], params, session)
+            result = await method(params)
+        except RPCError as ex:
+            return None if notification else _error(request_id, ex)
+        except Exception as ex:
+            error = RPCError(EDIT_FAILED, str(ex), {'type': type(ex).__name__})
+            return None if notification else _error(request_id, error)
+        if notification:
+            return None
+        return {'jsonrpc': '2.0', 'id': request_id, 'result': result}
+
+    def _authorize(self, method: str, params: Dict[str, Any], session: dict) -> None:
+        """Let the connection in once initialize passes the right token"""
+        token = params.get('token')
+        if method != 'initialize' or not isinstance(token, str) or \
+                not hmac.compare_digest(token.encode('utf8'), self.token.encode('utf8')):
+            raise RPCError(UNAUTHORIZED, "Unauthorized: call initialize with the server token first")
+        session['authorized'] = True
+
+    def _editor(self, language: Optional[str]) -> AsyncCodeFileEditor:
+        if not language:
+            raise RPCError(INVALID_PARAMS, "Missing 'language'")
+        language = language.lower()
+        if language not in MultiLangEditorFactory.SUPPORTED_LANGUAGES:
+            raise RPCError(INVALID_PARAMS, f"Unsupported language: {language}")
+        editor = self.editors.get(language)
+        if editor is None:
+            editor = self.editors[language] = AsyncCodeFileEditor(
+                language, max_workers=self.workers, cache=self.cache)
+        return editor
+
+    def _document(self, params: Dict[str, Any]) -> _OpenDocument:
+        uri = params.get('uri')
+        entry = self.documents.get(uri)
+        if entry is None:
+            raise RPCError(INVALID_PARAMS, f"Unknown document: {uri}")
+        return entry
+
+    async def _run_plan(self, params: Dict[str, Any], edits: List[Dict[str, Any]],
+                        compose: bool = False, dry_run=False):
+        """Run a plan on an open document (in memory) or on a path (written out)"""
+        if 'uri' not in params:
+            path = _require(params, 'path')
+            editor = self._editor(params.get('language'))
+            return {'output': await editor.apply_edits(path, edits, compose=compose, dry_run=dry_run)}
+        entry = self._document(params)
+        async with entry.lock:
+            editor = self._editor(entry.language)
+            before = entry.doc.text if params.get('return') == 'diff' else None
+            result = await editor.apply_edits(entry.doc, edits, compose=compose, dry_run=dry_run)
+            if dry_run:
+                return {'version': entry.version, 'output': _plain(result)}
+            entry.version += 1
+            return self._describe(entry, params, before)
+
+    @staticmethod
+    def _describe(entry: _OpenDocument, params: Dict[str, Any], before: Optional[str] = None) -> dict:
+        reply: Dict[str, Any] = {'version': entry.version}
+        wanted = params.get('return')
+        if wanted == 'text':
+            reply['text'] = entry.doc.text
+        elif wanted == 'diff':
+            reply['diff'] = ''.join(difflib.unified_diff(
+                before.splitlines(True), entry.doc.text.splitlines(True),
+                fromfile=f"a/{params['uri']}", tofile=f"b/{params['uri']}"))
+        return reply
+
+    # ----- methods ----- #
+
+    async def initialize(self, params: Dict[str, Any]) -> dict:
+        return {'name': 'codeEditorSDK', 'version': __version__,
+                'languages': sorted(MultiLangEditorFactory.SUPPORTED_LANGUAGES),
+                'methods': sorted(self._methods)}
+
+    async def open(self, params: Dict[str, Any]) -> dict:
+        language = params.get('language')
+        editor = self._editor(language)
+        path = params.get('path')
+        uri = params.get('uri') or path
+        if not uri:
+            raise RPCError(INVALID_PARAMS, "open needs a 'uri' or a 'path'")
+        if 'text' in params:
+            doc = Document(params['text'], path=path)
+        elif path:
+            doc = await editor.load(path)
+        else:
+            raise RPCError(INVALID_PARAMS, "open needs 'text' or a 'path'")
+        entry = _OpenDocument(doc, language.lower())
+        # Parse now so the first edit starts from a warm tree
+        await editor.run('symbols', doc)
+        self.documents[uri] = entry
+        return {'uri': uri, 'version': entry.version, 'lines': doc.line_count}
+
+    async def change(self, params: Dict[str, Any]) -> dict:
+        entry = self._document(params)
+        changes = _require(params, 'changes')
+        async with entry.lock:
+            await asyncio.get_running_loop().run_in_executor(None, _apply_changes, entry.doc, changes)
+            entry.version += 1
+            return self._describe(entry, params)
+
+    async def text(self, params: Dict[str, Any]) -> dict:
+        entry = self._document(params)
+        async with entry.lock:
+            return {'version': entry.version, 'text': entry.doc.text}
+
+    async def edit(self, params: Dict[str, Any]) -> dict:
+        edit = {'op': _require(params, 'op'), 'args': params.get('args') or {},
+                'scope': params.get('scope') or {}}
+        return await self._run_plan(params, [edit])
+
+    async def plan(self, params: Dict[str, Any]) -> dict:
+        edits = _require(params, 'edits')
+        if not isinstance(edits, list):
+            raise RPCError(INVALID_PARAMS, "'edits' must be a list")
+        return await self._run_plan(params, edits, compose=bool(params.get('compose')),
+                                    dry_run=params.get('dry_run', False))
+
+    async def query(self, params: Dict[str, Any]) -> dict:
+        start, end = _require(params, 'start_line'), _require(params, 'end_line')
+        if 'uri' not in params:
+            editor = self._editor(params.get('language'))
+            return {'text': await editor.query(_require(params, 'path'), start, end)}
+        entry = self._document(params)
+        async with entry.lock:
+            text = await self._editor(entry.language).query(entry.doc, start, end)
+            return {'version': entry.version, 'text': text}
+
+    async def save(self, params: Dict[str, Any]) -> dict:
+        entry = self._document(params)
+        async with entry.lock:
+            output = await self._editor(entry.language).commit(
+                entry.doc, params.get('suffix', '_chained'), params.get('path'))
+            return {'version': entry.version, 'output': output}
+
+    async def close(self, params: Dict[str, Any]) -> bool:
+        entry = self._document(params)
+        async with entry.lock:
+            self.documents.pop(params['uri'], None)
+        return True
+
+    async def shutdown(self, params: Dict[str, Any]) -> None:
+        if self._server is not None:
+            # Let this response go out before the server stops
+            asyncio.get_running_loop().call_soon(self._server.close)
+        return None
+
+
+def _apply_changes(doc: Document, changes: List[Dict[str, Any]]) -> None:
+    """
+    Apply LSP-style content changes in order. Ranges use 0-based lines and
+    character (code point) columns. The tree is only told about the edits;
+    the editor reparses it incrementally on the next operation. If any
+    change is invalid, none of them is kept.
+    """
+    before = doc.source
+    try:
+        for change in changes:
+            text = change.get('text') if isinstance(change, dict) else None
+            if not isinstance(text, str):
+                raise RPCError(INVALID_PARAMS, "Each change needs a 'text' string")
+            rng = change.get('range')
+            if rng is None:
+                doc.apply([TextEdit(0, doc.size, text)])
+                continue
+            start, end = _offset(doc, rng.get('start')), _offset(doc, rng.get('end'))
+            if end < start:
+                raise RPCError(INVALID_PARAMS, "Change range ends before it starts")
+            doc.apply([TextEdit(start, end, text)])
+    except BaseException:
+        if doc.source != before:
+            doc.update(before.decode('utf8'), None)
+        raise
+
+
+def _offset(doc: Document, position: Dict[str, int]) -> int:
+    """Byte offset of a {line, character} position, clamped to the document"""
+    if not isinstance(position, dict) or not all(
+            isinstance(position.get(k), int) and position[k] >= 0 for k in ('line', 'character')):
+        raise RPCError(INVALID_PARAMS, "Positions need non-negative 'line' and 'character'")
+    line = position['line']
+    if line >= doc.line_count:
+        return doc.size
+    text = doc.line(line).rstrip('\r\n')
+    column = min(position['character'], len(text))
+    return doc.line_span(line, line + 1)[0] + len(text[:column].encode('utf8'))
+
+
+def _require(params: Dict[str, Any], name: str):
+    if name not in params:
+        raise RPCError(INVALID_PARAMS, f"Missing '{name}'")
+    return params[name]
+
+
+def _plain(value):
+    """JSON-friendly form of a dry-run result (Change tuples become objects)"""
+    if isinstance(value, list):
+        return [v._asdict() if hasattr(v, '_asdict') else v for v in value]
+    return value
+
+
+def _bind_private(path: str) -> socket.socket:
+    """Unix socket bound at path with owner-only permissions from the start"""
+    if os.path.exists(path) and stat.S_ISSOCK(os.stat(path).st_mode):
+        os.remove(path)  # left over from an earlier run
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old_umask = os.umask(0o177)
+    try:
+        sock.bind(path)
+    except OSError:
+        sock.close()
+        raise
+    finally:
+        os.umask(old_umask)
+    return sock
+
+
+def _encode(reply) -> bytes:
+    """Serialized reply; a result that is not JSON becomes an error response"""
+    if isinstance(reply, list):
+        return b'[' + b','.join(_encode(r) for r in reply) + b']'
+    try:
+        return json.dumps(reply).encode('utf8')
+    except (TypeError, ValueError) as ex:
+        error = RPCError(INTERNAL_ERROR, f"Result could not be serialized: {ex}")
+        return json.dumps(_error(reply.get('id'), error)).encode('utf8')
+
+
+def _error(request_id, error: RPCError) -> dict:
+    payload: Dict[str, Any] = {'code': error.code, 'message': str(error)}
+    if error.data is not None:
+        payload['data'] = error.data
+    return {'jsonrpc': '2.0', 'id': request_id, 'error': payload}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m codeEditorSDK.server',
+                                     description='Serve editor operations over JSON-RPC.')
+    where = parser.add_mutually_exclusive_group()
+    where.add_argument('--socket', help='Unix socket path to listen on')
+    where.add_argument('--port', type=int, default=0, help='TCP port on --host (default: any free port)')
+    parser.add_argument('--host', default='127.0.0.1', help='TCP host (default: 127.0.0.1)')
+    parser.add_argument('--workers', type=int, help='Worker threads per language')
+    parser.add_argument('--cache', help='AnalysisCache database shared by all requests')
+    args = parser.parse_args(argv)
+
+    async def run() -> None:
+        cache = None
+        if args.cache:
+            from codeEditorSDK.core.cache import AnalysisCache
+            cache = AnalysisCache(args.cache)
+        server = EditServer(workers=args.workers, cache=cache,
+                            token=os.environ.get('CODEEDITOR_TOKEN') or None)
+        listener = await server.start(args.socket, args.host, args.port)
+        where = args.socket or '%s:%d' % listener.sockets[0].getsockname()[:2]
+        print(f"codeEditorSDK server listening on {where}", file=sys.stderr, flush=True)
+        if not args.socket and not os.environ.get('CODEEDITOR_TOKEN'):
+            print(f"token: {server.token}", file=sys.stderr, flush=True)
+        await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if args.socket and os.path.exists(args.socket):
+            os.remove(args.socket)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,14 +1,63 @@
-from typing import Optional
-from tree_sitter import Parser
-from tree_sitter_languages import get_language
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+from codeEditorSDK.utils.languages import ThreadParser
+from codeEditorSDK.utils.queries import MEMBER_FIELDS, capture_nodes
 import re
 
+# Statements a break/continue may belong to instead of the loop being unrolled
+_LOOP_TYPES = {"for_statement", "while_statement", "do_statement",
+               "for_range_loop", "enhanced_for_statement"}
+_SWITCH_TYPES = {"switch_statement", "switch_expression"}
+
+# Expressions that may have side effects, so a loop bound containing one
+# cannot be evaluated a different number of times
+_IMPURE_TYPES = {"call_expression", "method_invocation", "update_expression",
+                 "assignment_expression", "object_creation_expression", "new_expression"}
+_CALL_TYPES = {"call_expression", "method_invocation", "object_creation_expression", "new_expression"}
+
+# What a bound may be built from when the body makes calls: locals and literals
+_PLAIN_BOUND_TYPES = {"identifier", "number_literal", "decimal_integer_literal",
+                      "binary_expression", "unary_expression", "parenthesized_expression"}
+
+# Local declarations; a body declaring names keeps its braces when copied
+_DECLARATION_TYPES = {"declaration", "local_variable_declaration", "alias_declaration",
+                      "type_definition", "class_declaration", "local_class_declaration"}
+
+# Where an expression can replace an identifier without parentheses
+_BARE_PARENTS = {"argument_list", "subscript_argument_list", "parenthesized_expression"}
+_BARE_FIELDS = {("subscript_expression", "index"), ("array_access", "index"),
+                ("init_declarator", "value"), ("variable_declarator", "value"),
+                ("assignment_expression", "right")}
+
+
+class CountedLoop:
+    """
+    A for loop of the form for (init; var < bound; var += step) whose body
+    never writes var or the bound, and has no break, continue or goto of its own.
+    """
+    __slots__ = ('node', 'var', 'init', 'op', 'bound', 'step', 'condition', 'update', 'body')
+
+    def __init__(self, node, var: bytes, init, op: str, bound, step: int,
+                 condition, update, body):
+        self.node = node
+        self.var = var
+        self.init = init
+        self.op = op
+        self.bound = bound
+        self.step = step
+        self.condition = condition
+        self.update = update
+        self.body = body
+
+    def __repr__(self) -> str:
+        return f"CountedLoop({self.var!r}, op={self.op!r}, step={self.step}, at={self.node.start_point})"
+
 
 class ASTUnrollHelper:
+    parser = ThreadParser()
+
     def __init__(self, language: str):
         self.language = language
-        self.parser = Parser()
-        self.parser.set_language(get_language(language))
 
         # Set supported loop and function types
         if language == "python":
@@ -49,27 +98,207 @@ class ASTUnrollHelper:
         # Return new code replacing the entire loop node
         return code[:loop_node.start_byte] + unrolled_body + code[loop_node.end_byte:]
 
+    def counted_loop(self, node, source: bytes) -> Optional[CountedLoop]:
+        """
+        Describe a C/C++/Java for loop that can be unrolled, or None.
+        The counter must be a plain variable compared with < or <= against a
+        side-effect-free bound, stepped by a positive integer constant, and
+        neither it nor the bound may be written inside the body, directly or
+        through a member, pointer or index. A body with calls also needs a
+        bound the calls cannot change: locals whose address is never taken
+        and literals.
+        """
+        if self.language == "python" or node.type != "for_statement":
+            return None
+        init = node.child_by_field_name("initializer") or node.child_by_field_name("init")
+        condition = node.child_by_field_name("condition")
+        update = node.child_by_field_name("update")
+        body = node.child_by_field_name("body")
+        if condition is None or update is None or body is None:
+            return None
+        if condition.type != "binary_expression":
+            return None
+        left = condition.child_by_field_name("left")
+        op = condition.child_by_field_name("operator")
+        bound = condition.child_by_field_name("right")
+        if left is None or left.type != "identifier" or op is None or bound is None:
+            return None
+        op = _text(source, op)
+        if op not in ("<", "<="):
+            return None
+        var = _text(source, left)
+        if not self._initializes(init, var, source):
+            return None
+        step = self._step(update, var, source)
+        if step is None:
+            return None
+        if any(n.type in _IMPURE_TYPES for n in _walk(bound)):
+            return None
+        guarded = {var} | {_text(source, n) for n in _walk(bound) if n.type == "identifier"}
+        if self._writes(body, guarded, source) or self._escapes(body):
+            return None
+        if any(n.type in _CALL_TYPES for n in _walk(body)) and not self._call_safe(node, bound, source):
+            return None
+        return CountedLoop(node, var.encode("utf8"), init, op, bound, step, condition, update, body)
+
+    def _initializes(self, init, var: str, source: bytes) -> bool:
+        """Whether a for-init is empty, var = x, or a single declaration of var"""
+        if init is None:
+            return True
+        if init.type == "assignment_expression":
+            left = init.child_by_field_name("left")
+            return (left is not None and left.type == "identifier" and _text(source, left) == var
+                    and _text(source, init.child_by_field_name("operator")) == "=")
+        if init.type in ("declaration", "local_variable_declaration"):
+            declarators = init.children_by_field_name("declarator")
+            if len(declarators) != 1:
+                return False
+            name = declarators[0].child_by_field_name("declarator") or \
+                declarators[0].child_by_field_name("name")
+            return name is not None and name.type == "identifier" and _text(source, name) == var
+        return False
+
+    def _step(self, update, var: str, source: bytes) -> Optional[int]:
+        """Constant increment of var++, ++var, var += k or var = var + k"""
+        if update.type == "update_expression":
+            operand = next((c for c in update.named_children if c.type == "identifier"), None)
+            if operand is not None and _text(source, operand) == var and "++" in _text(source, update):
+                return 1
+            return None
+        if update.type != "assignment_expression":
+            return None
+        left = update.child_by_field_name("left")
+        right = update.child_by_field_name("right")
+        op = _text(source, update.child_by_field_name("operator"))
+        if left is None or right is None or _text(source, left) != var:
+            return None
+        if op == "=" and right.type == "binary_expression":
+            # var = var + k
+            if (_text(source, right.child_by_field_name("operator")) != "+"
+                    or _text(source, right.child_by_field_name("left")) != var):
+                return None
+            right = right.child_by_field_name("right")
+        elif op != "+=":
+            return None
+        literal = _text(source, right)
+        return int(literal) if literal.isdigit() and int(literal) > 0 else None
+
+    def _writes(self, body, names: set, source: bytes) -> bool:
+        """
+        Whether the body assigns, increments or takes the address of any of
+        names, or of something reached from one (v->n, *p, a[k], s.f)
+        """
+        for n in _walk(body):
+            if n.type == "assignment_expression":
+                target = n.child_by_field_name("left")
+            elif n.type == "update_expression":
+                target = n.child_by_field_name("argument") or next(iter(n.named_children), None)
+            elif n.type == "pointer_expression" and _text(source, n.child_by_field_name("operator")) == "&":
+                target = n.child_by_field_name("argument")
+            else:
+                continue
+            root = _lvalue_root(target)
+            if root is not None and _text(source, root) in names:
+                return True
+        return False
+
+    def _call_safe(self, loop, bound, source: bytes) -> bool:
+        """
+        Whether no call can change the bound: it only combines literals and
+        plain locals of the enclosing function that are never address-taken,
+        bound to a reference or captured by a lambda
+        """
+        names = set()
+        for n in _walk(bound):
+            if n.type == "identifier":
+                names.add(_text(source, n))
+            elif n.is_named and n.type not in _PLAIN_BOUND_TYPES:
+                return False
+        if not names:
+            return True
+        func = loop.parent
+        while func is not None and func.type != self.func_type:
+            func = func.parent
+        if func is None:
+            return False
+        plain = set()
+        for n in _walk(func):
+            if n.type in ("parameter_declaration", "formal_parameter"):
+                declarators = [n.child_by_field_name("declarator") or n.child_by_field_name("name")]
+            elif n.type in ("declaration", "local_variable_declaration"):
+                declarators = n.children_by_field_name("declarator")
+            else:
+                aliased = n.type == "lambda_expression" or (
+                    n.type == "pointer_expression" and _text(source, n.child_by_field_name("operator")) == "&") or (
+                    n.type == "init_declarator" and n.child_by_field_name("declarator") is not None
+                    and n.child_by_field_name("declarator").type == "reference_declarator")
+                if aliased and any(i.type == "identifier" and _text(source, i) in names for i in _walk(n)):
+                    return False
+                continue
+            for d in declarators:
+                if d is not None and d.type in ("init_declarator", "variable_declarator"):
+                    d = d.child_by_field_name("declarator") or d.child_by_field_name("name")
+                if d is not None and d.type == "identifier":
+                    plain.add(_text(source, d))
+        return names <= plain
+
+    def _escapes(self, body) -> bool:
+        """Whether the body has a goto, or a break/continue that targets this loop"""
+        stack = [(body, False, False)]
+        while stack:
+            node, in_loop, in_switch = stack.pop()
+            if node.type == "goto_statement":
+                return True
+            if node.type == "continue_statement" and not in_loop:
+                return True
+            if node.type == "break_statement" and not (in_loop or in_switch):
+                return True
+            in_loop = in_loop or node.type in _LOOP_TYPES
+            in_switch = in_switch or node.type in _SWITCH_TYPES
+            stack.extend((c, in_loop, in_switch) for c in node.children)
+        return False
+
+    def unroll_counted_loops(self, source: bytes, scope, loop_nodes: list, factor: int,
+                             indent_unit: str = "    ") -> List[Tuple[int, int, str]]:
+        """
+        Unroll every counted loop among loop_nodes by factor in one pass.
+        Each loop becomes a block with the unrolled loop, stepping by
+        factor * step with the counter offset in each body copy, followed by
+        the original loop as the remainder epilogue. Nested counted loops are
+        rewritten innermost-first into their parents' copies.
+        :param scope: Node containing all the loops (the function or the root)
+        :return: Non-overlapping (start_byte, end_byte, new_text) replacements
+        """
+        if factor <= 1:
+            return []
+        loops = [c for c in (self.counted_loop(n, source) for n in loop_nodes) if c is not None]
+        if not loops:
+            return []
+        unroller = _Unroller(self.language, source, loops, scope, factor, indent_unit.encode("utf8"))
+        return unroller.rewrites()
+
     def find_function_body(self, node, code, func_name):
-        if node.type == self.func_type:
-            if func_name:
-                id_node = next((c for c in node.children if c.type == "identifier"), None)
-                if not id_node or code[id_node.start_byte:id_node.end_byte] != func_name:
-                    return None
-            return node.child_by_field_name("body")
-        for child in node.children:
-            result = self.find_function_body(child, code, func_name)
-            if result:
-                return result
-        return None
+        """Body of the named function under node (the first function when no name is given)"""
+        if func_name:
+            func_node = self.find_function_node(node, code, func_name)
+        else:
+            func_node = next(iter(self.find_functions(node)), None)
+        return func_node.child_by_field_name("body") if func_node else None
 
     def find_first_loop(self, node):
-        if node.type in self.loop_types:
-            return node
-        for child in node.children:
-            result = self.find_first_loop(child)
-            if result:
-                return result
-        return None
+        return next(iter(self.find_loops(node)), None)
+
+    def find_functions(self, node) -> list:
+        """All function nodes under node, in document order"""
+        return capture_nodes(self.language, "function", node, "function")
+
+    def find_loops(self, node) -> list:
+        """All loop nodes under node (including node itself), in document order"""
+        return capture_nodes(self.language, "loop", node, "loop")
+
+    def find_conditions(self, node) -> list:
+        """Condition nodes of every if-statement under node, in document order"""
+        return capture_nodes(self.language, "condition", node, "condition")
 
     def _detect_indent(self, source: str, pos: int) -> str:
         line_start = source.rfind('\n', 0, pos) + 1
@@ -78,28 +307,196 @@ class ASTUnrollHelper:
         match = re.match(r'^(\s*)', line)
         return match.group(1) if match else ''
 
-    def find_function_node(self, root_node, text: str, func_name: str) -> Optional[object]:
+    def find_function_node(self, root_node, text, func_name: str) -> Optional[object]:
         """
         Locate the specified function node in the AST. Supported languages: Python, Java, C, C++.
         """
-        func_type = {
-            'python': 'function_definition',
-            'java': 'method_declaration',
-            'c': 'function_definition',
-            'cpp': 'function_definition'
-        }.get(self.language, 'function_definition')
-
-        def dfs(node):
-            if node.type == func_type:
-                id_node = next((c for c in node.children if c.type == 'identifier'), None)
-                if id_node:
-                    name = text[id_node.start_byte:id_node.end_byte]
-                    if name == func_name:
-                        return node
-            for child in node.children:
-                result = dfs(child)
-                if result:
-                    return result
+        for name_node in capture_nodes(self.language, "function", root_node, "name"):
+            if self.function_name(name_node, text) == func_name:
+                node = name_node.parent
+                while node is not None and node.type != self.func_type:
+                    node = node.parent
+                return node
+        return None
+
+    def function_name(self, name_node, text) -> str:
+        """Plain name of a captured function name node (drops C++ scope qualifiers)"""
+        if name_node.type == "qualified_identifier":
+            name_node = name_node.child_by_field_name("name") or name_node
+        name = text[name_node.start_byte:name_node.end_byte]
+        return name.decode("utf8") if isinstance(name, bytes) else name
+
+
+def _text(source: bytes, node) -> str:
+    return source[node.start_byte:node.end_byte].decode("utf8") if node is not None else ""
+
+
+def _walk(node):
+    """node and all its descendants, depth first"""
+    stack = [node]
+    while stack:
+        n = stack.pop()
+        yield n
+        stack.extend(n.children)
+
+
+def _lvalue_root(node):
+    """Variable at the root of name, name[i], name.f or *name; None otherwise"""
+    while node is not None:
+        if node.type == "identifier":
+            return node
+        if node.type in ("subscript_expression", "array_access"):
+            node = node.child_by_field_name("argument") or node.child_by_field_name("array")
+        elif node.type in ("field_expression", "field_access"):
+            node = node.child_by_field_name("argument") or node.child_by_field_name("object")
+        elif node.type == "pointer_expression":
+            node = node.child_by_field_name("argument")
+        elif node.type == "parenthesized_expression":
+            node = next(iter(node.named_children), None)
+        else:
             return None
+    return None
+
+
+def _line_indent(source: bytes, pos: int) -> bytes:
+    """Leading whitespace of the line containing pos"""
+    start = source.rfind(b"\n", 0, pos) + 1
+    end = start
+    while end < len(source) and source[end:end + 1] in (b" ", b"\t"):
+        end += 1
+    return source[start:end]
+
+
+def _reindent(text: bytes, old_base: bytes, new_base: bytes) -> bytes:
+    """Move every line after the first from old_base to new_base indentation"""
+    lines = text.split(b"\n")
+    for i in range(1, len(lines)):
+        line = lines[i]
+        if not line.strip():
+            lines[i] = b""
+        elif line.startswith(old_base):
+            lines[i] = new_base + line[len(old_base):]
+        else:
+            lines[i] = new_base + line.lstrip()
+    return b"\n".join(lines)
+
+
+class _Unroller:
+    """Renders unrolled loops; see ASTUnrollHelper.unroll_counted_loops"""
+
+    def __init__(self, language: str, source: bytes, loops: List[CountedLoop], scope,
+                 factor: int, unit: bytes):
+        self.source = source
+        self.factor = factor
+        self.unit = unit
+        self.loops = sorted(loops, key=lambda c: c.node.start_byte)
+        counters = {c.var for c in loops}
+        member_fields = MEMBER_FIELDS.get(language, ())
+        # (start, end, loop or None, counter name, needs parentheses)
+        events = [(c.node.start_byte, c.node.end_byte, c, None, False) for c in self.loops]
+        for node in capture_nodes(language, "identifier", scope, "identifier"):
+            name = source[node.start_byte:node.end_byte]
+            if name not in counters:
+                continue
+            parent = node.parent
+            if parent is not None and any(parent.type == t and _is_child(parent, f, node)
+                                          for t, f in member_fields):
+                continue
+            events.append((node.start_byte, node.end_byte, None, name, not _bare(parent, node)))
+        events.sort(key=lambda e: (e[0], e[2] is None))
+        self.events = events
+        self.starts = [e[0] for e in events]
+
+    def rewrites(self) -> List[Tuple[int, int, str]]:
+        out = []
+        end = -1
+        for c in self.loops:
+            node = c.node
+            if node.start_byte < end:
+                continue  # rendered inside an enclosing counted loop
+            out.append((node.start_byte, node.end_byte, self.render(c, {}).decode("utf8")))
+            end = node.end_byte
+        return out
+
+    def segment(self, start: int, end: int, subst: Dict[bytes, bytes]) -> bytes:
+        """Source between two offsets with counters substituted and nested loops unrolled"""
+        out = []
+        pos = start
+        i = bisect_left(self.starts, start)
+        while i < len(self.events) and self.events[i][0] < end:
+            s, e, loop, name, paren = self.events[i]
+            i += 1
+            if s < pos:
+                continue
+            if loop is not None:
+                out.append(self.source[pos:s])
+                out.append(self.render(loop, subst))
+                pos = e
+            elif name in subst:
+                out.append(self.source[pos:s])
+                out.append(b"(" + subst[name] + b")" if paren else subst[name])
+                pos = e
+        out.append(self.source[pos:end])
+        return b"".join(out)
+
+    def render(self, c: CountedLoop, subst: Dict[bytes, bytes]) -> bytes:
+        src = self.source
+        outer = _line_indent(src, c.node.start_byte)
+        inner = outer + self.unit
+        copy_indent = inner + self.unit
+        subst = {k: v for k, v in subst.items() if k != c.var}
+        var = c.var
+
+        lines = [b"{"]
+        if c.init is not None:
+            init = self.segment(c.init.start_byte, c.init.end_byte, subst).rstrip(b"; ")
+            lines.append(inner + init + b";")
+        offset = (self.factor - 1) * c.step
+        bound = self.segment(c.bound.start_byte, c.bound.end_byte, subst)
+        lines.append(inner + b"for (; %s + %d %s %s; %s += %d) {" % (
+            var, offset, c.op.encode(), bound, var, self.factor * c.step))
+        for k in range(self.factor):
+            copy_subst = dict(subst)
+            if k:
+                copy_subst[var] = b"%s + %d" % (var, k * c.step)
+            lines.append(copy_indent + self.body(c, copy_subst, outer, copy_indent))
+        lines.append(inner + b"}")
+
+        # Remainder: the original loop without its initializer
+        condition = self.segment(c.condition.start_byte, c.condition.end_byte, subst)
+        update = self.segment(c.update.start_byte, c.update.end_byte, subst)
+        # An unbraced body on its own line is indented from that line, not the loop's
+        body = _reindent(self.segment(c.body.start_byte, c.body.end_byte, subst),
+                         _line_indent(src, c.body.start_byte), inner)
+        lines.append(inner + b"for (; %s; %s) %s" % (condition, update, body))
+        lines.append(outer + b"}")
+        return b"\n".join(lines)
+
+    def body(self, c: CountedLoop, subst: Dict[bytes, bytes], outer: bytes, indent: bytes) -> bytes:
+        """One copy of the loop body, indented for the unrolled loop"""
+        body = c.body
+        statements = body.named_children if body.type in ("compound_statement", "block") else [body]
+        if not statements:
+            return b";"
+        if body.type in ("compound_statement", "block") and any(
+                s.type in _DECLARATION_TYPES for s in statements):
+            # Keep the braces so the copies' declarations do not collide
+            text = self.segment(body.start_byte, body.end_byte, subst)
+            return _reindent(text, outer, indent)
+        first, last = statements[0], statements[-1]
+        text = self.segment(first.start_byte, last.end_byte, subst)
+        return _reindent(text, _line_indent(self.source, first.start_byte), indent)
+
+
+def _is_child(parent, field: str, node) -> bool:
+    child = parent.child_by_field_name(field)
+    return child is not None and child.start_byte == node.start_byte and child.end_byte == node.end_byte
+
 
-        return dfs(root_node)
+def _bare(parent, node) -> bool:
+    """Whether an expression may stand in for node without parentheses"""
+    if parent is None:
+        return False
+    if parent.type in _BARE_PARENTS:
+        return True
+    return any(parent.type == t and _is_child(parent, f, node) for t, f in _BARE_FIELDS)
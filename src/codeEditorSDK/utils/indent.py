@@ -1,12 +1,14 @@
-from typing import List
-from tree_sitter import Parser, Node
-from tree_sitter_languages import get_language
+from typing import TYPE_CHECKING, List
+from codeEditorSDK.utils.languages import ThreadParser
+
+if TYPE_CHECKING:
+    from tree_sitter import Node
 
 class IndentHelper:
+    parser = ThreadParser()
+
     def __init__(self, language: str):
         self.language = language
-        self.parser = Parser()
-        self.parser.set_language(get_language(language))
     
     def detect_indent(self, line: str) -> str:
         """Detect indentation characters at the beginning of a line"""
@@ -18,6 +20,14 @@ class IndentHelper:
                 break
         return ''.join(indent)
     
+    def detect_indent_unit(self, text: str) -> str:
+        """Guess one indentation step of a file from its first indented line"""
+        for line in text.splitlines():
+            indent = self.detect_indent(line)
+            if indent and line.strip():
+                return '\t' if indent[0] == '\t' else ' ' * min(len(indent), 8)
+        return '    '
+
     def get_indent_level(self, lines: List[str], insert_pos: int) -> str:
         """Get the indentation of a specific line"""
         if not lines:
@@ -70,20 +80,19 @@ class IndentHelper:
             adjusted.append(adjusted_line)
         return '\n'.join(adjusted)
     
-    def _is_block_node(self, node: Node) -> bool:
+    def _is_block_node(self, node: 'Node') -> bool:
         """Check whether this node represents a code block"""
         return node.type in {'suite', 'block'}
     
     def reindent_function_body(self, full_code: str, body_start: int, body_end: int, parent_indent: str = '') -> str:
         """Core reindentation logic for function bodies"""
-        print("[DEBUG] Entering reindent_function_body")
         body_code = full_code[body_start:body_end]
         lines = body_code.splitlines()
         tree = self.parser.parse(bytes(body_code, "utf8"))
         root = tree.root_node
         indent_map = [0] * len(lines)
 
-        def traverse(node: Node, level: int):
+        def traverse(node: 'Node', level: int):
             start_line = node.start_point[0]
             end_line = node.end_point[0]
             
@@ -131,9 +140,6 @@ class IndentHelper:
 
         traverse(root, 1)
 
-        for i, (lvl, line) in enumerate(zip(indent_map, lines)):
-            print(f"[DEBUG] Line {i+1:02d} | Indent Level = {lvl} | Line = {repr(line)}")
-
         base_indent = parent_indent
         unit = '    '
         final_lines = []
@@ -144,11 +150,9 @@ class IndentHelper:
             else:
                 final_lines.append(base_indent + (unit * indent_map[i]) + stripped)
 
-        result = '\n'.join(final_lines)
-        print("[DEBUG] Final re-indented body:\n", result)
-        return result
+        return '\n'.join(final_lines)
     
-    def reindent_node_region(self, full_code: str, node: Node, indent: str = '') -> str:
+    def reindent_node_region(self, full_code: str, node: 'Node', indent: str = '') -> str:
         """Reindent the region of the given node"""
         body_code = full_code[node.start_byte:node.end_byte]
         return self.normalize_code_indent(body_code, indent)
@@ -0,0 +1,53 @@
+from functools import lru_cache
+from typing import TYPE_CHECKING
+import threading
+
+# tree_sitter (which pulls in distutils) and the grammar bundle are only
+# imported when the first grammar is needed, keeping `import codeEditorSDK` cheap
+if TYPE_CHECKING:
+    from tree_sitter import Language, Parser
+
+
+@lru_cache(maxsize=None)
+def get_language(language: str) -> 'Language':
+    """Load a Tree-sitter grammar once per process, on first use"""
+    from tree_sitter_languages import get_language as load_language
+    try:
+        return load_language(language)
+    except Exception as e:
+        raise RuntimeError(f"Parser initialization failed: {e}")
+
+
+# Parsers are not safe to share between threads, so each thread keeps its own
+_parsers = threading.local()
+
+
+def get_parser(language: str) -> 'Parser':
+    """
+    Shared parser for a language in the calling thread.
+    The editor and all of its helpers use the same instance, so building
+    an editor no longer loads the grammar or creates a parser per helper.
+    """
+    cache = getattr(_parsers, 'by_language', None)
+    if cache is None:
+        cache = _parsers.by_language = {}
+    parser = cache.get(language)
+    if parser is None:
+        from tree_sitter import Parser
+        parser = Parser()
+        parser.set_language(get_language(language))
+        cache[language] = parser
+    return parser
+
+
+class ThreadParser:
+    """
+    Class attribute giving each thread its own parser for obj.language.
+    Objects that keep one would pin the parser of the thread that built
+    them; reading self.parser through this leases the caller's parser
+    instead, so one editor can serve several threads at once.
+    """
+    def __get__(self, obj, owner=None) -> 'Parser':
+        if obj is None:
+            return self
+        return get_parser(obj.language)
@@ -0,0 +1,573 @@
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+from codeEditorSDK.utils.ASTUnrollHelper import (
+    _CALL_TYPES, ASTUnrollHelper, CountedLoop, _line_indent, _lvalue_root, _reindent, _text, _walk)
+import re
+
+Rewrite = Tuple[int, int, str]
+
+_BLOCK_TYPES = {"compound_statement", "block"}
+_DECLARATION_TYPES = {"declaration", "local_variable_declaration"}
+_LITERAL_TYPES = {"number_literal", "decimal_integer_literal", "decimal_floating_point_literal"}
+
+# Operators that are safe to evaluate before the loop; / and % are left
+# out because hoisting them could trap when the loop would not have run
+_HOISTABLE_OPS = {"+", "-", "*", "<<", ">>", "&", "|", "^"}
+
+# Declared types whose arithmetic stays in the same type, so a hoisted
+# temporary can be declared with the operands' own type
+_INTEGER_TYPES = {
+    "int", "long", "long int", "long long", "long long int", "unsigned", "unsigned int",
+    "unsigned long", "unsigned long long", "size_t", "ptrdiff_t", "ssize_t",
+    "int32_t", "int64_t", "uint32_t", "uint64_t",
+}
+_FLOAT_TYPES = {"double", "float"}
+
+
+class LoopTransformer:
+    """
+    Loop optimisations for C, C++ and Java built on ASTUnrollHelper's loop
+    discovery: invariant hoisting, fusion of adjacent loops and tiling of
+    perfect nests. Every transform only fires when a conservative check
+    shows the result behaves like the original; other loops are left alone.
+    Each method returns non-overlapping (start_byte, end_byte, new_text) rewrites.
+    """
+    def __init__(self, helper: ASTUnrollHelper):
+        self.helper = helper
+        self.language = helper.language
+
+    # ----- invariant hoisting ----- #
+
+    def hoist_invariants(self, source: bytes, loop_nodes: list) -> List[Rewrite]:
+        """
+        Move arithmetic on unchanging locals and parameters (e.g. n * stride)
+        out of loops into const temporaries declared just before the loop.
+        Each expression goes before the outermost loop it is invariant in.
+        """
+        if self.language == "python":
+            return []
+        loops = sorted((n for n in loop_nodes if n.parent is not None
+                        and n.parent.type in _BLOCK_TYPES), key=lambda n: n.start_byte)
+        claimed: List[Tuple[int, int]] = []
+        functions: Dict[int, tuple] = {}
+        rewrites = []
+        counter = 0
+        for loop in loops:
+            func = self._enclosing_function(loop)
+            if func is None:
+                continue
+            if func.start_byte not in functions:
+                functions[func.start_byte] = self._declarations(func, source)
+            types, address_taken = functions[func.start_byte]
+            changing = self._written(loop, source)[0] | self._declared(loop, source) | address_taken
+            if self.language == "cpp":
+                # A call may take any argument by reference and change it
+                changing |= {_text(source, n) for call in _walk(loop) if call.type in _CALL_TYPES
+                             for arg in call.children_by_field_name("arguments")
+                             for n in _walk(arg) if n.type == "identifier"}
+
+            hoisted: Dict[bytes, Tuple[str, str, str]] = {}  # expression -> (name, type, text)
+            replaced = []
+            for region in self._repeated_regions(loop):
+                stack = [region]
+                while stack:
+                    node = stack.pop()
+                    if any(s <= node.start_byte and node.end_byte <= e for s, e in claimed):
+                        continue
+                    expr = node
+                    if node.type == "parenthesized_expression" and node.named_child_count == 1:
+                        expr = node.named_children[0]  # replace (n * 2) as a whole
+                    if expr.type == "binary_expression":
+                        type_name = self._invariant_type(expr, source, changing, types, loop.start_byte)
+                        if type_name is not None:
+                            key = re.sub(rb"\s+", b"", source[expr.start_byte:expr.end_byte])
+                            if key not in hoisted:
+                                name = self._fresh_name(source, "hoisted", counter)
+                                counter = int(name.rsplit("_", 1)[1]) + 1
+                                hoisted[key] = (name, type_name, _text(source, expr))
+                            replaced.append((node.start_byte, node.end_byte, hoisted[key][0]))
+                            claimed.append((node.start_byte, node.end_byte))
+                            continue
+                    stack.extend(reversed(node.children))
+            if not hoisted:
+                continue
+            indent = _line_indent(source, loop.start_byte).decode("utf8")
+            qualifier = "final" if self.language == "java" else "const"
+            decls = "".join(f"{qualifier} {type_name} {name} = {expr};\n{indent}"
+                            for name, type_name, expr in hoisted.values())
+            rewrites.append((loop.start_byte, loop.start_byte, decls))
+            rewrites.extend(replaced)
+        return sorted(rewrites)
+
+    def _repeated_regions(self, loop) -> list:
+        """Parts of a loop evaluated on every iteration"""
+        return [n for n in (loop.child_by_field_name(f) for f in ("condition", "update", "body"))
+                if n is not None]
+
+    def _invariant_type(self, node, source: bytes, changing: set, types: Dict[str, list],
+                        loop_start: int) -> Optional[str]:
+        """Type for a hoisted copy of node, or None when it is not a hoistable invariant"""
+        names = set()
+        literals = []
+        for n in _walk(node):
+            if n.type == "binary_expression":
+                if _text(source, n.child_by_field_name("operator")) not in _HOISTABLE_OPS:
+                    return None
+            elif n.type == "identifier":
+                names.add(_text(source, n))
+            elif n.type in _LITERAL_TYPES:
+                literals.append(_text(source, n))
+            elif n.is_named and n.type != "parenthesized_expression":
+                return None
+        if not names or names & changing:
+            return None
+        declared = set()
+        for name in names:
+            decls = types.get(name)
+            if not decls or len(decls) != 1 or decls[0][1] > loop_start or decls[0][0] is None:
+                return None
+            declared.add(decls[0][0])
+        if len(declared) != 1:
+            return None
+        type_name = declared.pop()
+        if type_name in _INTEGER_TYPES:
+            if any(not re.fullmatch(r"\d+[uUlL]*", lit) for lit in literals):
+                return None
+        elif type_name == "float":
+            if any(not re.fullmatch(r"\d+", lit) for lit in literals):
+                return None
+        elif type_name not in _FLOAT_TYPES:
+            return None
+        return type_name
+
+    def _enclosing_function(self, node):
+        node = node.parent
+        while node is not None and node.type != self.helper.func_type:
+            node = node.parent
+        return node
+
+    def _declarations(self, func, source: bytes) -> Tuple[Dict[str, list], set]:
+        """
+        Every local and parameter of a function as name -> [(type or None, offset)],
+        plus the names whose address is taken. Pointers and arrays get None.
+        In C++, names bound to a reference or used in a lambda count as
+        address-taken too, since they can change through the alias.
+        """
+        types: Dict[str, list] = {}
+        address_taken = set()
+        for n in _walk(func):
+            if self.language == "cpp" and (n.type == "lambda_expression" or (
+                    n.type == "init_declarator" and n.child_by_field_name("declarator") is not None
+                    and n.child_by_field_name("declarator").type == "reference_declarator")):
+                address_taken |= {_text(source, i) for i in _walk(n) if i.type == "identifier"}
+            if n.type in ("parameter_declaration", "formal_parameter"):
+                declarators = [n.child_by_field_name("declarator") or n.child_by_field_name("name")]
+            elif n.type in _DECLARATION_TYPES:
+                declarators = n.children_by_field_name("declarator")
+            else:
+                if n.type == "pointer_expression" and _text(source, n.child_by_field_name("operator")) == "&":
+                    arg = n.child_by_field_name("argument")
+                    if arg is not None and arg.type == "identifier":
+                        address_taken.add(_text(source, arg))
+                continue
+            type_node = n.child_by_field_name("type")
+            for d in declarators:
+                name, plain = _declared_name(d)
+                if name is None:
+                    continue
+                type_name = _text(source, type_node) if plain and type_node is not None else None
+                if n.type in ("formal_parameter", "local_variable_declaration") and \
+                        n.child_by_field_name("dimensions") is not None:
+                    type_name = None
+                types.setdefault(_text(source, name), []).append((type_name, n.start_byte))
+        return types, address_taken
+
+    # ----- fusion ----- #
+
+    def fuse_loops(self, source: bytes, loop_nodes: list, indent_unit: str = "    ") -> List[Rewrite]:
+        """
+        Merge runs of adjacent counted for loops with identical headers into
+        one loop. Only fuses when no variable written by one body is used
+        by another, except arrays indexed by the loop counter alone, so
+        every iteration sees the same values as before. Pointers and array
+        parameters may alias each other: a body writing through one blocks
+        fusion with a body accessing another, unless both are local arrays.
+        """
+        loops = {n.start_byte: n for n in loop_nodes}
+        done = set()
+        rewrites = []
+        functions: Dict[int, set] = {}
+        for start in sorted(loops):
+            if start in done:
+                continue
+            first = self.helper.counted_loop(loops[start], source)
+            if first is None:
+                continue
+            group = [first]
+            summaries = [self._body_summary(first, source)]
+            if summaries[0] is None:
+                continue
+            func = self._enclosing_function(first.node)
+            key = -1 if func is None else func.start_byte
+            if key not in functions:
+                functions[key] = set() if func is None else self._local_arrays(func, source)
+            arrays = functions[key]
+            node = first.node.next_named_sibling
+            while node is not None and node.start_byte in loops:
+                loop = self.helper.counted_loop(node, source)
+                if loop is None or _header(source, loop) != _header(source, first):
+                    break
+                summary = self._body_summary(loop, source)
+                if summary is None or any(not self._independent(s, summary, first.var, arrays)
+                                              for s in summaries):
+                    break
+                group.append(loop)
+                summaries.append(summary)
+                done.add(node.start_byte)
+                node = node.next_named_sibling
+            if len(group) < 2:
+                continue
+            rewrites.append((first.node.start_byte, group[-1].node.end_byte,
+                             self._fused(source, group, summaries, indent_unit.encode("utf8"))))
+        return rewrites
+
+    def _body_summary(self, loop: CountedLoop, source: bytes) -> Optional[dict]:
+        """Names a loop body reads, writes and declares; None when it cannot be fused"""
+        body = loop.body
+        if self.helper._escapes(body):
+            return None
+        if any(n.type in _CALL_TYPES or n.type == "return_statement" for n in _walk(body)):
+            return None
+        written, unknown = self._written(body, source)
+        if unknown:
+            return None
+        declared = self._declared(body, source)
+        refs = {_text(source, n).encode("utf8") for n in _walk(body) if n.type == "identifier"}
+        derefs, deref_writes = self._dereferenced(body, source)
+        return {"body": body, "written": {w.encode("utf8") for w in written},
+                "declared": {d.encode("utf8") for d in declared}, "refs": refs,
+                "indexed": self._indexed_only(body, source, loop.var),
+                "derefs": derefs - declared, "deref_writes": deref_writes - declared}
+
+    def _independent(self, a: dict, b: dict, var: bytes, arrays: set) -> bool:
+        """Whether two bodies can run interleaved, iteration by iteration"""
+        conflicts = ((a["written"] - a["declared"]) & b["refs"]) | \
+                    ((b["written"] - b["declared"]) & a["refs"])
+        conflicts.discard(var)
+        if not all(name in a["indexed"] and name in b["indexed"] for name in conflicts):
+            return False
+        # Different names may still be the same memory, possibly at an offset
+        # (g(x, x + 1)), so only separate local arrays are known not to overlap
+        for x, y in ((a, b), (b, a)):
+            for written in x["deref_writes"]:
+                for accessed in y["derefs"]:
+                    if accessed != written and not (written in arrays and accessed in arrays):
+                        return False
+        return True
+
+    def _dereferenced(self, body, source: bytes) -> Tuple[set, set]:
+        """Names body reads or writes memory through (a[..], *a, a->f), and those it writes through"""
+        derefs = set()
+        for n in _walk(body):
+            if n.type in ("subscript_expression", "array_access") or \
+                    (n.type == "pointer_expression" and _text(source, n.child_by_field_name("operator")) == "*") or \
+                    (n.type == "field_expression" and _text(source, n.child_by_field_name("operator")) == "->"):
+                root = _lvalue_root(n)
+                if root is not None:
+                    derefs.add(_text(source, root))
+        writes = set()
+        for n in _walk(body):
+            if n.type == "assignment_expression":
+                target = n.child_by_field_name("left")
+            elif n.type == "update_expression":
+                target = n.child_by_field_name("argument") or next(iter(n.named_children), None)
+            else:
+                continue
+            root = _lvalue_root(target)
+            if root is not None and target.type != "identifier":
+                writes.add(_text(source, root))
+        return {d.encode("utf8") for d in derefs}, {w.encode("utf8") for w in writes}
+
+    def _local_arrays(self, func, source: bytes) -> set:
+        """
+        Names declared exactly once in func, as a local C/C++ array: their
+        storage is their own, unlike pointers and array parameters
+        """
+        counts: Dict[bytes, int] = {}
+        arrays = set()
+        for n in _walk(func):
+            if n.type in ("parameter_declaration", "formal_parameter"):
+                declarators = [n.child_by_field_name("declarator") or n.child_by_field_name("name")]
+            elif n.type in _DECLARATION_TYPES:
+                declarators = n.children_by_field_name("declarator")
+            else:
+                continue
+            for d in declarators:
+                name, _ = _declared_name(d)
+                if name is None:
+                    continue
+                name = _text(source, name).encode("utf8")
+                counts[name] = counts.get(name, 0) + 1
+                if n.type == "declaration" and self.language in ("c", "cpp"):
+                    if d.type == "init_declarator":
+                        d = d.child_by_field_name("declarator")
+                    if d is not None and d.type == "array_declarator" and \
+                            not any(c.type == "storage_class_specifier" and _text(source, c) == "extern"
+                                    for c in n.children):
+                        arrays.add(name)
+        return {name for name in arrays if counts[name] == 1}
+
+    def _indexed_only(self, body, source: bytes, var: bytes) -> set:
+        """Names that occur in body only as name[var]"""
+        counts: Dict[bytes, int] = {}
+        indexed: Dict[bytes, int] = {}
+        for n in _walk(body):
+            if n.type == "identifier":
+                name = _text(source, n).encode("utf8")
+                counts[name] = counts.get(name, 0) + 1
+            elif n.type in ("subscript_expression", "array_access"):
+                root, indices = _subscript_chain(n)
+                if root is not None and n.parent.type not in ("subscript_expression", "array_access") \
+                        and len(indices) == 1 and _text(source, indices[0]).encode("utf8") == var:
+                    name = _text(source, root).encode("utf8")
+                    indexed[name] = indexed.get(name, 0) + 1
+        return {name for name, count in indexed.items() if counts.get(name) == count}
+
+    def _fused(self, source: bytes, group: List[CountedLoop], summaries: List[dict], unit: bytes) -> str:
+        first = group[0]
+        outer = _line_indent(source, first.node.start_byte)
+        inner = outer + unit
+        # Keep each body in its own braces if a local could clash with another body
+        braces = any(s["declared"] & (t["refs"] | t["declared"])
+                     for i, s in enumerate(summaries) for j, t in enumerate(summaries) if i != j)
+        parts = []
+        for loop in group:
+            body = loop.body
+            if braces and body.type in _BLOCK_TYPES:
+                parts.append(inner + _reindent(source[body.start_byte:body.end_byte], outer, inner))
+                continue
+            statements = body.named_children if body.type in _BLOCK_TYPES else [body]
+            if statements:
+                text = source[statements[0].start_byte:statements[-1].end_byte]
+                parts.append(inner + _reindent(text, _line_indent(source, statements[0].start_byte), inner))
+        header = source[first.node.start_byte:first.body.start_byte].rstrip()
+        return b"\n".join([header + b" {"] + parts + [outer + b"}"]).decode("utf8")
+
+    # ----- tiling ----- #
+
+    def tile_loops(self, source: bytes, loop_nodes: list,
+                   tile: Union[int, Sequence[int]] = 32, indent_unit: str = "    ") -> List[Rewrite]:
+        """
+        Tile perfect nests of counted for loops (rectangular, declared
+        counters): the counters first step through tiles, then each point
+        loop stays inside its tile and below the original bound. Only nests
+        whose body writes arrays at the same element through plain counter
+        indexes are tiled, so the order of updates to each element is kept.
+        :param tile: Tile size, or one size per nest level (outermost first)
+        """
+        sizes = [tile] if isinstance(tile, int) else list(tile)
+        unit = indent_unit.encode("utf8")
+        rewrites = []
+        end = -1
+        for node in sorted(loop_nodes, key=lambda n: n.start_byte):
+            if node.start_byte < end:
+                continue
+            nest = self._perfect_nest(node, source)
+            if nest is None:
+                continue
+            rewrites.append((node.start_byte, node.end_byte, self._tiled(source, nest, sizes, unit)))
+            end = node.end_byte
+        return rewrites
+
+    def _perfect_nest(self, node, source: bytes) -> Optional[List[CountedLoop]]:
+        """Counted loops of a tileable perfect nest starting at node, outermost first"""
+        nest = []
+        loop = self.helper.counted_loop(node, source)
+        while loop is not None and loop.init is not None and loop.init.type in _DECLARATION_TYPES:
+            nest.append(loop)
+            body = loop.body
+            statements = body.named_children if body.type in _BLOCK_TYPES else [body]
+            if len(statements) != 1 or statements[0].type != "for_statement":
+                break
+            loop = self.helper.counted_loop(statements[0], source)
+        if len(nest) < 2:
+            return None
+        counters = {c.var for c in nest}
+        # Rectangular: no inner start or bound depends on an outer counter
+        for level in nest[1:]:
+            used = {_text(source, n).encode("utf8") for part in (level.init, level.bound)
+                    for n in _walk(part) if n.type == "identifier"}
+            if used & (counters - {level.var}):
+                return None
+            if _init_value(level.init) is None:
+                return None
+        if _init_value(nest[0].init) is None:
+            return None
+        body = nest[-1].body
+        if self.helper._escapes(body):
+            return None
+        if any(n.type in _CALL_TYPES or n.type == "return_statement" for n in _walk(body)):
+            return None
+        if not self._order_preserved(body, source, counters):
+            return None
+        return nest
+
+    def _order_preserved(self, body, source: bytes, counters: set) -> bool:
+        """
+        Whether every element written in body is always accessed as the same
+        name[c1][c2]... with plain counters missing at most one counter, so
+        all iterations updating it still run in their original order.
+        """
+        written, unknown = self._written(body, source)
+        if unknown:
+            return False
+        declared = self._declared(body, source)
+        for name in written - declared:
+            accesses = set()
+            for n in _walk(body):
+                if n.type != "identifier" or _text(source, n) != name:
+                    continue
+                # Climb name[a][b] up to its outermost subscript
+                top = n
+                while top.parent is not None and top.parent.type in ("subscript_expression", "array_access") \
+                        and _is_base(top.parent, top):
+                    top = top.parent
+                if top is n:
+                    return False  # used as a scalar
+                root, indices = _subscript_chain(top)
+                if root is None or any(i.type != "identifier" for i in indices):
+                    return False
+                index_names = tuple(_text(source, i).encode("utf8") for i in indices)
+                if any(v not in counters for v in index_names):
+                    return False
+                accesses.add(index_names)
+            if len(accesses) != 1 or len(counters - set(next(iter(accesses)))) > 1:
+                return False
+        return True
+
+    def _tiled(self, source: bytes, nest: List[CountedLoop], sizes: List[int], unit: bytes) -> str:
+        outer = _line_indent(source, nest[0].node.start_byte)
+        depth = len(nest)
+        lines = []
+        names = []
+        for k, loop in enumerate(nest):
+            size = sizes[k] if k < len(sizes) else sizes[-1]
+            step = size * loop.step
+            name = self._fresh_name(source, loop.var.decode("utf8") + "_tile", None).encode("utf8")
+            names.append((name, step))
+            type_name = source[loop.init.child_by_field_name("type").start_byte:
+                               loop.init.child_by_field_name("type").end_byte]
+            start = source[_init_value(loop.init).start_byte:_init_value(loop.init).end_byte]
+            bound = source[loop.bound.start_byte:loop.bound.end_byte]
+            indent = b"" if k == 0 else outer + unit * k
+            lines.append(indent + b"for (%s %s = %s; %s %s %s; %s += %d) {" % (
+                type_name, name, start, name, loop.op.encode(), bound, name, step))
+        for k, loop in enumerate(nest):
+            name, step = names[k]
+            type_name = source[loop.init.child_by_field_name("type").start_byte:
+                               loop.init.child_by_field_name("type").end_byte]
+            condition = source[loop.condition.start_byte:loop.condition.end_byte]
+            update = source[loop.update.start_byte:loop.update.end_byte]
+            lines.append(outer + unit * (depth + k) + b"for (%s %s = %s; %s && %s < %s + %d; %s) {" % (
+                type_name, loop.var, name, condition, loop.var, name, step, update))
+        body = nest[-1].body
+        statements = body.named_children if body.type in _BLOCK_TYPES else [body]
+        indent = outer + unit * (2 * depth)
+        if statements:
+            text = source[statements[0].start_byte:statements[-1].end_byte]
+            lines.append(indent + _reindent(text, _line_indent(source, statements[0].start_byte), indent))
+        for k in reversed(range(2 * depth)):
+            lines.append(outer + unit * k + b"}")
+        return b"\n".join(lines).decode("utf8")
+
+    # ----- shared analysis ----- #
+
+    def _written(self, node, source: bytes) -> Tuple[set, bool]:
+        """
+        Root names assigned, incremented or address-taken under node, and
+        whether some write goes through something other than a named variable.
+        """
+        names = set()
+        unknown = False
+        for n in _walk(node):
+            if n.type == "assignment_expression":
+                target = n.child_by_field_name("left")
+            elif n.type == "update_expression":
+                target = n.child_by_field_name("argument") or next(iter(n.named_children), None)
+            elif n.type == "pointer_expression" and _text(source, n.child_by_field_name("operator")) == "&":
+                target = n.child_by_field_name("argument")
+            else:
+                continue
+            root = _lvalue_root(target)
+            if root is None:
+                unknown = True
+            else:
+                names.add(_text(source, root))
+        return names, unknown
+
+    def _declared(self, node, source: bytes) -> set:
+        """Names declared anywhere under node"""
+        names = set()
+        for n in _walk(node):
+            if n.type in _DECLARATION_TYPES:
+                for d in n.children_by_field_name("declarator"):
+                    name, _ = _declared_name(d)
+                    if name is not None:
+                        names.add(_text(source, name))
+        return names
+
+    @staticmethod
+    def _fresh_name(source: bytes, base: str, start: Optional[int]) -> str:
+        """base_<n> (or base itself when start is None) not used anywhere in source"""
+        n = start
+        while True:
+            name = base if n is None else f"{base}_{n}"
+            if not re.search(rb"\b%s\b" % name.encode("utf8"), source):
+                return name
+            n = 0 if n is None else n + 1
+
+
+def _header(source: bytes, loop: CountedLoop) -> bytes:
+    """Loop header up to the body with whitespace removed"""
+    return re.sub(rb"\s+", b"", source[loop.node.start_byte:loop.body.start_byte])
+
+
+def _declared_name(declarator) -> Tuple[Optional[object], bool]:
+    """Identifier a declarator introduces, and whether it is a plain (non pointer/array) one"""
+    plain = True
+    node = declarator
+    while node is not None and node.type != "identifier":
+        if node.type in ("pointer_declarator", "array_declarator", "reference_declarator",
+                         "function_declarator"):
+            plain = False
+        node = node.child_by_field_name("declarator") or node.child_by_field_name("name") or (
+            node.named_children[0] if node.type == "reference_declarator" and node.named_children else None)
+    return node, plain
+
+
+def _init_value(init):
+    """Initial value of a single-variable declaration"""
+    declarators = init.children_by_field_name("declarator")
+    return declarators[0].child_by_field_name("value") if declarators else None
+
+
+def _is_base(subscript, node) -> bool:
+    """Whether node is the array being indexed by subscript"""
+    base = subscript.child_by_field_name("argument") or subscript.child_by_field_name("array")
+    return base is not None and base.start_byte == node.start_byte and base.end_byte == node.end_byte
+
+
+def _subscript_chain(node) -> Tuple[Optional[object], list]:
+    """For name[a][b] return (name, [a, b]); (None, []) for anything else"""
+    indices = []
+    while node is not None and node.type in ("subscript_expression", "array_access"):
+        index = node.child_by_field_name("index")
+        if index is None:
+            args = node.child_by_field_name("indices")
+            if args is None or args.named_child_count != 1:
+                return None, []
+            index = args.named_children[0]
+        indices.append(index)
+        node = node.child_by_field_name("argument") or node.child_by_field_name("array")
+    if node is None or node.type != "identifier" or not indices:
+        return None, []
+    return node, indices[::-1]
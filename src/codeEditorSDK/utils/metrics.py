@@ -0,0 +1,140 @@
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, Optional, Tuple
+import functools
+import json
+import threading
+import time
+
+# Phases recorded by the editor, in the order an operation goes through them
+PHASES = ('read', 'parse', 'locate', 'transform', 'validate', 'write')
+
+# Operation currently running in this thread or task; phases are charged to it
+_current_op: ContextVar[str] = ContextVar('codeeditor_op', default='none')
+
+_NULL_TIMER = nullcontext()
+
+
+class NullMetrics:
+    """Metrics sink that records nothing; the editor default"""
+    enabled = False
+
+    def timer(self, phase: str):
+        """Context manager timing one phase of the current operation"""
+        return _NULL_TIMER
+
+    def operation(self, op: str):
+        """Context manager marking the operation that following phases belong to"""
+        return _NULL_TIMER
+
+    def record(self, phase: str, seconds: float, op: Optional[str] = None) -> None:
+        """Add one timing sample"""
+
+    def count(self, name: str, value: int = 1) -> None:
+        """Increase a counter"""
+
+
+class Metrics(NullMetrics):
+    """
+    In-memory metrics: per (operation, phase) call count, total and max
+    seconds, plus named counters such as parses and bytes_parsed.
+    Safe to share between threads. An optional trace callback receives
+    every sample as trace(op, phase, seconds) as it is recorded.
+    """
+    enabled = True
+
+    def __init__(self, trace: Optional[Callable[[str, str, float], None]] = None):
+        self.trace = trace
+        self._lock = threading.Lock()
+        self._timings: Dict[Tuple[str, str], list] = {}
+        self._counters: Dict[str, int] = {}
+
+    @contextmanager
+    def timer(self, phase: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, time.perf_counter() - start)
+
+    @contextmanager
+    def operation(self, op: str) -> Iterator[None]:
+        token = _current_op.set(op)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record('total', time.perf_counter() - start, op)
+            self.count('operations')
+            _current_op.reset(token)
+
+    def record(self, phase: str, seconds: float, op: Optional[str] = None) -> None:
+        op = op or _current_op.get()
+        with self._lock:
+            entry = self._timings.get((op, phase))
+            if entry is None:
+                self._timings[(op, phase)] = [1, seconds, seconds]
+            else:
+                entry[0] += 1
+                entry[1] += seconds
+                if seconds > entry[2]:
+                    entry[2] = seconds
+        if self.trace is not None:
+            self.trace(op, phase, seconds)
+
+    def count(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def reset(self) -> None:
+        """Drop everything recorded so far"""
+        with self._lock:
+            self._timings.clear()
+            self._counters.clear()
+
+    def snapshot(self) -> dict:
+        """Plain-data copy: {'timings': {op: {phase: {...}}}, 'counters': {...}}"""
+        with self._lock:
+            timings: Dict[str, Dict[str, dict]] = {}
+            for (op, phase), (calls, total, longest) in sorted(self._timings.items()):
+                timings.setdefault(op, {})[phase] = {
+                    'count': calls, 'seconds': total, 'max_seconds': longest}
+            return {'timings': timings, 'counters': dict(sorted(self._counters.items()))}
+
+    def to_json(self, **kwargs) -> str:
+        """Snapshot as a JSON document"""
+        return json.dumps(self.snapshot(), **kwargs)
+
+    def to_prometheus(self, prefix: str = 'codeeditor') -> str:
+        """Snapshot in the Prometheus text exposition format"""
+        snap = self.snapshot()
+        lines = [
+            f'# HELP {prefix}_phase_seconds Time spent per operation phase.',
+            f'# TYPE {prefix}_phase_seconds summary',
+        ]
+        for op, phases in snap['timings'].items():
+            for phase, t in phases.items():
+                labels = f'op="{op}",phase="{phase}"'
+                lines.append(f'{prefix}_phase_seconds_count{{{labels}}} {t["count"]}')
+                lines.append(f'{prefix}_phase_seconds_sum{{{labels}}} {t["seconds"]:.9f}')
+        for name, value in snap['counters'].items():
+            lines.append(f'# TYPE {prefix}_{name}_total counter')
+            lines.append(f'{prefix}_{name}_total {value}')
+        return '\n'.join(lines) + '\n'
+
+
+def instrumented(op: str):
+    """
+    Decorator for editor operations: phases recorded while the method runs
+    are charged to op. With NullMetrics it adds a single attribute check.
+    """
+    def decorate(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            metrics = self.metrics
+            if not metrics.enabled:
+                return method(self, *args, **kwargs)
+            with metrics.operation(op):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorate
@@ -0,0 +1,217 @@
+from bisect import bisect_right
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+from codeEditorSDK.core.document import TextEdit
+from codeEditorSDK.utils.queries import capture_nodes
+from codeEditorSDK.utils.validation import SyntaxValidator
+
+Span = Tuple[int, int]
+
+# Operators a site may be swapped for, by the kind of expression it sits in.
+# Replacements stay in the operator's own group so a mutant keeps its arity
+# and rough meaning; each group is further limited to the language's
+# SyntaxValidator.valid_operators.
+_BINARY_GROUPS = (
+    {"+", "-", "*", "/", "%", "**", "//"},
+    {"<", ">", "<=", ">=", "==", "!="},
+    {"&&", "||"},
+)
+_UNARY_GROUPS = ({"-", "+", "!", "~"},)
+_UPDATE_GROUPS = ({"++", "--"},)
+
+_GROUPS_BY_PARENT = {
+    "binary_operator": _BINARY_GROUPS,
+    "comparison_operator": _BINARY_GROUPS,
+    "binary_expression": _BINARY_GROUPS,
+    "unary_operator": _UNARY_GROUPS,
+    "unary_expression": _UNARY_GROUPS,
+    "update_expression": _UPDATE_GROUPS,
+}
+
+# A mutant is validated by re-parsing only the largest operator expression
+# around its site: the swapped token can only merge with or split from its
+# neighbours inside it. Each expression is placed in a statement of its own,
+# (batch header, statement prefix, statement suffix, batch footer):
+_WRAPPERS = {
+    "python": (b"", b"(", b")\n", b""),
+    "java": (b"class _Mutant { void _mutant() {\n", b"Object _v = (", b");\n", b"}}\n"),
+    "c": (b"void _mutant() {\n", b"(", b");\n", b"}\n"),
+    "cpp": (b"void _mutant() {\n", b"(", b");\n", b"}\n"),
+}
+
+# Stop adding mutants to a validation batch beyond this much fragment text
+_BATCH_BYTES = 1 << 20
+
+
+class Mutant(NamedTuple):
+    """
+    One operator replacement at one site, as a span patch on the source
+    the generator was given. Byte offsets and column are in that source;
+    line is 1-based.
+    """
+    site: int
+    start_byte: int
+    end_byte: int
+    line: int
+    column: int
+    original: str
+    replacement: str
+
+    @property
+    def edit(self) -> TextEdit:
+        """The patch as a TextEdit, for Document.apply()"""
+        return TextEdit(self.start_byte, self.end_byte, self.replacement)
+
+    def patch(self, source: bytes) -> bytes:
+        """The mutated source"""
+        return source[:self.start_byte] + self.replacement.encode("utf8") + source[self.end_byte:]
+
+
+class _Unit:
+    """The operator expression around one or more sites, re-parsed per mutant"""
+    __slots__ = ("start", "text", "had_error")
+
+    def __init__(self, start: int, text: bytes, had_error: bool):
+        self.start = start
+        self.text = text
+        self.had_error = had_error
+
+
+class MutantGenerator:
+    """
+    Enumerates operator sites from one parse and validates the resulting
+    mutants in batches: each mutant is checked by parsing its enclosing
+    operator expression with the replacement, many per parse, instead of
+    reparsing the whole file once per mutant.
+    """
+    def __init__(self, validator: SyntaxValidator):
+        self.validator = validator
+        self.language = validator.language
+        self.wrapper = _WRAPPERS.get(self.language, (b"", b"", b"\n", b""))
+
+    def candidates(self, site, allowed: Optional[set] = None) -> List[str]:
+        """Sorted replacements for an operator node, empty when it is not a site"""
+        op = site.type
+        valid = self.validator.valid_operators if allowed is None else allowed
+        if op not in valid:
+            return []
+        for group in _GROUPS_BY_PARENT.get(site.parent.type, ()):
+            if op in group:
+                return sorted((group & valid) - {op})
+        return []
+
+    def sites(self, root, spans: Optional[Sequence[Span]] = None) -> Iterator:
+        """Operator nodes under root in document order, limited to spans when given"""
+        nodes = capture_nodes(self.language, "operator", root, "operator")
+        if spans is None:
+            yield from nodes
+            return
+        merged = _merge(spans)
+        starts = [s for s, _ in merged]
+        for node in nodes:
+            i = bisect_right(starts, node.start_byte) - 1
+            if i >= 0 and node.end_byte <= merged[i][1]:
+                yield node
+
+    def generate(self, tree, source: bytes, spans: Optional[Sequence[Span]] = None,
+                 allowed: Optional[set] = None, validate: bool = True,
+                 batch_size: int = 256, metrics=None) -> Iterator[Mutant]:
+        """
+        Lazily yield one Mutant per (site, replacement).
+        :param spans: Byte spans to look for sites in (default: the whole tree)
+        :param allowed: Operators to mutate from and to (default: valid_operators)
+        :param validate: Drop mutants that do not parse; checked batch_size at a time
+        """
+        units: Dict[Span, _Unit] = {}
+        pending: List[Tuple[Mutant, _Unit]] = []
+        pending_bytes = 0
+        index = 0
+        for node in self.sites(tree.root_node, spans):
+            replacements = self.candidates(node, allowed)
+            if not replacements:
+                continue
+            row, column = node.start_point
+            original = node.type
+            unit = self._unit(node, source, units) if validate else None
+            for replacement in replacements:
+                mutant = Mutant(index, node.start_byte, node.end_byte, row + 1, column,
+                                original, replacement)
+                if not validate:
+                    yield mutant
+                    continue
+                pending.append((mutant, unit))
+                pending_bytes += len(unit.text)
+                if len(pending) >= batch_size or pending_bytes >= _BATCH_BYTES:
+                    yield from self._valid(pending, metrics)
+                    pending, pending_bytes = [], 0
+            index += 1
+        if pending:
+            yield from self._valid(pending, metrics)
+
+    @staticmethod
+    def _unit(node, source: bytes, units: Dict[Span, _Unit]) -> _Unit:
+        """The expression a site is validated in, shared by the sites inside it"""
+        top = node.parent
+        while top.parent is not None and top.parent.type in _GROUPS_BY_PARENT:
+            top = top.parent
+        key = (top.start_byte, top.end_byte)
+        unit = units.get(key)
+        if unit is None:
+            if len(units) > 64:
+                # Sites come in document order, so older units are rarely needed again
+                units.clear()
+            unit = units[key] = _Unit(top.start_byte, source[top.start_byte:top.end_byte], top.has_error)
+        return unit
+
+    def _valid(self, batch: List[Tuple[Mutant, _Unit]], metrics=None) -> Iterator[Mutant]:
+        """The mutants of batch whose expression still parses, in order"""
+        header, prefix, suffix, footer = self.wrapper
+        parts, regions = [header], []
+        offset = len(header)
+        for mutant, unit in batch:
+            fragment = self._fragment(mutant, unit, prefix, suffix)
+            patch = offset + len(prefix) + mutant.start_byte - unit.start
+            regions.append((offset, offset + len(fragment), patch, patch + len(mutant.replacement)))
+            parts.append(fragment)
+            offset += len(fragment)
+        parts.append(footer)
+        joined = b"".join(parts)
+        parser = self.validator.parser
+        if metrics is not None:
+            metrics.count("parses")
+            metrics.count("bytes_parsed", len(joined))
+        tree = parser.parse(joined)
+        for (mutant, unit), (start, end, patch_start, patch_end) in zip(batch, regions):
+            if self._parses(tree, unit, start, end, patch_start, patch_end):
+                yield mutant
+                continue
+            # Error recovery may spill a broken neighbour into this statement;
+            # settle it with a parse of the statement alone
+            alone = parser.parse(header + joined[start:end] + footer)
+            shift = len(header) - start
+            if self._parses(alone, unit, start + shift, end + shift, patch_start + shift, patch_end + shift):
+                yield mutant
+
+    def _parses(self, tree, unit: _Unit, start: int, end: int, patch_start: int, patch_end: int) -> bool:
+        if unit.had_error:
+            # The fragment was broken before the mutation: only look at the patch
+            return self.validator.validate_region(tree, patch_start, patch_end)
+        # Bounds are inclusive; stay off the neighbouring fragments' edges
+        return self.validator.validate_region(tree, start + 1, end - 1)
+
+    @staticmethod
+    def _fragment(mutant: Mutant, unit: _Unit, prefix: bytes, suffix: bytes) -> bytes:
+        at = mutant.start_byte - unit.start
+        return b"".join((prefix, unit.text[:at], mutant.replacement.encode("utf8"),
+                         unit.text[at + mutant.end_byte - mutant.start_byte:], suffix))
+
+
+def _merge(spans: Iterable[Span]) -> List[Span]:
+    """Sorted, non-overlapping union of byte spans"""
+    merged: List[Span] = []
+    for start, end in sorted(spans):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
@@ -0,0 +1,105 @@
+from functools import lru_cache
+from codeEditorSDK.utils.languages import get_language
+
+# Tree-sitter query patterns per language.
+#   function        -> @function node and its @name identifier
+#   loop            -> @loop statements
+#   condition       -> @condition of every if-statement
+#   parameters      -> @parameters list of every function
+#   parameter_type  -> @type of every typed parameter
+#   return_type     -> @type of every function return type
+#   declaration_type-> @type of every local declaration
+#   identifier      -> @identifier nodes (never inside strings or comments)
+#   operator        -> @operator token of every unary, binary, comparison and
+#                      ++/-- expression
+_C_FUNCTION = """
+    (function_definition
+        declarator: (function_declarator declarator: (_) @name)) @function
+    (function_definition
+        declarator: (pointer_declarator
+            declarator: (function_declarator declarator: (_) @name))) @function
+"""
+
+_CPP_FUNCTION = _C_FUNCTION + """
+    (function_definition
+        declarator: (reference_declarator
+            (function_declarator declarator: (_) @name))) @function
+"""
+
+_C_COMMON = {
+    "loop": "[(for_statement) (while_statement)] @loop",
+    "condition": "(if_statement condition: (_) @condition)",
+    "parameters": "(function_declarator parameters: (_) @parameters)",
+    "parameter_type": "(parameter_declaration type: (_) @type)",
+    "return_type": "(function_definition type: (_) @type)",
+    "declaration_type": "(declaration type: (_) @type)",
+    "identifier": "(identifier) @identifier",
+    "operator": """
+        (binary_expression operator: _ @operator)
+        (unary_expression operator: _ @operator)
+        (update_expression operator: _ @operator)
+    """,
+}
+
+QUERY_SOURCES = {
+    "python": {
+        "function": "(function_definition name: (identifier) @name) @function",
+        "loop": "[(for_statement) (while_statement)] @loop",
+        "condition": "(if_statement condition: (_) @condition)",
+        "parameters": "(function_definition parameters: (_) @parameters)",
+        "parameter_type": """
+            (typed_parameter type: (_) @type)
+            (typed_default_parameter type: (_) @type)
+        """,
+        "return_type": "(function_definition return_type: (_) @type)",
+        "declaration_type": "(assignment type: (_) @type)",
+        "identifier": "(identifier) @identifier",
+        "operator": """
+            (binary_operator operator: _ @operator)
+            (comparison_operator operators: _ @operator)
+            (unary_operator operator: _ @operator)
+        """,
+    },
+    "java": {
+        "function": "(method_declaration name: (identifier) @name) @function",
+        "loop": "[(for_statement) (while_statement)] @loop",
+        "condition": "(if_statement condition: (_) @condition)",
+        "parameters": "(method_declaration parameters: (_) @parameters)",
+        "parameter_type": "(formal_parameter type: (_) @type)",
+        "return_type": "(method_declaration type: (_) @type)",
+        "declaration_type": "(local_variable_declaration type: (_) @type)",
+        "identifier": "(identifier) @identifier",
+        "operator": """
+            (binary_expression operator: _ @operator)
+            (unary_expression operator: _ @operator)
+            (update_expression ["++" "--"] @operator)
+        """,
+    },
+    "c": dict(_C_COMMON, function=_C_FUNCTION),
+    "cpp": dict(_C_COMMON, function=_CPP_FUNCTION),
+}
+
+# (parent type, field) of identifiers that name a member or a keyword
+# argument rather than a variable: obj.attr, f(name=1), obj.method().
+# C and C++ parse members as field_identifier, which is never captured.
+MEMBER_FIELDS = {
+    "python": {("attribute", "attribute"), ("keyword_argument", "name")},
+    "java": {("field_access", "field"), ("method_invocation", "name")},
+    "c": set(),
+    "cpp": set(),
+}
+
+
+@lru_cache(maxsize=None)
+def get_query(language: str, name: str):
+    """Compile a named query once per language and reuse it"""
+    try:
+        source = QUERY_SOURCES[language][name]
+    except KeyError:
+        raise ValueError(f"No '{name}' query for language: {language}")
+    return get_language(language).query(source)
+
+
+def capture_nodes(language: str, name: str, node, tag: str) -> list:
+    """All nodes captured as @tag by a named query under node, in document order"""
+    return [n for n, t in get_query(language, name).captures(node) if t == tag]
@@ -1,118 +1,195 @@
-from tree_sitter import Parser
-from tree_sitter_languages import get_language
+from collections import OrderedDict
+from typing import Iterable, Optional, Tuple
+from codeEditorSDK.utils.languages import ThreadParser
+import hashlib
+import threading
+
+# Language tables are built once at import and shared by every validator
+RESERVED_KEYWORDS = {
+    'python': {
+        'False', 'None', 'True', 'and', 'as', 'assert', 'async',
+        'await', 'break', 'class', 'continue', 'def', 'del', 'elif',
+        'else', 'except', 'finally', 'for', 'from', 'global', 'if',
+        'import', 'in', 'is', 'lambda', 'nonlocal', 'not', 'or', 'pass',
+        'raise', 'return', 'try', 'while', 'with', 'yield'
+    },
+    'java': {
+        'abstract', 'assert', 'boolean', 'break', 'byte', 'case', 'catch',
+        'char', 'class', 'const', 'continue', 'default', 'do', 'double',
+        'else', 'enum', 'extends', 'final', 'finally', 'float', 'for',
+        'goto', 'if', 'implements', 'import', 'instanceof', 'int', 
+        'interface', 'long', 'native', 'new', 'package', 'private',
+        'protected', 'public', 'return', 'short', 'static', 'strictfp',
+        'super', 'switch', 'synchronized', 'this', 'throw', 'throws',
+        'transient', 'try', 'void', 'volatile', 'while'
+    },
+    'cpp': {
+        'alignas', 'alignof', 'and', 'and_eq', 'asm', 'auto', 'bitand',
+        'bitor', 'bool', 'break', 'case', 'catch', 'char', 'char16_t',
+        'char32_t', 'class', 'compl', 'const', 'constexpr', 'const_cast',
+        'continue', 'decltype', 'default', 'delete', 'do', 'double',
+        'dynamic_cast', 'else', 'enum', 'explicit', 'export', 'extern',
+        'false', 'float', 'for', 'friend', 'goto', 'if', 'inline', 'int',
+        'long', 'mutable', 'namespace', 'new', 'noexcept', 'not',
+        'not_eq', 'nullptr', 'operator', 'or', 'or_eq', 'private',
+        'protected', 'public', 'register', 'reinterpret_cast', 'return',
+        'short', 'signed', 'sizeof', 'static', 'static_assert',
+        'static_cast', 'struct', 'switch', 'template', 'this', 'thread_local',
+        'throw', 'true', 'try', 'typedef', 'typeid', 'typename', 'union',
+        'unsigned', 'using', 'virtual', 'void', 'volatile', 'wchar_t',
+        'while', 'xor', 'xor_eq'
+    },
+    'c': {
+        'auto', 'break', 'case', 'char', 'const', 'continue', 'default',
+        'do', 'double', 'else', 'enum', 'extern', 'float', 'for', 'goto',
+        'if', 'inline', 'int', 'long', 'register', 'restrict', 'return',
+        'short', 'signed', 'sizeof', 'static', 'struct', 'switch', 'typedef',
+        'union', 'unsigned', 'void', 'volatile', 'while', '_Alignas',
+        '_Alignof', '_Atomic', '_Bool', '_Complex', '_Generic',
+        '_Imaginary', '_Noreturn', '_Static_assert', '_Thread_local'
+    }
+}
+
+VALID_OPERATORS = {
+    'python': {'+', '-', '*', '/', '>', '<', '==', '>=', '<=', '!=', '**', '//'},
+    'java': {'+', '-', '*', '/', '>', '<', '==', '>=', '<=', '!=', '=', '++', '--'},
+    'cpp': {'+', '-', '*', '/', '>', '<', '==', '>=', '<=', '!=', '=', '++', '--'},
+    'c': {'+', '-', '*', '/', '>', '<', '==', '>=', '<=', '!=', '=', '++', '--', '&&', '||', '!', '~'}
+
+}
+
+VALID_TYPES = {
+    'python': {
+        'int', 'float', 'bool', 'str', 'bytes', 'list', 'dict', 'set', 'tuple', 'complex',
+        'int8', 'int16', 'int32', 'int64', 'uint8', 'uint16', 'uint32', 'uint64',
+        'float16', 'float32', 'float64', 'double'
+    },
+    'java': {
+        'byte', 'short', 'int', 'long', 'float', 'double', 'boolean', 'char',
+        'String', 'Integer', 'Long', 'Float', 'Double', 'Boolean', 'Character', 'BigInteger', 'BigDecimal'
+    },
+    'cpp': {
+        'bool', 'char', 'wchar_t', 'char16_t', 'char32_t',
+        'short', 'int', 'long', 'long long',
+        'unsigned char', 'unsigned short', 'unsigned int', 'unsigned long', 'unsigned long long',
+        'float', 'double', 'long double',
+        'int8_t', 'int16_t', 'int32_t', 'int64_t',
+        'uint8_t', 'uint16_t', 'uint32_t', 'uint64_t',
+        'size_t', 'ptrdiff_t'
+    },
+    'c': {
+        'char', 'short', 'int', 'long', 'long long',
+        'unsigned char', 'unsigned short', 'unsigned int', 'unsigned long', 'unsigned long long',
+        'float', 'double', 'long double',
+        'int8_t', 'int16_t', 'int32_t', 'int64_t',
+        'uint8_t', 'uint16_t', 'uint32_t', 'uint64_t',
+        'size_t', 'bool'
+    }
+}
+
 
 class SyntaxValidator:
-    def __init__(self, language: str):
+    parser = ThreadParser()
+
+    def __init__(self, language: str, cache_size: int = 1024):
+        """
+        :param language: Programming language
+        :param cache_size: Number of validation results remembered by content hash
+        """
         self.language = language
-        self.parser = Parser()
-        self._init_parser()
+        self.cache_size = cache_size
+        self._results: "OrderedDict[str, bool]" = OrderedDict()
+        # The LRU is reordered on every hit, so threads sharing a validator take turns
+        self._results_lock = threading.Lock()
         self.reserved_keywords = self._load_reserved_keywords()
         self.valid_operators = self._load_valid_operators()
         self.valid_types = self._load_valid_types()
 
-    def _init_parser(self):
-        """Initialize the parser"""
-        try:
-            self.parser.set_language(get_language(self.language))
-        except Exception as e:
-            raise RuntimeError(f"Parser initialization failed: {str(e)}")
-
     def _load_reserved_keywords(self) -> set:
         """Load reserved keywords"""
-        keywords = {
-            'python': {
-                'False', 'None', 'True', 'and', 'as', 'assert', 'async',
-                'await', 'break', 'class', 'continue', 'def', 'del', 'elif',
-                'else', 'except', 'finally', 'for', 'from', 'global', 'if',
-                'import', 'in', 'is', 'lambda', 'nonlocal', 'not', 'or', 'pass',
-                'raise', 'return', 'try', 'while', 'with', 'yield'
-            },
-            'java': {
-                'abstract', 'assert', 'boolean', 'break', 'byte', 'case', 'catch',
-                'char', 'class', 'const', 'continue', 'default', 'do', 'double',
-                'else', 'enum', 'extends', 'final', 'finally', 'float', 'for',
-                'goto', 'if', 'implements', 'import', 'instanceof', 'int', 
-                'interface', 'long', 'native', 'new', 'package', 'private',
-                'protected', 'public', 'return', 'short', 'static', 'strictfp',
-                'super', 'switch', 'synchronized', 'this', 'throw', 'throws',
-                'transient', 'try', 'void', 'volatile', 'while'
-            },
-            'cpp': {
-                'alignas', 'alignof', 'and', 'and_eq', 'asm', 'auto', 'bitand',
-                'bitor', 'bool', 'break', 'case', 'catch', 'char', 'char16_t',
-                'char32_t', 'class', 'compl', 'const', 'constexpr', 'const_cast',
-                'continue', 'decltype', 'default', 'delete', 'do', 'double',
-                'dynamic_cast', 'else', 'enum', 'explicit', 'export', 'extern',
-                'false', 'float', 'for', 'friend', 'goto', 'if', 'inline', 'int',
-                'long', 'mutable', 'namespace', 'new', 'noexcept', 'not',
-                'not_eq', 'nullptr', 'operator', 'or', 'or_eq', 'private',
-                'protected', 'public', 'register', 'reinterpret_cast', 'return',
-                'short', 'signed', 'sizeof', 'static', 'static_assert',
-                'static_cast', 'struct', 'switch', 'template', 'this', 'thread_local',
-                'throw', 'true', 'try', 'typedef', 'typeid', 'typename', 'union',
-                'unsigned', 'using', 'virtual', 'void', 'volatile', 'wchar_t',
-                'while', 'xor', 'xor_eq'
-            },
-            'c': {
-                'auto', 'break', 'case', 'char', 'const', 'continue', 'default',
-                'do', 'double', 'else', 'enum', 'extern', 'float', 'for', 'goto',
-                'if', 'inline', 'int', 'long', 'register', 'restrict', 'return',
-                'short', 'signed', 'sizeof', 'static', 'struct', 'switch', 'typedef',
-                'union', 'unsigned', 'void', 'volatile', 'while', '_Alignas',
-                '_Alignof', '_Atomic', '_Bool', '_Complex', '_Generic',
-                '_Imaginary', '_Noreturn', '_Static_assert', '_Thread_local'
-            }
-        }
-        return keywords.get(self.language, set())
+        return RESERVED_KEYWORDS.get(self.language, set())
 
     def _load_valid_operators(self) -> set:
         """Load valid operator set"""
-        operators = {
-            'python': {'+', '-', '*', '/', '>', '<', '==', '>=', '<=', '!=', '**', '//'},
-            'java': {'+', '-', '*', '/', '>', '<', '==', '>=', '<=', '!=', '=', '++', '--'},
-            'cpp': {'+', '-', '*', '/', '>', '<', '==', '>=', '<=', '!=', '=', '++', '--'},
-            'c': {'+', '-', '*', '/', '>', '<', '==', '>=', '<=', '!=', '=', '++', '--', '&&', '||', '!', '~'}
-
-        }
-        return operators.get(self.language, set())
+        return VALID_OPERATORS.get(self.language, set())
 
     def _load_valid_types(self) -> set:
         """Load supported basic type set"""
-        valid_types = {
-            'python': {
-                'int', 'float', 'bool', 'str', 'bytes', 'list', 'dict', 'set', 'tuple', 'complex',
-                'int8', 'int16', 'int32', 'int64', 'uint8', 'uint16', 'uint32', 'uint64',
-                'float16', 'float32', 'float64', 'double'
-            },
-            'java': {
-                'byte', 'short', 'int', 'long', 'float', 'double', 'boolean', 'char',
-                'String', 'Integer', 'Long', 'Float', 'Double', 'Boolean', 'Character', 'BigInteger', 'BigDecimal'
-            },
-            'cpp': {
-                'bool', 'char', 'wchar_t', 'char16_t', 'char32_t',
-                'short', 'int', 'long', 'long long',
-                'unsigned char', 'unsigned short', 'unsigned int', 'unsigned long', 'unsigned long long',
-                'float', 'double', 'long double',
-                'int8_t', 'int16_t', 'int32_t', 'int64_t',
-                'uint8_t', 'uint16_t', 'uint32_t', 'uint64_t',
-                'size_t', 'ptrdiff_t'
-            },
-            'c': {
-                'char', 'short', 'int', 'long', 'long long',
-                'unsigned char', 'unsigned short', 'unsigned int', 'unsigned long', 'unsigned long long',
-                'float', 'double', 'long double',
-                'int8_t', 'int16_t', 'int32_t', 'int64_t',
-                'uint8_t', 'uint16_t', 'uint32_t', 'uint64_t',
-                'size_t', 'bool'
-            }
-        }
-        return valid_types.get(self.language, set())
+        return VALID_TYPES.get(self.language, set())
 
     def validate_syntax(self, code: str) -> bool:
         """Validate the syntax correctness of full code"""
-        tree = self.parser.parse(bytes(code, "utf8"))
+        return self.validate_source(bytes(code, "utf8"))
+
+    def validate_source(self, source: bytes, digest: Optional[str] = None, tree=None) -> bool:
+        """
+        Validate source bytes, memoized by content hash.
+        :param digest: SHA-256 hex digest of source, if already known
+        :param tree: Parse of source to check on a miss instead of parsing again
+        """
+        digest = digest or hashlib.sha256(source).hexdigest()
+        valid = self.cached_result(digest)
+        if valid is None:
+            valid = self.validate_tree(tree if tree is not None else self.parser.parse(source))
+            self.remember(digest, valid)
+        return valid
+
+    def cached_result(self, digest: str) -> Optional[bool]:
+        """Remembered result for a content hash, or None"""
+        with self._results_lock:
+            valid = self._results.get(digest)
+            if valid is not None:
+                self._results.move_to_end(digest)
+            return valid
+
+    def remember(self, digest: str, valid: bool) -> None:
+        """Record a result, dropping the least recently used beyond cache_size"""
+        with self._results_lock:
+            self._results[digest] = valid
+            self._results.move_to_end(digest)
+            while len(self._results) > self.cache_size:
+                self._results.popitem(last=False)
+
+    def clear_cache(self) -> None:
+        """Forget every remembered result"""
+        with self._results_lock:
+            self._results.clear()
+
+    def validate_tree(self, tree) -> bool:
+        """Validate an already parsed syntax tree"""
         return not tree.root_node.has_error
 
+    def validate_changes(self, old_tree, new_tree, spans: Iterable[Tuple[int, int]] = ()) -> bool:
+        """
+        Incremental check after a reparse: only the regions that changed
+        between the edited old tree and the new one (plus the given byte
+        spans of the new text) are searched for ERROR or MISSING nodes.
+        Errors elsewhere in the file, e.g. ones it already had, are ignored.
+        """
+        ranges = [(r.start_byte, r.end_byte) for r in old_tree.get_changed_ranges(new_tree)]
+        ranges.extend(spans)
+        root = new_tree.root_node
+        return not any(self._has_error_in(root, start, end) for start, end in ranges)
+
+    def validate_region(self, tree, start: int, end: int) -> bool:
+        """Whether no ERROR or MISSING node of tree touches the bytes start..end (inclusive)"""
+        return not self._has_error_in(tree.root_node, start, end)
+
+    def _has_error_in(self, node, start: int, end: int) -> bool:
+        """Whether an ERROR or MISSING node under node overlaps [start, end]"""
+        if not node.has_error:
+            return False
+        if node.type == 'ERROR' or node.is_missing:
+            return True
+        for child in node.children:
+            if child.end_byte < start:
+                continue
+            if child.start_byte > end:
+                break
+            if self._has_error_in(child, start, end):
+                return True
+        return False
+
     def validate_operator_replacement(self, old_op: str, new_op: str):
         """Validate basic legality of operator replacement"""
         # if len(old_op) != len(new_op):
@@ -153,9 +230,7 @@ class SyntaxValidator:
 
     def _validate_fragment(self, code_fragment: str) -> bool:
         """Validate syntax correctness of isolated code fragment"""
-        temp_parser = Parser()
-        temp_parser.set_language(get_language(self.language))
-        tree = temp_parser.parse(bytes(code_fragment, 'utf8'))
+        tree = self.parser.parse(bytes(code_fragment, 'utf8'))
         return not tree.root_node.has_error
     
     def validate_type_name(self, type_name: str):
@@ -0,0 +1,23 @@
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+
+@pytest.fixture
+def run_program(tmp_path):
+    """Compile a C or C++ program and return what it prints; skips without a compiler"""
+    def run(source: str, language: str = "c") -> str:
+        compiler = shutil.which("gcc" if language == "c" else "g++")
+        if compiler is None:
+            pytest.skip(f"no compiler for {language}")
+        src = tmp_path / ("prog.c" if language == "c" else "prog.cpp")
+        exe = tmp_path / "prog"
+        src.write_text(source)
+        subprocess.run([compiler, "-O0", "-o", str(exe), str(src)], check=True, capture_output=True)
+        return subprocess.run([str(exe)], check=True, capture_output=True, text=True).stdout
+    return run
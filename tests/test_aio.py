@@ -0,0 +1,88 @@
+import asyncio
+import os
+import threading
+
+import pytest
+
+from codeEditorSDK.core import aio
+from codeEditorSDK.core.aio import AsyncCodeFileEditor
+
+
+@pytest.mark.parametrize("version", [(3, 8), (3, 11)])
+def test_close_cancels_queued_requests(monkeypatch, version):
+    monkeypatch.setattr(aio.sys, "version_info", version)
+    editor = AsyncCodeFileEditor("python", max_workers=1)
+    started, release = threading.Event(), threading.Event()
+    busy = editor._executor.submit(lambda: started.set() or release.wait(5))
+    queued = [editor._executor.submit(lambda: None) for _ in range(3)]
+    started.wait(5)
+    editor.close(wait=False)
+    assert all(f.cancelled() for f in queued)
+    release.set()
+    assert busy.result(5) is True
+
+
+SOURCE = "def area(r):\n    return r * r\n"
+
+
+def _gated(editor):
+    """Make the editor's file loads wait until the returned event is set"""
+    started, release = threading.Event(), threading.Event()
+    load = editor.editor.load
+
+    def slow_load(path):
+        started.set()
+        release.wait(5)
+        return load(path)
+    editor.editor.load = slow_load
+    return started, release
+
+
+def test_timeout_skips_the_write_of_a_running_call(tmp_path):
+    path = tmp_path / "area.py"
+    path.write_text(SOURCE)
+    editor = AsyncCodeFileEditor("python", max_workers=1)
+    started, release = _gated(editor)
+
+    async def main():
+        with pytest.raises(asyncio.TimeoutError):
+            await editor.rename_var(str(path), "r", "radius", timeout=0.05)
+        assert started.is_set()
+
+    asyncio.run(main())
+    release.set()
+    editor.close()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["area.py"]
+
+
+def test_cancel_drops_queued_call(tmp_path):
+    path = tmp_path / "area.py"
+    path.write_text(SOURCE)
+    editor = AsyncCodeFileEditor("python", max_workers=1)
+    started, release = _gated(editor)
+
+    async def main():
+        running = asyncio.ensure_future(editor.swap_operator(str(path), "*", "+"))
+        queued = asyncio.ensure_future(editor.rename_var(str(path), "r", "radius"))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        queued.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+        release.set()
+        return await running
+
+    output = asyncio.run(main())
+    editor.close()
+    assert open(output).read() == SOURCE.replace("*", "+")
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted(["area.py", os.path.basename(output)])
+
+
+def test_default_timeout_and_result(tmp_path):
+    path = tmp_path / "area.py"
+    path.write_text(SOURCE)
+
+    async def main():
+        async with AsyncCodeFileEditor("python", timeout=5) as editor:
+            return await editor.query(str(path), 2, 2)
+
+    assert asyncio.run(main()) == "    return r * r\n"
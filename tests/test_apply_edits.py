@@ -0,0 +1,33 @@
+import pytest
+
+from codeEditorSDK import CodeFileEditor, Document
+
+SOURCE = "def area(radius):\n    total = radius * radius\n    return total\n"
+
+
+@pytest.mark.parametrize("compose", [False, True])
+def test_failed_plan_leaves_document_unchanged(compose):
+    editor = CodeFileEditor("python")
+    doc = Document(SOURCE)
+    plan = [
+        {"op": "rename_var", "args": {"old_name": "radius", "new_name": "r"}},
+        {"op": "rename_var", "args": {"old_name": "total", "new_name": "1bad"}},
+    ]
+    with pytest.raises(RuntimeError):
+        editor.apply_edits(doc, plan, compose=compose)
+    assert doc.text == SOURCE
+    # The Document is still usable afterwards
+    editor.apply_edits(doc, plan[:1], compose=compose)
+    assert doc.text == SOURCE.replace("radius", "r")
+
+
+def test_plan_rejected_by_validation_is_rolled_back():
+    editor = CodeFileEditor("python")
+    doc = Document(SOURCE)
+    plan = [
+        {"op": "rename_var", "args": {"old_name": "radius", "new_name": "r"}},
+        {"op": "update_lines", "args": {"start_line": 2, "end_line": 2, "new_code": "total = (r *"}},
+    ]
+    with pytest.raises(RuntimeError):
+        editor.apply_edits(doc, plan)
+    assert doc.text == SOURCE
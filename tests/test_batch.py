@@ -0,0 +1,38 @@
+from codeEditorSDK.core import batch
+from codeEditorSDK.core.batch import apply_plan_to_files
+
+PLAN = [{"op": "rename_var", "args": {"old_name": "radius", "new_name": "r"}}]
+
+
+def test_single_worker_leaves_no_state_and_closes_cache(tmp_path, monkeypatch):
+    closed = []
+    from codeEditorSDK.core.cache import AnalysisCache
+    original_close = AnalysisCache.close
+    monkeypatch.setattr(AnalysisCache, "close", lambda self: closed.append(self) or original_close(self))
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"f{i}.py"
+        path.write_text("def area(radius):\n    return radius * radius\n")
+        paths.append(str(path))
+
+    results = list(apply_plan_to_files(PLAN, paths, language="python", workers=1,
+                                       chunksize=2, cache=str(tmp_path / "cache.db"), dry_run=True))
+
+    assert [r.path for r in results] == paths
+    assert all(r.ok and "+def area(r):" in r.output for r in results)
+    assert len(closed) == 1
+    assert batch._worker_editor is None
+
+
+def test_single_worker_closes_cache_when_abandoned(tmp_path, monkeypatch):
+    closed = []
+    from codeEditorSDK.core.cache import AnalysisCache
+    original_close = AnalysisCache.close
+    monkeypatch.setattr(AnalysisCache, "close", lambda self: closed.append(self) or original_close(self))
+    path = tmp_path / "f.py"
+    path.write_text("def area(radius):\n    return radius\n")
+    results = apply_plan_to_files(PLAN, [str(path)] * 4, language="python", workers=1, chunksize=1,
+                                  cache=str(tmp_path / "cache.db"), dry_run=True)
+    next(results)
+    results.close()
+    assert len(closed) == 1
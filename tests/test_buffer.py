@@ -0,0 +1,59 @@
+import random
+
+import pytest
+
+from codeEditorSDK.core.buffer import PieceTable
+from codeEditorSDK.core.document import Document, TextEdit
+from codeEditorSDK.core.lines import line_starts
+
+SNIPPETS = [b"", b"x", b"\n", b"ab\ncd", b"\r\n", b"long text without breaks", b"\n\n\n", "é\n".encode("utf8")]
+
+
+def _random_spans(rng, size, count):
+    cuts = sorted(rng.randint(0, size) for _ in range(2 * count))
+    return [(cuts[i], cuts[i + 1], rng.choice(SNIPPETS)) for i in range(0, len(cuts), 2)]
+
+
+def test_piece_table_matches_bytes():
+    rng = random.Random(7)
+    expected = b"line one\nline two\r\nline three\n"
+    table = PieceTable(expected)
+    for step in range(300):
+        spans = _random_spans(rng, len(expected), rng.randint(1, 4))
+        table.replace_many(spans)
+        for start, end, data in reversed(spans):
+            expected = expected[:start] + data + expected[end:]
+        assert len(table) == len(expected)
+        a, b = sorted(rng.randint(0, len(expected)) for _ in range(2))
+        assert table.slice(a, b) == expected[a:b]
+        assert table.read(a) == expected[a:a + len(table.read(a))]
+        if step % 25 == 0:
+            assert table.getvalue() == expected
+    assert table.getvalue() == expected
+
+
+def test_piece_table_rejects_bad_spans():
+    table = PieceTable(b"abcdef")
+    with pytest.raises(ValueError):
+        table.replace_many([(3, 4, b"x"), (1, 2, b"y")])
+    with pytest.raises(ValueError):
+        table.replace(2, 10, b"")
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_line_index_shifts_like_a_rebuild(seed):
+    rng = random.Random(seed)
+    doc = Document("first\nsecond\r\n\nfourth line\nfifth")
+    doc.line_count  # build the index so edits shift it
+    for _ in range(60):
+        text = doc.source
+        edits = [TextEdit(s, e, data.decode("utf8", "replace"))
+                 for s, e, data in _random_spans(rng, len(text), rng.randint(1, 3))
+                 if not _splits_char(text, s) and not _splits_char(text, e)]
+        doc.apply(edits)
+        assert doc.line_starts is not None
+        assert list(doc.line_starts) == list(line_starts(doc.source))
+
+
+def _splits_char(text: bytes, offset: int) -> bool:
+    return 0 < offset < len(text) and (text[offset] & 0xC0) == 0x80
@@ -0,0 +1,69 @@
+import io
+import json
+
+import pytest
+
+from codeEditorSDK.cli import main
+
+PLAN = {"language": "python", "edits": [{"op": "rename_var", "args": {"old_name": "radius", "new_name": "r"}}]}
+SOURCE = "def area(radius):\n    return radius * radius\n"
+
+
+@pytest.fixture
+def plan(tmp_path):
+    path = tmp_path / "plan.json"
+    path.write_text(json.dumps(PLAN))
+    return str(path)
+
+
+def _records(capsys):
+    out, err = capsys.readouterr()
+    return [json.loads(line) for line in out.splitlines()], err
+
+
+def test_writes_files_and_exits_zero(tmp_path, plan, capsys):
+    src = tmp_path / "area.py"
+    src.write_text(SOURCE)
+    assert main(["--plan", plan, "--workers", "1", "--in-place", str(src)]) == 0
+    (record,), err = _records(capsys)
+    assert record["path"] == str(src) and record["output"] == str(src)
+    assert src.read_text() == SOURCE.replace("radius", "r")
+    assert "1 files, 0 failed" in err
+
+
+def test_failed_file_exits_one_and_others_go_on(tmp_path, plan, capsys):
+    good, bad = tmp_path / "good.py", tmp_path / "bad.py"
+    good.write_text(SOURCE)
+    bad.write_text("def area(radius:\n")
+    missing = tmp_path / "missing.py"
+    assert main(["--plan", plan, "--workers", "1", "--dry-run", str(good), str(bad), str(missing)]) == 1
+    records, err = _records(capsys)
+    assert [r["path"] for r in records] == [str(good), str(bad), str(missing)]
+    assert "+def area(r):" in records[0]["diff"]
+    assert "error" in records[1] and "error" in records[2]
+    assert "3 files, 2 failed" in err
+    assert good.read_text() == SOURCE
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["bad.py", "good.py", "plan.json"]
+
+
+def test_plan_from_stdin_with_spans(tmp_path, monkeypatch, capsys):
+    src = tmp_path / "area.py"
+    src.write_text(SOURCE)
+    monkeypatch.setattr("sys.stdin", io.StringIO("\n".join(json.dumps(e) for e in PLAN["edits"])))
+    assert main(["--spans", "--workers", "1", str(src)]) == 0
+    (record,), _ = _records(capsys)
+    assert [(s["start_line"], s["end_line"], s["new_text"]) for s in record["spans"]] == [
+        (1, 2, SOURCE.replace("radius", "r"))]
+    assert src.read_text() == SOURCE
+
+
+@pytest.mark.parametrize("argv", [
+    ["--plan", "missing.json", "x.py"],
+    ["--language", "cobol", "--plan", "{plan}", "x.py"],
+    ["--plan", "{plan}"],
+])
+def test_usage_errors_exit_two(plan, argv, capsys):
+    with pytest.raises(SystemExit) as exc:
+        main([a.format(plan=plan) for a in argv])
+    assert exc.value.code == 2
+    assert "codeeditor: error:" in capsys.readouterr().err
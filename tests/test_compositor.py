@@ -0,0 +1,57 @@
+import pytest
+
+from codeEditorSDK import CodeFileEditor, Document
+from codeEditorSDK.core.compositor import EditCompositor
+from codeEditorSDK.core.document import TextEdit
+
+
+def _compose(*ops):
+    compositor = EditCompositor()
+    for name, edits in ops:
+        compositor.add(name, edits)
+    return compositor.compose()
+
+
+def test_adjacent_spans_merge():
+    merged = _compose(("a", [TextEdit(4, 8, "x")]), ("b", [TextEdit(0, 4, "y"), TextEdit(8, 9, "")]))
+    assert merged == [TextEdit(0, 4, "y"), TextEdit(4, 8, "x"), TextEdit(8, 9, "")]
+
+
+def test_overlapping_spans_conflict():
+    with pytest.raises(ValueError, match="'a' and 'b' conflict at bytes 5-9"):
+        _compose(("a", [TextEdit(2, 6, "x")]), ("b", [TextEdit(5, 9, "y")]))
+
+
+def test_insert_inside_replaced_span_conflicts():
+    with pytest.raises(ValueError, match="conflict"):
+        _compose(("a", [TextEdit(2, 6, "x")]), ("b", [TextEdit(4, 4, "y")]))
+
+
+def test_inserts_at_same_offset_keep_plan_order():
+    merged = _compose(("a", [TextEdit(3, 3, "first ")]), ("b", [TextEdit(3, 3, "second ")]))
+    assert merged == [TextEdit(3, 3, "first second ")]
+
+
+def test_identical_edits_collapse():
+    merged = _compose(("a", [TextEdit(1, 3, "z")]), ("b", [TextEdit(1, 3, "z")]))
+    assert merged == [TextEdit(1, 3, "z")]
+
+
+def test_composed_plan_matches_sequential_plan():
+    source = "def f(a, b):\n    return a * b\n\ndef g(c):\n    return c * c\n"
+    plan = [{"op": "rename_var", "args": {"old_name": "a", "new_name": "x"}, "scope": {"func": "f"}},
+            {"op": "operator_swap", "args": {"old": "*", "new": "+"}, "scope": {"func": "g"}}]
+    editor = CodeFileEditor("python")
+    composed = editor.apply_edits(Document(source), plan, compose=True).text
+    assert composed == editor.apply_edits(Document(source), plan).text
+    assert composed == "def f(x, b):\n    return x * b\n\ndef g(c):\n    return c + c\n"
+
+
+def test_conflicting_plan_is_rejected_and_rolled_back():
+    source = "def f(a):\n    return a * 2\n"
+    plan = [{"op": "rename_var", "args": {"old_name": "a", "new_name": "x"}},
+            {"op": "rename_var", "args": {"old_name": "a", "new_name": "y"}}]
+    doc = Document(source)
+    with pytest.raises(ValueError, match="conflict"):
+        CodeFileEditor("python").apply_edits(doc, plan, compose=True)
+    assert doc.text == source
@@ -0,0 +1,54 @@
+import os
+
+import pytest
+
+from codeEditorSDK import CodeFileEditor, Document
+from codeEditorSDK.core.document import Change, TextEdit
+
+LINES = ["def f(a):", "    x = a", "    y = 1", "    y = 2", "    y = 3",
+         "    y = 4", "    y = 5", "    y = 6", "    y = 7", "    return x + a"]
+PLAN = [{"op": "rename_var", "args": {"old_name": "x", "new_name": "res"}}]
+
+
+@pytest.mark.parametrize("newline", ["\n", "\r\n"], ids=["lf", "crlf"])
+def test_multi_hunk_diff_and_spans(tmp_path, newline):
+    source = newline.join(LINES) + newline
+    path = tmp_path / "m.py"
+    path.write_bytes(source.encode("utf8"))
+    editor = CodeFileEditor("python")
+
+    diff = editor.apply_edits(str(path), PLAN, dry_run=True)
+    spans = editor.apply_edits(str(path), PLAN, dry_run="spans")
+
+    assert os.listdir(tmp_path) == ["m.py"]
+    assert path.read_bytes() == source.encode("utf8")
+    n = newline
+    name = str(path).lstrip("/")
+    assert diff == (
+        f"--- a/{name}\n+++ b/{name}\n"
+        f"@@ -1,5 +1,5 @@\n def f(a):{n}-    x = a{n}+    res = a{n}     y = 1{n}     y = 2{n}     y = 3{n}"
+        f"@@ -7,4 +7,4 @@\n     y = 5{n}     y = 6{n}     y = 7{n}-    return x + a{n}+    return res + a{n}")
+    second = source.index("    return")
+    assert spans == [
+        Change(len("def f(a):" + n), len("def f(a):" + n + "    x = a" + n), 2, 2, "    res = a" + n),
+        Change(second, len(source), 10, 10, "    return res + a" + n),
+    ]
+    # The spans rebuild the edited text from the original
+    edited = source
+    for change in reversed(spans):
+        edited = edited[:change.start_byte] + change.new_text + edited[change.end_byte:]
+    assert edited == source.replace("x", "res")
+
+
+def test_dry_run_leaves_document_untouched():
+    source = "\n".join(LINES) + "\n"
+    doc = Document(source)
+    diff = CodeFileEditor("python").apply_edits(doc, PLAN, dry_run=True)
+    assert diff.startswith("--- a/document\n+++ b/document\n")
+    assert doc.text == source and not doc.modified
+
+
+def test_insertion_span_is_empty():
+    doc = Document("a = 1\nb = 2\n")
+    doc.apply([TextEdit(6, 6, "c = 3\n")])
+    assert doc.changes() == [Change(6, 6, 2, 1, "c = 3\n")]
@@ -0,0 +1,51 @@
+import random
+
+import pytest
+
+from codeEditorSDK import CodeFileEditor, Document
+from codeEditorSDK.benchmarks.corpus import generate_source
+from codeEditorSDK.core.document import TextEdit
+from codeEditorSDK.utils.languages import get_parser
+
+
+def _shape(node):
+    """Every node's type and position, for comparing trees"""
+    out = []
+    stack = [node]
+    while stack:
+        n = stack.pop()
+        out.append((n.type, n.start_byte, n.end_byte, n.start_point, n.end_point, n.is_missing))
+        stack.extend(reversed(n.children))
+    return out
+
+
+@pytest.mark.parametrize("language", ["python", "java", "c", "cpp"])
+def test_incremental_reparse_matches_full_parse(language):
+    rng = random.Random(3)
+    editor = CodeFileEditor(language)
+    doc = Document(generate_source(language, 6000))
+    editor._tree(doc)
+    source = doc.source
+    for _ in range(10):
+        # Several spans per apply, reported to the tree back to front
+        names = [i for i in range(len(source)) if source.startswith(b"total", i)]
+        picked = sorted(rng.sample(names, min(4, len(names))))
+        doc.apply([TextEdit(i, i + 5, rng.choice(["acc", "total_sum", "t"])) for i in picked])
+        tree = editor._tree(doc)
+        source = doc.source
+        fresh = get_parser(language).parse(source)
+        assert tree.root_node.sexp() == fresh.root_node.sexp()
+        assert _shape(tree.root_node) == _shape(fresh.root_node)
+        source = source.replace(b"acc", b"total").replace(b"total_sum", b"total")
+        doc.apply([TextEdit(0, doc.size, source.decode("utf8"))])
+        editor._tree(doc)
+
+
+def test_operation_reparse_matches_full_parse():
+    editor = CodeFileEditor("c")
+    doc = Document(generate_source("c", 6000))
+    editor.rename_var(doc, "total", "acc")
+    editor.swap_operator(doc, "*", "+")
+    editor.unroll_loops(doc, 2)
+    fresh = get_parser("c").parse(doc.source)
+    assert _shape(editor._tree(doc).root_node) == _shape(fresh.root_node)
@@ -0,0 +1,59 @@
+import os
+
+import pytest
+
+from codeEditorSDK.core.lines import line_count, line_starts, read_lines
+
+
+@pytest.mark.parametrize("data, count", [
+    (b"", 0),
+    (b"a", 1),
+    (b"a\n", 1),
+    (b"a\nb", 2),
+    (b"a\r\nb\r\n", 2),
+    (b"a\rb\x0cc\n", 1),  # only newline bytes break lines
+    ("a b\n".encode("utf8"), 1),
+])
+def test_line_count_breaks_at_newlines(data, count):
+    assert line_count(line_starts(data), len(data)) == count
+
+
+def test_read_lines_crlf(tmp_path):
+    path = tmp_path / "crlf.py"
+    path.write_bytes(b"one\r\ntwo\r\nthree\r\n")
+    assert read_lines(str(path), 2, 3) == "two\nthree\n"
+    assert read_lines(str(path), 1, 1) == "one\n"
+
+
+@pytest.mark.parametrize("start, end, expected", [
+    (0, 1, "one\n"),
+    (-5, 2, "one\ntwo\n"),
+    (3, 99, "three"),
+    (99, 120, "three"),
+    (2, 1, "two\n"),
+])
+def test_read_lines_clamps(tmp_path, start, end, expected):
+    path = tmp_path / "src.py"
+    path.write_text("one\ntwo\nthree")
+    assert read_lines(str(path), start, end) == expected
+
+
+def test_read_lines_empty_file(tmp_path):
+    path = tmp_path / "empty.py"
+    path.write_bytes(b"")
+    assert read_lines(str(path), 1, 3) == ""
+
+
+def test_line_index_rebuilt_when_file_changes(tmp_path):
+    path = tmp_path / "src.py"
+    path.write_text("a\nb\nc\n")
+    os.utime(path, ns=(1_000_000_000, 1_000_000_000))
+    assert read_lines(str(path), 2, 2) == "b\n"
+    # Same size, new mtime: the cached offsets would split lines wrongly
+    path.write_text("ab\n\nc\n")
+    os.utime(path, ns=(2_000_000_000, 2_000_000_000))
+    assert read_lines(str(path), 1, 1) == "ab\n"
+    # Same mtime, new size
+    path.write_text("abcd\ne\n")
+    os.utime(path, ns=(2_000_000_000, 2_000_000_000))
+    assert read_lines(str(path), 2, 2) == "e\n"
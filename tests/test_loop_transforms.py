@@ -0,0 +1,98 @@
+from codeEditorSDK import CodeFileEditor, Document
+
+ALIASED = """#include <stdio.h>
+
+void g(int *a, int *b, int n) {
+    for (int i = 0; i < n; i++) {
+        a[i] = i;
+    }
+    for (int i = 0; i < n; i++) {
+        b[i] = b[i + 1] + 1;
+    }
+}
+"""
+
+ALIASED_MAIN = """
+int main(void) {
+    int x[11] = {0};
+    g(x, x, 10);
+    unsigned h = 0;
+    for (int i = 0; i < 11; i++) {
+        h = h * 31 + x[i];
+    }
+    printf("%u\\n", h);
+    return 0;
+}
+"""
+
+SAME_ARRAY = """#include <stdio.h>
+
+int main(void) {
+    int a[8], b[8];
+    for (int i = 0; i < 8; i++) {
+        a[i] = i * 3;
+    }
+    for (int i = 0; i < 8; i++) {
+        b[i] = a[i] + 1;
+    }
+    printf("%d %d\\n", a[7], b[7]);
+    return 0;
+}
+"""
+
+
+def test_fuse_refuses_possibly_aliased_pointers(run_program):
+    fused = CodeFileEditor("c").fuse_loops(Document(ALIASED)).text
+    assert fused.count("for (") == 2
+    assert run_program(fused + ALIASED_MAIN) == run_program(ALIASED + ALIASED_MAIN)
+
+
+def test_fuse_local_arrays(run_program):
+    fused = CodeFileEditor("c").fuse_loops(Document(SAME_ARRAY)).text
+    assert fused.count("for (") == 1
+    assert run_program(fused) == run_program(SAME_ARRAY)
+
+
+REFERENCES = """#include <cstdio>
+
+void bump(int &n) { n += 1; }
+
+int by_call(int n) {
+    int s = 0;
+    for (int i = 0; i < 4; i++) {
+        bump(n);
+        s += n * 2;
+    }
+    return s;
+}
+
+int by_alias(int n) {
+    int s = 0;
+    int &r = n;
+    for (int i = 0; i < 4; i++) {
+        r++;
+        s += n * 2;
+    }
+    return s;
+}
+
+int invariant(int n, int *a) {
+    int s = 0;
+    for (int i = 0; i < 4; i++) {
+        s += a[i] + n * 2;
+    }
+    return s;
+}
+
+int main() {
+    int a[4] = {1, 2, 3, 4};
+    printf("%d %d %d\\n", by_call(1), by_alias(1), invariant(3, a));
+    return 0;
+}
+"""
+
+
+def test_hoist_skips_values_changed_through_references(run_program):
+    hoisted = CodeFileEditor("cpp").hoist_invariants(Document(REFERENCES)).text
+    assert hoisted.count("hoisted_") == 2  # only n * 2 in invariant()
+    assert run_program(hoisted, "cpp") == run_program(REFERENCES, "cpp")
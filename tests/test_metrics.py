@@ -0,0 +1,58 @@
+import re
+
+from codeEditorSDK import CodeFileEditor, Document
+from codeEditorSDK.utils.metrics import Metrics
+
+SOURCE = "def area(r):\n    return r * r\n"
+
+
+def test_editor_counts_phases_and_counters(tmp_path):
+    path = tmp_path / "area.py"
+    path.write_text(SOURCE)
+    samples = []
+    metrics = Metrics(trace=lambda op, phase, seconds: samples.append((op, phase)))
+    editor = CodeFileEditor("python", metrics=metrics)
+    output = editor.rename_var(str(path), "r", "radius")
+    doc = Document(SOURCE)
+    editor.swap_operator(doc, "*", "+")
+    editor.swap_operator(doc, "+", "-")
+
+    snap = metrics.snapshot()
+    counters = snap["counters"]
+    # rename_var on a path runs load as a nested operation
+    assert counters["operations"] == 4
+    assert snap["timings"]["load"]["total"]["count"] == 1
+    assert counters["bytes_read"] == len(SOURCE)
+    assert counters["bytes_written"] == len(open(output, "rb").read())
+    assert counters["parses"] >= 3
+    assert snap["timings"]["rename_var"]["total"]["count"] == 1
+    assert snap["timings"]["swap_operator"]["total"]["count"] == 2
+    assert "read" in snap["timings"]["load"]
+    assert {"parse", "locate", "validate", "write"} <= set(snap["timings"]["rename_var"])
+    assert ("swap_operator", "total") in samples
+
+    metrics.reset()
+    assert metrics.snapshot() == {"timings": {}, "counters": {}}
+
+
+def test_prometheus_export():
+    metrics = Metrics()
+    metrics.record("parse", 0.25, op="rename_var")
+    metrics.record("parse", 0.5, op="rename_var")
+    metrics.count("parses", 2)
+    text = metrics.to_prometheus(prefix="ed")
+    lines = text.splitlines()
+    assert lines[:2] == ["# HELP ed_phase_seconds Time spent per operation phase.",
+                         "# TYPE ed_phase_seconds summary"]
+    assert 'ed_phase_seconds_count{op="rename_var",phase="parse"} 2' in lines
+    assert 'ed_phase_seconds_sum{op="rename_var",phase="parse"} 0.750000000' in lines
+    assert lines[-2:] == ["# TYPE ed_parses_total counter", "ed_parses_total 2"]
+    sample = re.compile(r'^[a-z_]+(\{[a-z]+="[^"]*"(,[a-z]+="[^"]*")*\})? [0-9.]+$')
+    assert all(line.startswith("#") or sample.match(line) for line in lines)
+    assert text.endswith("\n")
+
+
+def test_disabled_metrics_record_nothing():
+    editor = CodeFileEditor("python")
+    assert not editor.metrics.enabled
+    editor.swap_operator(Document(SOURCE), "*", "+")
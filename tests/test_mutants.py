@@ -0,0 +1,72 @@
+import pytest
+
+from codeEditorSDK import CodeFileEditor, Document
+from codeEditorSDK.benchmarks.corpus import generate_source
+from codeEditorSDK.utils.languages import get_parser
+
+SOURCES = {
+    "python": """
+class A:
+    k = 1 + 2 * 3
+    def f(self, a, b):
+        def g(x):
+            return -x + a ** 2 // b
+        if a < b and not a >= b != 3:
+            return a+-b
+        return g(a) - +b
+x = [i * 2 for i in range(10) if i % 3 == 1]
+print(x[1:-1], -x[0])
+""",
+    "java": """
+public class H {
+    int k = 1 + 2 * 3;
+    static final boolean B = 1 < 2 || 3 >= 4;
+    H(int a) { k = a+-a; }
+    int f(int a, int b) {
+        for (int i = 0; i < a; i++) { b += ~i * -a; --b; }
+        if (!(a < b) && a != b) return a- -b;
+        return a++ + ++b;
+    }
+}
+""",
+    "c": """
+int g = 1 + 2 * 3;
+#define SQ(x) ((x) * (x))
+static int f(int a, int b) {
+    int *p = &a;
+    for (int i = 0; i < a; i++) { b += ~i * -a; --b; }
+    if (!(a < b) && a != b || *p > 2) return a- -b;
+    return a++ + ++b + a+-b;
+}
+""",
+    "cpp": """
+#include <vector>
+namespace ns {
+template <typename T> T f(T a, T b) { return a < b ? a - b : a * -b; }
+struct S { int m(int x) const { return x++ + --x; } int k = 1 + 2; };
+}
+int main() { std::vector<int> v; for (int i = 0; i < 3; ++i) v.push_back(i * 2 > 1 && i != 0); return !v.size(); }
+""",
+}
+
+
+@pytest.mark.parametrize("batch_size", [1, 7, 256])
+@pytest.mark.parametrize("language", list(SOURCES))
+def test_batched_validation_matches_full_reparse(language, batch_size):
+    editor = CodeFileEditor(language)
+    parser = get_parser(language)
+    for text in (SOURCES[language], generate_source(language, 4000)):
+        source = text.encode("utf8")
+        assert not parser.parse(source).root_node.has_error
+        candidates = list(editor.mutants(Document(text), validate=False))
+        assert candidates
+        expected = [m for m in candidates if not parser.parse(m.patch(source)).root_node.has_error]
+        assert list(editor.mutants(Document(text), batch_size=batch_size)) == expected
+
+
+def test_mutants_in_conditions_of_one_function():
+    text = SOURCES["c"]
+    mutants = list(CodeFileEditor("c").mutants(Document(text), func="f", conditions_only=True))
+    condition = text.index("(!(a < b)")
+    assert mutants and all(condition < m.start_byte < text.index("return a- -b") for m in mutants)
+    assert {m.original for m in mutants} == {"!", "<", "&&", "!=", "||", ">"}
@@ -0,0 +1,44 @@
+import os
+import stat
+
+from codeEditorSDK.core.output import InPlaceOutput, write_atomic
+
+
+def _mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+def test_new_file_follows_umask(tmp_path):
+    old = os.umask(0o077)
+    try:
+        path = write_atomic(str(tmp_path / "new.py"), "x = 1\n")
+    finally:
+        os.umask(old)
+    assert _mode(path) == 0o600
+
+
+def test_replaced_file_keeps_its_mode(tmp_path):
+    path = tmp_path / "kept.py"
+    path.write_text("x = 0\n")
+    os.chmod(path, 0o640)
+    write_atomic(str(path), "x = 1\n")
+    assert _mode(path) == 0o640
+    assert path.read_text() == "x = 1\n"
+
+
+def test_symlink_is_kept_and_its_target_replaced(tmp_path):
+    real_dir = tmp_path / "real"
+    real_dir.mkdir()
+    real = real_dir / "code.py"
+    real.write_text("x = 0\n")
+    os.chmod(real, 0o640)
+    link = tmp_path / "link.py"
+    link.symlink_to(os.path.join("real", "code.py"))
+
+    assert InPlaceOutput().write(str(link), "x = 1\n", "_renamed") == str(link)
+    assert link.is_symlink()
+    assert real.read_text() == "x = 1\n"
+    assert _mode(real) == 0o640
+    # The temporary file was made next to the target, not the link
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["link.py", "real"]
+    assert [p.name for p in real_dir.iterdir()] == ["code.py"]
@@ -0,0 +1,71 @@
+import pytest
+
+from codeEditorSDK import CodeFileEditor, Document
+
+# language -> {case: (source, expected after renaming count -> n in f)}
+SKIPPED = {
+    "python": {
+        "strings": ('def f(count):\n    return "count: %d" % count\n',
+                    'def f(n):\n    return "count: %d" % n\n'),
+        "comments": ("def f(count):\n    # count is never negative\n    return count\n",
+                     "def f(n):\n    # count is never negative\n    return n\n"),
+        "attributes": ("def f(obj, count):\n    obj.count = count\n    return obj.count\n",
+                       "def f(obj, n):\n    obj.count = n\n    return obj.count\n"),
+    },
+    "c": {
+        "strings": ('int f(int count) {\n    printf("count: %d", count);\n    return count;\n}\n',
+                    'int f(int n) {\n    printf("count: %d", n);\n    return n;\n}\n'),
+        "comments": ("int f(int count) {\n    /* count */ return count; // count\n}\n",
+                     "int f(int n) {\n    /* count */ return n; // count\n}\n"),
+        "attributes": ("struct S { int count; };\n"
+                       "int f(struct S *p, int count) {\n    struct S q;\n"
+                       "    q.count = count;\n    p->count = count;\n    return q.count;\n}\n",
+                       "struct S { int count; };\n"
+                       "int f(struct S *p, int n) {\n    struct S q;\n"
+                       "    q.count = n;\n    p->count = n;\n    return q.count;\n}\n"),
+    },
+}
+
+CASES = [pytest.param(language, source, expected, id=f"{language}-{case}")
+         for language, cases in SKIPPED.items() for case, (source, expected) in cases.items()]
+
+
+@pytest.mark.parametrize("language,source,expected", CASES)
+def test_rename_only_touches_identifiers(language, source, expected):
+    editor = CodeFileEditor(language)
+    assert editor.rename_var(Document(source), "count", "n", func="f").text == expected
+
+
+@pytest.mark.parametrize("language,source,expected", [
+    ("python", "x = 1\ndef f():\n    x = 2\n    return x\ndef g():\n    return x\n",
+     "x = 1\ndef f():\n    y = 2\n    return y\ndef g():\n    return x\n"),
+    ("c", "int x = 1;\nint f(void) {\n    int x = 2;\n    return x;\n}\nint g(void) { return x; }\n",
+     "int x = 1;\nint f(void) {\n    int y = 2;\n    return y;\n}\nint g(void) { return x; }\n"),
+])
+def test_scoped_rename_leaves_global_binding(language, source, expected):
+    assert CodeFileEditor(language).rename_var(Document(source), "x", "y", func="f").text == expected
+
+
+@pytest.mark.parametrize("language,source,expected", [
+    ("python", "def f(a, b):\n    return a - b * 2\n", "def f(b, a):\n    return b - a * 2\n"),
+    ("c", "int f(int a, int b) {\n    return a - b * 2;\n}\n", "int f(int b, int a) {\n    return b - a * 2;\n}\n"),
+])
+def test_rename_many_swaps(language, source, expected):
+    assert CodeFileEditor(language).rename_many(Document(source), {"a": "b", "b": "a"}).text == expected
+
+
+def test_rename_many_chain_uses_original_names():
+    source = "def f(a, b):\n    t = a.b\n    return a + b  # a, b\n"
+    renamed = CodeFileEditor("python").rename_many(Document(source), {"a": "b", "b": "c"}).text
+    assert renamed == "def f(b, c):\n    t = b.b\n    return b + c  # a, b\n"
+
+
+def test_rename_many_matches_sequential_renames_without_overlap():
+    source = "def f(v0, v1, v2):\n    return v0 * v1 + v2\n"
+    mapping = {f"v{i}": f"w{i}" for i in range(3)}
+    editor = CodeFileEditor("python")
+    one_pass = editor.rename_many(Document(source), mapping).text
+    doc = Document(source)
+    for old, new in mapping.items():
+        editor.rename_var(doc, old, new)
+    assert one_pass == doc.text == "def f(w0, w1, w2):\n    return w0 * w1 + w2\n"
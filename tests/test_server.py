@@ -0,0 +1,125 @@
+import asyncio
+import json
+import os
+import stat
+
+from codeEditorSDK.server import EditServer
+
+
+async def _call(reader, writer, request):
+    writer.write(json.dumps(request).encode("utf8") + b"\n")
+    await writer.drain()
+    return json.loads(await reader.readline())
+
+
+def _serve(server, client, **where):
+    async def main():
+        listener = await server.start(**where)
+        task = asyncio.ensure_future(server.serve_forever())
+        try:
+            if "socket_path" in where:
+                reader, writer = await asyncio.open_unix_connection(where["socket_path"])
+            else:
+                reader, writer = await asyncio.open_connection(*listener.sockets[0].getsockname()[:2])
+            try:
+                return await client(reader, writer)
+            finally:
+                writer.close()
+        finally:
+            listener.close()
+            task.cancel()
+    return asyncio.run(main())
+
+
+def test_tcp_requires_token(tmp_path):
+    secret = tmp_path / "secret.py"
+    secret.write_text("x = 1\n")
+    server = EditServer()
+
+    async def client(reader, writer):
+        read = {"jsonrpc": "2.0", "id": 1, "method": "query",
+                "params": {"path": str(secret), "language": "python", "start_line": 1, "end_line": 1}}
+        denied = await _call(reader, writer, read)
+        wrong = await _call(reader, writer, {"jsonrpc": "2.0", "id": 2, "method": "initialize",
+                                             "params": {"token": "guess"}})
+        ok = await _call(reader, writer, {"jsonrpc": "2.0", "id": 3, "method": "initialize",
+                                          "params": {"token": server.token}})
+        allowed = await _call(reader, writer, dict(read, id=4))
+        return denied, wrong, ok, allowed
+
+    denied, wrong, ok, allowed = _serve(server, client, port=0)
+    assert server.token
+    assert denied["error"]["code"] == -32001
+    assert wrong["error"]["code"] == -32001
+    assert ok["result"]["name"] == "codeEditorSDK"
+    assert "x = 1" in allowed["result"]["text"]
+
+
+def test_unix_socket_is_private(tmp_path):
+    path = str(tmp_path / "editor.sock")
+
+    async def client(reader, writer):
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+        reply = await _call(reader, writer, {"jsonrpc": "2.0", "id": 1, "method": "initialize"})
+        return mode, reply
+
+    mode, reply = _serve(EditServer(), client, socket_path=path)
+    assert mode & 0o077 == 0
+    assert "result" in reply
+
+
+def test_unserializable_result_is_reported(tmp_path):
+    server = EditServer()
+
+    async def broken(params):
+        return {"value": object()}
+    server._methods["broken"] = broken
+
+    async def client(reader, writer):
+        reply = await _call(reader, writer, {"jsonrpc": "2.0", "id": 7, "method": "broken"})
+        after = await _call(reader, writer, {"jsonrpc": "2.0", "id": 8, "method": "initialize"})
+        return reply, after
+
+    reply, after = _serve(server, client, socket_path=str(tmp_path / "editor.sock"))
+    assert reply["id"] == 7 and reply["error"]["code"] == -32603
+    assert after["id"] == 8 and "result" in after
+
+
+def test_failed_plan_keeps_text_and_version(tmp_path):
+    server = EditServer()
+    text = "def area(radius):\n    return radius * radius\n"
+
+    async def client(reader, writer):
+        await _call(reader, writer, {"jsonrpc": "2.0", "id": 1, "method": "open",
+                                     "params": {"uri": "mem://a.py", "language": "python", "text": text}})
+        plan = await _call(reader, writer, {"jsonrpc": "2.0", "id": 2, "method": "plan", "params": {
+            "uri": "mem://a.py",
+            "edits": [{"op": "rename_var", "args": {"old_name": "radius", "new_name": "r"}},
+                      {"op": "rename_var", "args": {"old_name": "r", "new_name": "1bad"}}]}})
+        change = await _call(reader, writer, {"jsonrpc": "2.0", "id": 3, "method": "change", "params": {
+            "uri": "mem://a.py",
+            "changes": [{"range": {"start": {"line": 0, "character": 4},
+                                   "end": {"line": 0, "character": 8}}, "text": "size"},
+                        {"range": {"start": {"line": 1, "character": 0},
+                                   "end": {"line": -1, "character": 0}}, "text": "x"}]}})
+        state = await _call(reader, writer, {"jsonrpc": "2.0", "id": 4, "method": "text",
+                                             "params": {"uri": "mem://a.py"}})
+        return plan, change, state
+
+    plan, change, state = _serve(server, client, socket_path=str(tmp_path / "editor.sock"))
+    assert "error" in plan and "error" in change
+    assert state["result"] == {"version": 0, "text": text}
+
+
+def test_malformed_content_length_gets_parse_error(tmp_path):
+    async def client(reader, writer):
+        writer.write(b"Content-Length: twelve\r\n\r\n{}")
+        await writer.drain()
+        header = await reader.readline()
+        await reader.readline()
+        body = await reader.readexactly(int(header.split(b":")[1]))
+        return json.loads(body), await reader.read()
+
+    reply, rest = _serve(EditServer(), client, socket_path=str(tmp_path / "editor.sock"))
+    assert reply["error"]["code"] == -32700
+    assert rest == b""  # the server closed the connection
@@ -0,0 +1,40 @@
+import json
+import os
+import subprocess
+import sys
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+# Importing tree_sitter alone takes ~250 ms; the package must stay far below that
+IMPORT_BUDGET = 0.05
+
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+import codeEditorSDK
+seconds = time.perf_counter() - start
+loaded = [m for m in ("tree_sitter", "tree_sitter_languages") if m in sys.modules]
+{extra}
+print(json.dumps({{"seconds": seconds, "loaded": loaded}}))
+"""
+
+
+def _child(extra: str = "") -> dict:
+    env = dict(os.environ, PYTHONPATH=SRC + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    # Warm the bytecode cache first so the measurement is of the import itself
+    subprocess.run([sys.executable, "-c", "import codeEditorSDK"], env=env, check=True)
+    proc = subprocess.run([sys.executable, "-c", CHILD.format(extra=extra)],
+                          env=env, check=True, capture_output=True, text=True)
+    return json.loads(proc.stdout)
+
+
+def test_bare_import_loads_no_parser():
+    result = _child()
+    assert result["loaded"] == []
+    assert result["seconds"] < IMPORT_BUDGET
+
+
+def test_editor_construction_defers_grammar_loading():
+    result = _child("codeEditorSDK.CodeFileEditor('python')\n"
+                    "loaded = [m for m in ('tree_sitter', 'tree_sitter_languages') if m in sys.modules]")
+    assert result["loaded"] == []
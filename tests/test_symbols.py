@@ -0,0 +1,36 @@
+import pytest
+
+from codeEditorSDK import AnalysisCache, CodeFileEditor, Document
+
+# Shapes where a function or loop has the same span as its parent node
+SHAPES = [
+    pytest.param("python", "class A:\n    def m(self, x):\n        y = x + 1\n        return y\n", "m", id="single-method-class"),
+    pytest.param("c", "int m(int x) {\n    int y = 0;\n    for (int i = 0; i < x; i++) {\n        y += i;\n    }\n    return y;\n}",
+     "m", id="no-trailing-newline"),
+    pytest.param("python", "def m(x):\n    for i in range(x):\n        y = i\n", "m", id="block-of-one-loop"),
+]
+
+
+def _run(language, text, func, cache, op):
+    editor = CodeFileEditor(language, cache=cache)
+    try:
+        return op(editor, Document(text), func).text
+    except Exception as ex:
+        return type(ex).__name__
+
+
+@pytest.mark.parametrize("language,text,func", SHAPES)
+@pytest.mark.parametrize("op", [
+    pytest.param(lambda ed, doc, func: ed.rename_var(doc, "y", "z", func=func), id="rename_var"),
+    pytest.param(lambda ed, doc, func: ed.unroll_loop(doc, 2, func=func), id="unroll_loop_func"),
+    pytest.param(lambda ed, doc, func: ed.unroll_loop(doc, 2), id="unroll_loop"),
+])
+def test_warm_cache_matches_cold(tmp_path, language, text, func, op):
+    cold = _run(language, text, func, None, op)
+    cache = AnalysisCache(str(tmp_path / "cache.db"))
+    try:
+        _run(language, text, func, cache, lambda ed, doc, f: ed.symbols(doc) and doc)
+        warm = _run(language, text, func, cache, op)
+    finally:
+        cache.close()
+    assert warm == cold
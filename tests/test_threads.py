@@ -0,0 +1,49 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+from codeEditorSDK import CodeFileEditor, Document
+from codeEditorSDK.utils.languages import get_parser
+
+WORKERS = 8
+
+
+def test_each_thread_gets_its_own_parser():
+    editor = CodeFileEditor("python")
+    barrier = threading.Barrier(WORKERS)
+
+    def lease(_):
+        barrier.wait(5)  # keep every worker alive so thread ids are not reused
+        parser = editor.parser
+        assert parser is editor.parser is get_parser("python")
+        assert editor.validator.parser is parser
+        return id(parser)
+
+    with ThreadPoolExecutor(WORKERS) as pool:
+        ids = list(pool.map(lease, range(WORKERS)))
+    assert len(set(ids)) == WORKERS
+    assert editor.parser is get_parser("python")
+
+
+def test_shared_editor_across_threads(tmp_path):
+    editor = CodeFileEditor("c")
+    barrier = threading.Barrier(WORKERS)
+    template = ("int f{i}(int n) {{\n    int total = 0;\n"
+                "    for (int i = 0; i < n; i++) {{\n        total += i * {i};\n    }}\n"
+                "    return total;\n}}\n")
+
+    def work(i):
+        doc = Document(template.format(i=i) * 20)
+        barrier.wait(5)
+        for _ in range(5):
+            editor.rename_var(doc, "total", "acc")
+            editor.swap_operator(doc, "*", "/")
+            editor.rename_var(doc, "acc", "total")
+            editor.swap_operator(doc, "/", "*")
+        editor.rename_var(doc, "total", f"sum{i}")
+        return i, doc.text
+
+    with ThreadPoolExecutor(WORKERS) as pool:
+        results = list(pool.map(work, range(WORKERS)))
+    for i, text in results:
+        assert text == template.format(i=i).replace("total", f"sum{i}") * 20
+        assert not get_parser("c").parse(text.encode()).root_node.has_error
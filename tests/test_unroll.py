@@ -0,0 +1,142 @@
+import pytest
+
+from codeEditorSDK import CodeFileEditor, Document
+
+PROGRAM = """#include <stdio.h>
+
+long run(int n) {
+    long s = 0;
+%s
+    return s;
+}
+
+int main(void) {
+    for (int n = 0; n < 13; n++) {
+        printf("%%ld\\n", run(n));
+    }
+    return 0;
+}
+"""
+
+UNROLLED = {
+    "divisible": """    for (int i = 0; i < 12; i++) {
+        s = s * 3 + i;
+    }""",
+    "not-divisible": """    for (int i = 0; i < 10; i++) {
+        s = s * 3 + i;
+    }""",
+    "runtime-bound": """    for (int i = 0; i < n; i++) {
+        s = s * 3 + i;
+    }""",
+    "inclusive-bound": """    for (int i = 1; i <= n; i += 2) {
+        s = s * 5 - i;
+    }""",
+}
+
+REFUSED = {
+    "continue": """    for (int i = 0; i < n; i++) {
+        if (i % 3 == 0) {
+            continue;
+        }
+        s += i;
+    }""",
+    "break": """    for (int i = 0; i < 20; i++) {
+        if (i > n) {
+            break;
+        }
+        s += i;
+    }""",
+    "counter-written": """    for (int i = 0; i < n; i++) {
+        s += i;
+        i += s % 2;
+    }""",
+}
+
+
+@pytest.mark.parametrize("factor", [2, 3, 4])
+@pytest.mark.parametrize("loop", list(UNROLLED.values()), ids=list(UNROLLED))
+def test_unroll_keeps_behaviour(run_program, loop, factor):
+    source = PROGRAM % loop
+    unrolled = CodeFileEditor("c").unroll_loops(Document(source), factor, func="run").text
+    assert unrolled != source
+    assert run_program(unrolled) == run_program(source)
+
+
+@pytest.mark.parametrize("loop", list(REFUSED.values()), ids=list(REFUSED))
+def test_unroll_refuses_unsafe_loops(loop):
+    source = PROGRAM % loop
+    assert CodeFileEditor("c").unroll_loops(Document(source), 4, func="run").text == source
+
+
+BOUND_CHANGED = {
+    "through-member": """#include <stdio.h>
+
+struct vec { int n; };
+
+int run(struct vec *v) {
+    int s = 0;
+    for (int i = 0; i < v->n; i++) {
+        s = s * 10 + 1;
+        v->n = v->n - 1;
+    }
+    return s;
+}
+
+int main(void) {
+    for (int n = 0; n < 8; n++) {
+        struct vec v = {n};
+        printf("%d\\n", run(&v));
+    }
+    return 0;
+}
+""",
+    "through-call": """#include <stdio.h>
+
+int limit;
+
+void shrink(void) { limit--; }
+
+int run(void) {
+    int s = 0;
+    for (int i = 0; i < limit; i++) {
+        s = s * 10 + 1;
+        shrink();
+    }
+    return s;
+}
+
+int main(void) {
+    for (int n = 0; n < 8; n++) {
+        limit = n;
+        printf("%d\\n", run());
+    }
+    return 0;
+}
+""",
+}
+
+
+@pytest.mark.parametrize("program", list(BOUND_CHANGED.values()), ids=list(BOUND_CHANGED))
+def test_unroll_refuses_bound_changed_by_body(run_program, program):
+    unrolled = CodeFileEditor("c").unroll_loops(Document(program), 2, func="run").text
+    assert unrolled == program
+    assert run_program(unrolled) == run_program(program)
+
+
+def test_unroll_with_calls_and_local_bound(run_program):
+    source = PROGRAM.replace("long run", "static long step(long s, int i) { return s * 3 + i; }\n\nlong run") % \
+        """    for (int i = 0; i < n; i++) {
+        s = step(s, i);
+    }"""
+    unrolled = CodeFileEditor("c").unroll_loops(Document(source), 2, func="run").text
+    assert unrolled != source
+    assert run_program(unrolled) == run_program(source)
+
+
+def test_unroll_unbraced_nest_indents_remainder(run_program):
+    source = PROGRAM % """    for (int i = 0; i < n; i++)
+        for (int j = 0; j < n; j++)
+            s = s * 3 + i * j;"""
+    unrolled = CodeFileEditor("c").unroll_loops(Document(source), 2, func="run").text
+    assert "        for (; i < n; i++) {\n            int j = 0;\n" in unrolled
+    assert run_program(unrolled) == run_program(source)
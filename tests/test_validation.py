@@ -0,0 +1,36 @@
+import pytest
+
+from codeEditorSDK import CodeFileEditor, Document
+
+# source, function to edit, line to update, bad and good replacements;
+# update also replaces the line after end_line, so C's good code restores the brace
+BROKEN = {
+    "python": ("def ok(a):\n    return a * 2\n\ndef bad(:\n    pass\n", "ok", 2,
+               "return (a *", "return a + 2\n"),
+    "c": ("int ok(int a) {\n    return a * 2;\n}\n\nint bad( {\n}\n", "ok", 2,
+          "return (a *;", "return a + 2;\n}"),
+}
+
+
+@pytest.mark.parametrize("language", list(BROKEN))
+def test_incremental_validation_ignores_existing_errors(language):
+    source, func, *_ = BROKEN[language]
+    doc = Document(source)
+    CodeFileEditor(language, incremental_validation=True).rename_var(doc, "a", "x", func=func)
+    assert doc.text == source.replace("(a)", "(x)").replace("int a)", "int x)").replace("a * 2", "x * 2")
+    # A full check still refuses to touch the broken file
+    with pytest.raises(SyntaxError):
+        CodeFileEditor(language).rename_var(Document(source), "a", "x", func=func)
+
+
+@pytest.mark.parametrize("language", list(BROKEN))
+def test_incremental_validation_rejects_new_errors(language):
+    source, _, line, bad_code, good_code = BROKEN[language]
+    editor = CodeFileEditor(language, incremental_validation=True)
+    doc = Document(source)
+    with pytest.raises(SyntaxError):
+        editor.update(doc, line, line, bad_code)
+    assert doc.text == source
+    # The rolled-back Document is reparsed and still accepts good edits
+    editor.update(doc, line, line, good_code)
+    assert "a + 2" in doc.text